@@ -30,6 +30,7 @@ setup(
         "djangorestframework-simplejwt>=5.2,<6",
         "django-cors-headers>=3.13,<4",
         "psycopg2>=2.9,<3",
+        "redis>=4.5",
         "ufdl-core-app",
         "ufdl-html-client-app",
         "ufdl-image-classification-app",
@@ -10,14 +10,22 @@ from django.urls import re_path
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'ufdl.api_site.settings')
 django.setup()
 
-from ufdl.core_app.models.jobs.notifications import WebSocketNotificationConsumer
+from ufdl.core_app.models.jobs.notifications import (
+    WebSocketNotificationConsumer,
+    JobHierarchyWebSocketConsumer,
+    NodeWebSocketConsumer,
+    TeamWebSocketConsumer
+)
 
 application = ProtocolTypeRouter({
     'http': get_asgi_application(),
     "websocket": AuthMiddlewareStack(
         URLRouter(
             [
-                re_path('v1/jobs/(?P<pk>[1-9][0-9]*)$', WebSocketNotificationConsumer.as_asgi())
+                re_path('v1/jobs/(?P<pk>[1-9][0-9]*)$', WebSocketNotificationConsumer.as_asgi()),
+                re_path('v1/jobs/(?P<pk>[1-9][0-9]*)/hierarchy$', JobHierarchyWebSocketConsumer.as_asgi()),
+                re_path('v1/nodes/(?P<pk>[1-9][0-9]*)/jobs$', NodeWebSocketConsumer.as_asgi()),
+                re_path('v1/teams/(?P<pk>[1-9][0-9]*)/jobs$', TeamWebSocketConsumer.as_asgi())
             ]
         )
     ),
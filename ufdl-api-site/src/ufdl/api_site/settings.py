@@ -106,6 +106,20 @@ CHANNEL_LAYERS = {
     },
 }
 
+# The cache is shared between all server processes, as it holds the
+# job-type registry version, template parameter descriptions and the
+# job notification replay logs
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": (
+            f"redis://{os.environ.get('UFDL_REDIS_HOST', 'localhost')}"
+            f":{int(os.environ.get('UFDL_REDIS_PORT', '6379'))}"
+            f"/{int(os.environ.get('UFDL_REDIS_CACHE_DB', '1'))}"
+        ),
+    },
+}
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -8,3 +8,7 @@ class UFDLCoreAppConfig(AppConfig):
     def ready(self):
         # @receiver decorator takes care of registration of signals
         from . import signals
+
+        # Report invalid settings at start-up, rather than when first used
+        from .settings import core_settings
+        core_settings.EMAIL_NOTIFICATION_DIGEST_MODE
@@ -1,5 +1,7 @@
+import os
+import uuid
 from abc import ABC, abstractmethod
-from typing import IO, Union, Type, Iterator
+from typing import IO, Union, Type, Iterable, Iterator
 
 
 class FileSystemBackend(ABC):
@@ -88,6 +90,84 @@ class FileSystemBackend(ABC):
 
         return contents
 
+    def begin_upload(self) -> str:
+        """
+        Starts spooling a file which is uploaded in parts.
+
+        :return:    An identifier for the upload.
+        """
+        upload_id = uuid.uuid4().hex
+
+        # Create the (empty) spool file
+        spool_path = self.upload_spool_path(upload_id)
+        os.makedirs(os.path.dirname(spool_path), exist_ok=True)
+        open(spool_path, 'wb').close()
+
+        return upload_id
+
+    def write_upload_part(self, upload_id: str, offset: int, chunks: Iterable[bytes]) -> int:
+        """
+        Writes a part of an uploaded file to its spool.
+
+        :param upload_id:   The identifier of the upload.
+        :param offset:      The offset into the file at which the part starts.
+        :param chunks:      The data of the part.
+        :return:            The number of bytes written.
+        """
+        written = 0
+        with open(self.upload_spool_path(upload_id), 'r+b') as spool:
+            spool.seek(offset)
+            for chunk in chunks:
+                spool.write(chunk)
+                written += len(chunk)
+
+        return written
+
+    def commit_upload(self, upload_id: str, size: int) -> 'Handle':
+        """
+        Saves a completely-uploaded file to the file-system, discarding its spool.
+        Backends which can adopt the spooled file without reading it into memory
+        should override this.
+
+        :param upload_id:   The identifier of the upload.
+        :param size:        The size of the file. Any spooled data past this
+                            (e.g. from an interrupted part) is discarded.
+        :return:            A unique handle to the file.
+        """
+        spool_path = self.upload_spool_path(upload_id)
+        os.truncate(spool_path, size)
+
+        with open(spool_path, 'rb') as spool:
+            handle = self.save(spool)
+
+        os.remove(spool_path)
+
+        return handle
+
+    def abort_upload(self, upload_id: str):
+        """
+        Discards the spool of an upload, if it still exists.
+
+        :param upload_id:   The identifier of the upload.
+        """
+        spool_path = self.upload_spool_path(upload_id)
+
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+    @staticmethod
+    def upload_spool_path(upload_id: str) -> str:
+        """
+        Gets the path to the file that an upload is spooled into.
+
+        :param upload_id:   The identifier of the upload.
+        :return:            The spool path.
+        """
+        # Import the UFDL settings
+        from ...settings import core_settings
+
+        return os.path.join(core_settings.UPLOAD_SPOOL_DIRECTORY, upload_id)
+
     @abstractmethod
     def delete(self, handle: 'Handle'):
         """
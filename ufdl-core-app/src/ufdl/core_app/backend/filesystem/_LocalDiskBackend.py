@@ -1,5 +1,6 @@
 import hashlib
 import os
+import shutil
 from itertools import chain
 from typing import Union, IO, Optional, Iterable, Iterator
 
@@ -69,6 +70,65 @@ class LocalDiskBackend(FileSystemBackend):
 
         return handle
 
+    def commit_upload(self, upload_id: str, size: int) -> 'Handle':
+        spool_path = self.upload_spool_path(upload_id)
+        os.truncate(spool_path, size)
+
+        # Hash the spooled data a chunk at a time
+        hasher = hashlib.sha256()
+        for chunk in self.read_chunks(spool_path):
+            hasher.update(chunk)
+        hashcode = hasher.hexdigest()
+
+        # Get the directory to store the data in
+        directory = self.path_for_hashcode(hashcode)
+
+        # Get any files that share our hashcode in their filename
+        files_with_same_hashcode = (
+            [file for file in map(os.path.basename, os.listdir(directory)) if file.startswith(hashcode)]
+            if os.path.exists(directory) else []
+        )
+
+        # Return a handle to an existing file if it is identical
+        for handle in map(self.Handle.from_database_string, files_with_same_hashcode):
+            existing_path = os.path.join(directory, handle.to_database_string())
+            if self.all_bytes_equal(self.read_chunks(existing_path), self.read_chunks(spool_path)):
+                os.remove(spool_path)
+                return handle
+
+        # Find an unused tail value
+        used_tails = set(map(self.Handle.tail_from_database_string, files_with_same_hashcode))
+        next_unused_tail = None
+        while next_unused_tail in used_tails:
+            next_unused_tail = next_unused_tail + 1 if next_unused_tail is not None else 1
+
+        # Create a handle for the data
+        handle = self.Handle(hashcode, next_unused_tail)
+
+        # Make sure the directory exist
+        os.makedirs(directory, exist_ok=True)
+
+        # Move the spooled data into place
+        shutil.move(spool_path, os.path.join(directory, handle.to_database_string()))
+
+        return handle
+
+    @staticmethod
+    def read_chunks(path: str, chunk_size: int = 1024 * 1024) -> Iterator[bytes]:
+        """
+        Reads a file from disk a chunk at a time.
+
+        :param path:        The path to the file.
+        :param chunk_size:  The maximum size of each chunk.
+        :return:            An iterator over the file's chunks.
+        """
+        with open(path, 'rb') as file:
+            while True:
+                chunk = file.read(chunk_size)
+                if len(chunk) == 0:
+                    return
+                yield chunk
+
     def path_for_hashcode(self, hashcode: str):
         """
         Gets the path that a file with the given hashcode should be stored under.
@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class QuotaExceeded(APIException):
+    """
+    Exception for when an action would take a team over
+    one of its resource quotas.
+    """
+    status_code = status.HTTP_429_TOO_MANY_REQUESTS
+    default_code = 'quota_exceeded'
+
+    def __init__(self, team_name: str, resource: str, limit: int):
+        super().__init__(f"Team '{team_name}' has reached its quota of {limit} {resource}")
@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadIncomplete(APIException):
+    """
+    Exception for when an upload is committed before all of
+    its data has been received.
+    """
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_code = 'upload_incomplete'
+
+    def __init__(self, size: int, received: int):
+        super().__init__(f"Upload expected {size} bytes but {received} bytes have been received")
@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadOffsetMismatch(APIException):
+    """
+    Exception for when a part of an upload is sent at an offset
+    which would leave a gap in the uploaded data.
+    """
+    status_code = status.HTTP_409_CONFLICT
+    default_code = 'upload_offset_mismatch'
+
+    def __init__(self, offset: int, received: int):
+        super().__init__(f"Part sent at offset {offset} but only {received} bytes have been received")
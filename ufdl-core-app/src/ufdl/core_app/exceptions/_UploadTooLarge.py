@@ -0,0 +1,14 @@
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class UploadTooLarge(APIException):
+    """
+    Exception for when more data is sent to an upload than
+    the size declared when it was started.
+    """
+    status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
+    default_code = 'upload_too_large'
+
+    def __init__(self, size: int, received: int):
+        super().__init__(f"Upload declared {size} bytes but {received} bytes were sent")
@@ -27,5 +27,9 @@ from ._MissingParameter import MissingParameter
 from ._NodeAlreadyWorking import NodeAlreadyWorking
 from ._NotServerResidentType import NotServerResidentType
 from ._PermissionsUndefined import PermissionsUndefined
+from ._QuotaExceeded import QuotaExceeded
 from ._TypeIsAbstract import TypeIsAbstract
 from ._UnknownParameters import UnknownParameters
+from ._UploadIncomplete import UploadIncomplete
+from ._UploadOffsetMismatch import UploadOffsetMismatch
+from ._UploadTooLarge import UploadTooLarge
@@ -1 +1,9 @@
-from ._initialise import initialise, err
+from ._initialise import (
+    initialise,
+    current_registry_version,
+    err,
+    invalidate_registry,
+    is_subtype,
+    parse_type,
+    parse_contract
+)
@@ -1,14 +1,22 @@
 import importlib
 import re
+from threading import Lock
 from typing import Dict, List, NoReturn, Optional, Tuple
 
+from django.core.cache import cache
+from django.db import transaction
+
+from ufdl.jobcontracts.base import UFDLJobContract
 from ufdl.jobcontracts.initialise import initialise_server as initialise_contracts
+from ufdl.jobcontracts.util import parse_contract as _parse_contract
 
+from ufdl.jobtypes.base import UFDLType
 from ufdl.jobtypes.initialise import (
     initialise_server as initialise_types,
     ListFunction,
     DownloadFunction
 )
+from ufdl.jobtypes.util import parse_type as _parse_type
 
 from ufdl.json.core.filter import FilterSpec
 
@@ -74,22 +82,133 @@ def download_function(table_name: str, pk: int) -> bytes:
     raise NotImplementedError()
 
 
+# The cache key of the registry version shared by all server processes
+REGISTRY_VERSION_KEY: str = "ufdl-job-registry-version"
+
+# The version of the registry that this process last initialised (None if never)
+INITIALISED_VERSION: Optional[int] = None
+INITIALISE_LOCK: Lock = Lock()
+
+# Memoised results of parsing types/contracts against the current registry
+PARSED_TYPES: Dict[str, UFDLType] = {}
+PARSED_CONTRACTS: Dict[str, UFDLJobContract] = {}
+
+# Memoised sub-typing relationships between type strings
+SUBTYPE_CLOSURE: Dict[Tuple[str, str], bool] = {}
+
+
+def current_registry_version() -> int:
+    """
+    Gets the current version of the job-type/contract registry, as
+    shared between all server processes via the cache.
+
+    :return:    The registry version.
+    """
+    cache.add(REGISTRY_VERSION_KEY, 0, timeout=None)
+    return cache.get(REGISTRY_VERSION_KEY, 0)
+
+
+def invalidate_registry():
+    """
+    Marks the job-type/contract registry as out-of-date in all server
+    processes, once the current transaction commits. Should be called
+    whenever job types or contracts are added, changed or removed.
+    """
+    def invalidate():
+        cache.add(REGISTRY_VERSION_KEY, 0, timeout=None)
+        cache.incr(REGISTRY_VERSION_KEY)
+
+    transaction.on_commit(invalidate)
+
+
 def initialise(
         job_type_model,
         job_contract_model,
         list_function: ListFunction = list_function,
         download_function: DownloadFunction = download_function
 ):
-    initialise_types(
-        list_function,
-        download_function,
-        {
-            job_type.name: get_cls(job_type.cls)
-            for job_type in job_type_model.objects.all()
-        }
-    )
+    """
+    Initialises the job-type and job-contract registries from the database.
+    The registries are shared by all requests in the process, and are only
+    rebuilt when the registry version has changed since they were last built.
+    """
+    global INITIALISED_VERSION
+
+    # Nothing to do if the registry is up-to-date
+    version = current_registry_version()
+    if version == INITIALISED_VERSION:
+        return
+
+    with INITIALISE_LOCK:
+        # Another thread may have initialised while we waited for the lock
+        if version == INITIALISED_VERSION:
+            return
+
+        initialise_types(
+            list_function,
+            download_function,
+            {
+                job_type.name: get_cls(job_type.cls)
+                for job_type in job_type_model.objects.all()
+            }
+        )
+
+        initialise_contracts({
+            job_contract.name: get_cls(job_contract.cls)
+            for job_contract in job_contract_model.objects.all()
+        })
+
+        # Anything parsed against the old registry is now stale
+        PARSED_TYPES.clear()
+        PARSED_CONTRACTS.clear()
+        SUBTYPE_CLOSURE.clear()
+
+        INITIALISED_VERSION = version
+
+
+def parse_type(type_string: str) -> UFDLType:
+    """
+    Parses a type string against the current registry, memoising the result.
+
+    :param type_string:     The type string.
+    :return:                The parsed type.
+    """
+    parsed = PARSED_TYPES.get(type_string, None)
+
+    if parsed is None:
+        parsed = PARSED_TYPES[type_string] = _parse_type(type_string)
+
+    return parsed
+
+
+def parse_contract(contract_string: str) -> UFDLJobContract:
+    """
+    Parses a contract string against the current registry, memoising the result.
+
+    :param contract_string:     The contract string.
+    :return:                    The parsed contract.
+    """
+    parsed = PARSED_CONTRACTS.get(contract_string, None)
+
+    if parsed is None:
+        parsed = PARSED_CONTRACTS[contract_string] = _parse_contract(contract_string)
+
+    return parsed
+
+
+def is_subtype(subtype_string: str, supertype_string: str) -> bool:
+    """
+    Whether one type is a sub-type of another, memoising the result.
+
+    :param subtype_string:      The string of the candidate sub-type.
+    :param supertype_string:    The string of the candidate super-type.
+    :return:                    Whether the sub-type relationship holds.
+    """
+    key = (subtype_string, supertype_string)
+
+    result = SUBTYPE_CLOSURE.get(key, None)
+
+    if result is None:
+        result = SUBTYPE_CLOSURE[key] = parse_type(subtype_string).is_subtype_of(parse_type(supertype_string))
 
-    initialise_contracts({
-        job_contract.name: get_cls(job_contract.cls)
-        for job_contract in job_contract_model.objects.all()
-    })
\ No newline at end of file
+    return result
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding digest modes to email notifications.
+    """
+    dependencies = [
+        ('ufdl_core', '0007_job_contracts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emailnotification',
+            name='digest_mode',
+            field=models.CharField(choices=[('none', 'NONE'), ('window', 'WINDOW'), ('hierarchy', 'HIERARCHY')], default='none', max_length=16),
+        ),
+        migrations.RemoveConstraint(
+            model_name='emailnotification',
+            name='unique_email_notifications',
+        ),
+        migrations.AddConstraint(
+            model_name='emailnotification',
+            constraint=models.UniqueConstraint(fields=('subject', 'body', 'to', 'cc', 'bcc', 'digest_mode'), name='unique_email_notifications'),
+        ),
+    ]
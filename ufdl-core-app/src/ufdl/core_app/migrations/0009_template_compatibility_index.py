@@ -0,0 +1,44 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding the template-compatibility index, used to find
+    the job templates which can accept given input types.
+    """
+    dependencies = [
+        ('ufdl_core', '0008_email_notification_digests'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WorkableTemplateContract',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('contract', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indexed_templates', to='ufdl_core.jobcontract')),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indexed_contracts', to='ufdl_core.workabletemplate')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='WorkableTemplateInputType',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_name', models.CharField(max_length=128)),
+                ('type', models.CharField(max_length=256)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indexed_input_types', to='ufdl_core.workabletemplate')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='workabletemplatecontract',
+            constraint=models.UniqueConstraint(fields=('template', 'contract'), name='unique_workable_template_contracts'),
+        ),
+        migrations.AddConstraint(
+            model_name='workabletemplateinputtype',
+            constraint=models.UniqueConstraint(fields=('template', 'input_name', 'type'), name='unique_workable_template_input_types'),
+        ),
+        migrations.AddIndex(
+            model_name='workabletemplateinputtype',
+            index=models.Index(fields=['input_name', 'type'], name='workable_template_input_types'),
+        ),
+    ]
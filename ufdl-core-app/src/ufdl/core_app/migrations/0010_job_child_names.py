@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+from ..apps import UFDLCoreAppConfig
+from ._util import DataMigration
+
+
+def set_child_names(apps, schema_editor):
+    """
+    Sets the child name of existing child jobs from their descriptions,
+    which are of the form "child job '<name>' of meta-job ...".
+
+    :param apps:            The app registry.
+    :param schema_editor:   Unused.
+    """
+    # Get the job model
+    job_model = apps.get_model(UFDLCoreAppConfig.label, "Job")
+
+    child_jobs = list(job_model.objects.filter(parent__isnull=False).only("pk", "description"))
+
+    for job in child_jobs:
+        job.child_name = job.description[11:].split("'", maxsplit=1)[0]
+
+    job_model.objects.bulk_update(child_jobs, ["child_name"])
+
+
+class Migration(migrations.Migration):
+    """
+    Migration storing the name of each child job in its parent's workflow.
+    """
+    dependencies = [
+        ('ufdl_core', '0009_template_compatibility_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='child_name',
+            field=models.TextField(default=None, null=True),
+        ),
+        DataMigration(set_child_names)
+    ]
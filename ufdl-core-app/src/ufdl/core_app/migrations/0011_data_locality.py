@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Migration recording the files held in each node's cache, and the
+    files each job's inputs consist of, for placing jobs near their data.
+    """
+    dependencies = [
+        ('ufdl_core', '0010_job_child_names'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='node',
+            name='cached_files',
+            field=models.ManyToManyField(blank=True, related_name='cached_on_nodes', to='ufdl_core.File'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='input_files',
+            field=models.ManyToManyField(blank=True, related_name='+', to='ufdl_core.File'),
+        ),
+    ]
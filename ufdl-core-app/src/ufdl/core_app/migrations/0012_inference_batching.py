@@ -0,0 +1,19 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Migration allowing jobs to be worked in batches.
+    """
+    dependencies = [
+        ('ufdl_core', '0011_data_locality'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='batch',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='batched_jobs', to='ufdl_core.job'),
+        ),
+    ]
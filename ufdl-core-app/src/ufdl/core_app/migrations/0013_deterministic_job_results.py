@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Migration allowing the outputs of deterministic jobs to be reused.
+    """
+    dependencies = [
+        ('ufdl_core', '0012_inference_batching'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='workabletemplate',
+            name='deterministic',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='result_key',
+            field=models.CharField(db_index=True, default=None, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding sessions for uploading files in parts.
+    """
+    dependencies = [
+        ('ufdl_core', '0013_deterministic_job_results'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('creation_time', models.DateTimeField(auto_now_add=True)),
+                ('upload_id', models.CharField(editable=False, max_length=64)),
+                ('size', models.BigIntegerField(default=None, null=True)),
+                ('received', models.BigIntegerField(default=0, editable=False)),
+                ('creator', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='uploadsession',
+            constraint=models.UniqueConstraint(fields=('upload_id',), name='unique_upload_ids'),
+        ),
+    ]
@@ -0,0 +1,45 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding quotas on the resources consumed by teams.
+    """
+    dependencies = [
+        ('simple_django_teams', '0003_add_execute_permission'),
+        ('ufdl_core', '0014_upload_sessions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TeamQuota',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('max_queued_jobs', models.BigIntegerField(default=None, null=True)),
+                ('max_started_jobs', models.BigIntegerField(default=None, null=True)),
+                ('max_dataset_bytes', models.BigIntegerField(default=None, null=True)),
+                ('max_output_bytes', models.BigIntegerField(default=None, null=True)),
+                ('queued_jobs', models.BigIntegerField(default=0, editable=False)),
+                ('started_jobs', models.BigIntegerField(default=0, editable=False)),
+                ('dataset_bytes', models.BigIntegerField(default=0, editable=False)),
+                ('output_bytes', models.BigIntegerField(default=0, editable=False)),
+                ('team', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='quota', to='simple_django_teams.team')),
+            ],
+        ),
+        migrations.AddField(
+            model_name='file',
+            name='size',
+            field=models.BigIntegerField(default=None, null=True),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='team',
+            field=models.ForeignKey(default=None, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='simple_django_teams.team'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='quota_counter',
+            field=models.CharField(default=None, editable=False, max_length=16, null=True),
+        ),
+    ]
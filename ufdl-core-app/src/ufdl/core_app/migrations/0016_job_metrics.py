@@ -0,0 +1,71 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ..apps import UFDLCoreAppConfig
+from ._util import DataMigration
+
+
+# The filters selecting the jobs in each lifecycle phase, by phase number
+PHASE_FILTERS = {
+    0: ("CREATED", models.Q(start_time__isnull=True)),
+    1: ("STARTED", models.Q(start_time__isnull=False, end_time__isnull=True, error_reason__isnull=True)),
+    2: ("FINISHED", models.Q(start_time__isnull=False, end_time__isnull=False, error_reason__isnull=True)),
+    3: ("ERRORED", models.Q(start_time__isnull=False, end_time__isnull=False, error_reason__isnull=False)),
+    4: ("CANCELLED", models.Q(start_time__isnull=False, end_time__isnull=True, error_reason__isnull=False))
+}
+
+
+def count_existing_jobs(apps, schema_editor):
+    """
+    Counts the jobs which already exist in the metrics of their templates.
+    """
+    job_model = apps.get_model(UFDLCoreAppConfig.label, "Job")
+    job_metric_model = apps.get_model(UFDLCoreAppConfig.label, "JobMetric")
+
+    for phase, (phase_name, phase_filter) in PHASE_FILTERS.items():
+        jobs = job_model.objects.filter(phase_filter)
+
+        job_metric_model.objects.bulk_create([
+            job_metric_model(template_id=template_id, metric=f"phase:{phase_name}", count=count)
+            for template_id, count in (
+                jobs
+                .order_by()
+                .values_list("template_id")
+                .annotate(count=models.Count("pk"))
+            )
+        ])
+
+        jobs.update(metrics_phase=phase)
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding aggregate metrics about the jobs of each template.
+    """
+    dependencies = [
+        ('ufdl_core', '0015_team_quotas'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='JobMetric',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=32)),
+                ('bucket', models.PositiveSmallIntegerField(default=0)),
+                ('count', models.BigIntegerField(default=0)),
+                ('total', models.FloatField(default=0.0)),
+                ('template', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ufdl_core.jobtemplate')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='jobmetric',
+            constraint=models.UniqueConstraint(fields=('template', 'metric', 'bucket'), name='unique_job_metrics'),
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='metrics_phase',
+            field=models.PositiveSmallIntegerField(default=None, editable=False, null=True),
+        ),
+        DataMigration(count_existing_jobs),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding cached snapshots of the annotations of data-sets.
+    """
+    dependencies = [
+        ('ufdl_core', '0016_job_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DatasetSnapshot',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('file_format', models.CharField(max_length=16)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('data', models.ForeignKey(on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='ufdl_core.file')),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ufdl_core.dataset')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='datasetsnapshot',
+            constraint=models.UniqueConstraint(fields=('dataset', 'file_format'), name='unique_dataset_snapshots'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+from datetime import timedelta
+
+from django.db import migrations, models
+import django.utils.timezone
+
+from ..apps import UFDLCoreAppConfig
+from ._util import DataMigration
+
+
+def set_expiry_times(apps, schema_editor):
+    """
+    Gives the existing upload sessions the default lifetime from their creation.
+    """
+    upload_session_model = apps.get_model(UFDLCoreAppConfig.label, "UploadSession")
+
+    upload_session_model.objects.update(expiry_time=models.F("creation_time") + timedelta(days=1))
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding expiry times to upload sessions, so that
+    abandoned uploads can be discarded.
+    """
+    dependencies = [
+        ('ufdl_core', '0017_dataset_snapshots'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='uploadsession',
+            name='expiry_time',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+            preserve_default=False,
+        ),
+        DataMigration(set_expiry_times),
+    ]
@@ -1,5 +1,6 @@
+from hashlib import sha256
 from io import BytesIO
-from typing import Iterator, Tuple, Optional, List
+from typing import Dict, Iterator, Tuple, Optional, List
 from zipfile import ZipFile
 from tarfile import TarFile, TarInfo
 
@@ -10,12 +11,13 @@ from simple_django_teams.models import Team
 
 from ..apps import UFDLCoreAppConfig
 from ..exceptions import *
-from ..util import QueryParameterValue, for_user, format_suffix, max_value
+from ..util import QueryParameterValue, Column, for_user, format_suffix, max_value, pk_fingerprint, write_npz
 from .files import FileReference
 from .mixins import (
     PublicModel, PublicQuerySet, AsFileModel, CopyableModel, FileContainerModel, UserRestrictedQuerySet,
     MergableModel
 )
+from ._TeamQuota import TeamQuota
 
 
 class DatasetQuerySet(UserRestrictedQuerySet, PublicQuerySet, SoftDeleteQuerySet):
@@ -91,6 +93,10 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
 
     file_formats = {"zip", "tar.gz"}
 
+    # The version of the columns produced by snapshot_columns. Should be
+    # incremented whenever the columns change, to invalidate cached snapshots
+    SNAPSHOT_VERSION: int = 1
+
     class Meta(SoftDeleteModel.Meta):
         constraints = [
             # Ensure that each dataset has a unique name/version pair for the project
@@ -170,6 +176,7 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
 
             # If we copied a file from the source data-set, add it to our files
             if destination_file_reference is not self_file_reference:
+                self.adjust_storage_quota(destination_file_reference.file.size)
                 self.files.add(destination_file_reference)
 
             # Update the mapping
@@ -282,7 +289,12 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
         merge_files = []
 
         # Add our files to the new dataset
-        for reference in (self.files.all() if only_files is None else self.files.with_filenames(*only_files)):
+        references = list(
+            (self.files.all() if only_files is None else self.files.with_filenames(*only_files))
+            .select_related("file__file")
+        )
+        new_dataset.adjust_storage_quota(sum(reference.file.size for reference in references))
+        for reference in references:
             new_file = reference.copy()
             merge_files.append((reference, new_file))
             new_dataset.files.add(new_file)
@@ -292,6 +304,10 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
 
         return new_dataset
 
+    def supports_file_format(self, file_format: str):
+        # Snapshot formats are only supported by some domains
+        return file_format in self.domain_specific.file_formats
+
     def default_format(self) -> str:
         return "zip"
 
@@ -317,6 +333,11 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
             UnknownParameters.ensure_empty(parameters)
 
             return self.as_tar_gz()
+        elif file_format == "npz" and self.supports_file_format(file_format):
+            # Shouldn't be any parameters
+            UnknownParameters.ensure_empty(parameters)
+
+            return self.domain_specific.as_npz()
         else:
             raise ValueError(f"Unknown archive format '{file_format}'; options are {self.file_formats}")
 
@@ -376,6 +397,77 @@ class Dataset(MergableModel, FileContainerModel, CopyableModel, AsFileModel, Tea
 
         return tar_buffer.read()
 
+    def as_npz(self) -> bytes:
+        """
+        Gets a columnar snapshot of the annotations of this data-set, as an
+        uncompressed NumPy .npz archive. The snapshot is cached in the file-system
+        backend until the annotations of the data-set change.
+
+        :return:    The .npz file in an in-memory buffer.
+        """
+        # Local import to avoid circular reference error
+        from ._DatasetSnapshot import DatasetSnapshot
+
+        return DatasetSnapshot.get_data(
+            self,
+            "npz",
+            self.snapshot_fingerprint(),
+            lambda: write_npz(self.snapshot_columns())
+        )
+
+    def snapshot_fingerprint(self) -> str:
+        """
+        Gets a fingerprint of the current state of this data-set's files
+        and annotations, which changes whenever they do.
+
+        :return:    The fingerprint.
+        """
+        parts = [str(self.SNAPSHOT_VERSION), pk_fingerprint(self.files.all())]
+        parts.extend(pk_fingerprint(query_set) for query_set in self.snapshot_query_sets())
+
+        return sha256(" ".join(parts).encode()).hexdigest()
+
+    def snapshot_query_sets(self) -> List[models.QuerySet]:
+        """
+        Gets the query-sets of the rows holding this data-set's annotations.
+        As annotation rows are only ever added and removed (never updated
+        in-place), these determine the fingerprint of the annotations.
+
+        :return:    The annotation query-sets.
+        """
+        # Default implementation has no annotations
+        return []
+
+    def snapshot_columns(self) -> Dict[str, Column]:
+        """
+        Gets the columns of the columnar snapshot of this data-set's annotations.
+
+        :return:    The columns, by name.
+        """
+        raise NotImplementedError(self.snapshot_columns.__qualname__)
+
+    def adjust_storage_quota(self, num_bytes: int, check: bool = True):
+        TeamQuota.adjust(self.project.team_id, check, dataset_bytes=num_bytes)
+
+    def pre_delete(self):
+        # Return the storage of an active data-set to its team's quota
+        if self.deletion_time is None:
+            num_bytes = self.files.aggregate(total=models.Sum("file__file__size"))["total"] or 0
+            self.adjust_storage_quota(-num_bytes, False)
+
+    @classmethod
+    def pre_delete_bulk(cls, query_set):
+        # Return the storage of the active data-sets to their teams' quotas
+        for team_id, num_bytes in (
+                query_set
+                .filter(deletion_time__isnull=True)
+                .order_by()
+                .values("project__team_id")
+                .annotate(total=models.Sum("files__file__file__size"))
+                .values_list("project__team_id", "total")
+        ):
+            TeamQuota.adjust(team_id, False, dataset_bytes=-(num_bytes or 0))
+
     def get_owning_team(self):
         return self.project.team
 
@@ -0,0 +1,92 @@
+from typing import Callable
+
+from django.db import models, transaction
+
+from ..apps import UFDLCoreAppConfig
+
+
+class DatasetSnapshotQuerySet(models.QuerySet):
+    """
+    Custom query-set for working with groups of data-set snapshots.
+    """
+    pass
+
+
+class DatasetSnapshot(models.Model):
+    """
+    A cached snapshot of the annotations of a data-set in a derived file format.
+    The snapshot data is stored in the file-system backend (which addresses data
+    by its content hash), and is reused for as long as the fingerprint of the
+    data-set's annotations is unchanged.
+    """
+    # The data-set the snapshot is of
+    dataset = models.ForeignKey(f"{UFDLCoreAppConfig.label}.Dataset",
+                                on_delete=models.CASCADE,
+                                related_name="+")
+
+    # The file format of the snapshot
+    file_format = models.CharField(max_length=16)
+
+    # The fingerprint of the data-set's annotations when the snapshot was taken
+    fingerprint = models.CharField(max_length=64)
+
+    # The snapshot data
+    data = models.ForeignKey(f"{UFDLCoreAppConfig.label}.File",
+                             on_delete=models.DO_NOTHING,
+                             related_name="+")
+
+    objects = DatasetSnapshotQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure that each data-set has at most one snapshot per format
+            models.UniqueConstraint(name="unique_dataset_snapshots",
+                                    fields=["dataset", "file_format"])
+        ]
+
+    @classmethod
+    def get_data(cls, dataset, file_format: str, fingerprint: str, build: Callable[[], bytes]) -> bytes:
+        """
+        Gets the data of a snapshot of a data-set, building (and caching)
+        it if there is no snapshot with a matching fingerprint.
+
+        :param dataset:         The data-set.
+        :param file_format:     The file format of the snapshot.
+        :param fingerprint:     The current fingerprint of the data-set's annotations.
+        :param build:           Function which builds the snapshot data.
+        :return:                The snapshot data.
+        """
+        # Local import to avoid circular reference error
+        from .files import File
+
+        # Reuse the existing snapshot if it is still current
+        snapshot = cls.objects.filter(dataset=dataset, file_format=file_format).select_related("data").first()
+        if snapshot is not None and snapshot.fingerprint == fingerprint:
+            return snapshot.data.get_data()
+
+        # Build a new snapshot and store it in the backend
+        data = build()
+        file = File.create(data)
+
+        with transaction.atomic():
+            snapshot, created = cls.objects.select_for_update().get_or_create(
+                dataset=dataset,
+                file_format=file_format,
+                defaults={"fingerprint": fingerprint, "data": file}
+            )
+
+            previous_file = None
+            if not created:
+                previous_file = snapshot.data
+                snapshot.fingerprint = fingerprint
+                snapshot.data = file
+                snapshot.save(update_fields=["fingerprint", "data"])
+
+        # Release the superseded snapshot data (only deleted if nothing else references it)
+        if previous_file is not None and previous_file.pk != file.pk:
+            previous_file.delete()
+
+        return data
+
+    def __str__(self):
+        return f"Snapshot of {self.dataset} as {self.file_format}"
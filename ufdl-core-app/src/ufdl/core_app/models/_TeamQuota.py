@@ -0,0 +1,151 @@
+from typing import Dict, Optional
+
+from django.db import models
+from simple_django_teams.models import Team
+
+from ..exceptions import QuotaExceeded
+
+
+class TeamQuotaQuerySet(models.QuerySet):
+    """
+    Custom query-set for working with groups of team quotas.
+    """
+    pass
+
+
+class TeamQuota(models.Model):
+    """
+    The limits on the resources a team can consume, along with counters of the
+    resources it currently consumes. The counters are adjusted as resources
+    are acquired and released, so that checking a limit never requires
+    counting the team's jobs or files.
+    """
+    # The team the quota applies to
+    team = models.OneToOneField(Team,
+                                on_delete=models.CASCADE,
+                                related_name="quota")
+
+    # The limits (None for no limit)
+    max_queued_jobs = models.BigIntegerField(null=True, default=None)
+    max_started_jobs = models.BigIntegerField(null=True, default=None)
+    max_dataset_bytes = models.BigIntegerField(null=True, default=None)
+    max_output_bytes = models.BigIntegerField(null=True, default=None)
+
+    # The number of the team's workable jobs waiting to be started
+    queued_jobs = models.BigIntegerField(default=0, editable=False)
+
+    # The number of the team's workable jobs currently being worked
+    started_jobs = models.BigIntegerField(default=0, editable=False)
+
+    # The total size of the files in the team's datasets
+    dataset_bytes = models.BigIntegerField(default=0, editable=False)
+
+    # The total size of the outputs of the team's workable jobs
+    output_bytes = models.BigIntegerField(default=0, editable=False)
+
+    objects = TeamQuotaQuerySet.as_manager()
+
+    # The limit field for each counter
+    COUNTERS: Dict[str, str] = {
+        "queued_jobs": "max_queued_jobs",
+        "started_jobs": "max_started_jobs",
+        "dataset_bytes": "max_dataset_bytes",
+        "output_bytes": "max_output_bytes"
+    }
+
+    @classmethod
+    def for_team(cls, team_id: int) -> 'TeamQuota':
+        """
+        Gets the quota of a team, creating it with the default
+        limits from the settings if it doesn't exist yet.
+
+        :param team_id:     The primary key of the team.
+        :return:            The team's quota.
+        """
+        # Local import to avoid circular reference error
+        from ..settings import core_settings
+
+        quota, _ = cls.objects.get_or_create(
+            team_id=team_id,
+            defaults={
+                "max_queued_jobs": core_settings.DEFAULT_TEAM_QUEUED_JOBS_QUOTA or None,
+                "max_started_jobs": core_settings.DEFAULT_TEAM_STARTED_JOBS_QUOTA or None,
+                "max_dataset_bytes": core_settings.DEFAULT_TEAM_DATASET_BYTES_QUOTA or None,
+                "max_output_bytes": core_settings.DEFAULT_TEAM_OUTPUT_BYTES_QUOTA or None
+            }
+        )
+
+        return quota
+
+    @classmethod
+    def adjust(cls, team_id: Optional[int], check: bool = True, **deltas: int):
+        """
+        Adjusts the resource counters of a team in a single update. If checking,
+        the update only succeeds if no counter which is being increased would go
+        over its limit, so concurrent adjustments can't jointly exceed a quota.
+
+        :param team_id:     The primary key of the team, or None if the resources
+                            don't belong to a team (in which case this is a no-op).
+        :param check:       Whether to enforce the limits of increased counters.
+        :param deltas:      The amount to change each counter by.
+        """
+        # Remove any non-changes
+        deltas = {counter: delta for counter, delta in deltas.items() if delta != 0}
+
+        if team_id is None or len(deltas) == 0:
+            return
+
+        # Make sure the team has a quota to adjust
+        cls.for_team(team_id)
+
+        query_set = cls.objects.filter(team_id=team_id)
+
+        # Only update if the increased counters stay within their limits
+        if check:
+            for counter, delta in deltas.items():
+                if delta > 0:
+                    limit = cls.COUNTERS[counter]
+                    query_set = query_set.filter(
+                        models.Q(**{f"{limit}__isnull": True}) |
+                        models.Q(**{f"{counter}__lte": models.F(limit) - delta})
+                    )
+
+        while True:
+            num_updated = query_set.update(**{
+                counter: models.F(counter) + delta
+                for counter, delta in deltas.items()
+            })
+
+            if num_updated != 0:
+                return
+
+            # If the update didn't apply, report the first limit that would have been
+            # exceeded (or try again if resources were released in the meantime)
+            quota = cls.objects.select_related("team").get(team_id=team_id)
+            for counter, delta in deltas.items():
+                limit = getattr(quota, cls.COUNTERS[counter])
+                if delta > 0 and limit is not None and getattr(quota, counter) + delta > limit:
+                    raise QuotaExceeded(quota.team.name, counter.replace("_", " "), limit)
+
+    @classmethod
+    def check_available(cls, team_id: Optional[int], **amounts: int):
+        """
+        Checks that a team has room in its quota for the given amounts of resources,
+        without reserving them. Used to reject work before it is done when the
+        resources can't be reserved until afterwards.
+
+        :param team_id:     The primary key of the team, or None if the resources
+                            don't belong to a team (in which case this is a no-op).
+        :param amounts:     The amount of each resource required.
+        """
+        if team_id is None:
+            return
+
+        quota = cls.for_team(team_id)
+        for counter, amount in amounts.items():
+            limit = getattr(quota, cls.COUNTERS[counter])
+            if amount > 0 and limit is not None and getattr(quota, counter) + amount > limit:
+                raise QuotaExceeded(quota.team.name, counter.replace("_", " "), limit)
+
+    def __str__(self):
+        return f"Quota for team {self.team_id}"
@@ -2,9 +2,11 @@
 Package defining the relational models for the UFDL API.
 """
 from ._Dataset import Dataset, DatasetQuerySet
+from ._DatasetSnapshot import DatasetSnapshot, DatasetSnapshotQuerySet
 from ._DataDomain import DataDomain, DataDomainQuerySet
 from ._LogEntry import LogEntry, LogEntryQuerySet
 from ._Project import Project, ProjectQuerySet
+from ._TeamQuota import TeamQuota, TeamQuotaQuerySet
 from ._User import User
 
 # Include all of the sub-package models as well
@@ -1,7 +1,10 @@
+from time import perf_counter_ns
+
 from django.db import models
 from simple_django_teams.mixins import SoftDeleteModel
 
 from ...backend.filesystem import FileSystemBackend
+from ...profiling import Profiler
 from ..mixins import DeleteOnNoRemainingReferencesOnlyModel, DeleteOnNoRemainingReferencesOnlyQuerySet
 
 
@@ -30,6 +33,9 @@ class File(DeleteOnNoRemainingReferencesOnlyModel, models.Model):
     # The handle to the file data in the file-system backend
     handle = models.CharField(max_length=FileSystemBackend.Handle.MAX_STRING_REPR_LENGTH)
 
+    # The size of the file data in bytes (None for files stored before sizes were recorded)
+    size = models.BigIntegerField(null=True, default=None)
+
     objects = FileQuerySet.as_manager()
 
     class Meta(SoftDeleteModel.Meta):
@@ -50,7 +56,11 @@ class File(DeleteOnNoRemainingReferencesOnlyModel, models.Model):
         from ...backend.filesystem import FileSystemBackend
         backend: FileSystemBackend = core_settings.FILESYSTEM_BACKEND.instance()
 
-        return backend.load(backend.Handle.from_database_string(self.handle))
+        start_ns = perf_counter_ns()
+        data = backend.load(backend.Handle.from_database_string(self.handle))
+        Profiler.add_backend_io(len(data), start_ns)
+
+        return data
 
     @classmethod
     def create(cls, data: bytes) -> 'File':
@@ -67,15 +77,56 @@ class File(DeleteOnNoRemainingReferencesOnlyModel, models.Model):
         backend: FileSystemBackend = core_settings.FILESYSTEM_BACKEND.instance()
 
         # Save the data to the file-system
+        start_ns = perf_counter_ns()
         handle: FileSystemBackend.Handle = backend.save(data)
+        Profiler.add_backend_io(len(data), start_ns)
 
+        return cls.for_handle(handle, len(data))
+
+    @classmethod
+    def create_from_upload(cls, upload_id: str, size: int) -> 'File':
+        """
+        Stores the data spooled by a part-wise upload in the backend
+        file-system and returns a reference to it.
+
+        :param upload_id:   The backend's identifier for the upload.
+        :param size:        The number of bytes uploaded.
+        :return:            The file record.
+        """
+        # Get the file-system backend from the settings
+        from ...settings import core_settings
+        from ...backend.filesystem import FileSystemBackend
+        backend: FileSystemBackend = core_settings.FILESYSTEM_BACKEND.instance()
+
+        # Move the spooled data into the file-system
+        start_ns = perf_counter_ns()
+        handle: FileSystemBackend.Handle = backend.commit_upload(upload_id, size)
+        Profiler.add_backend_io(size, start_ns)
+
+        return cls.for_handle(handle, size)
+
+    @classmethod
+    def for_handle(cls, handle: FileSystemBackend.Handle, size: int) -> 'File':
+        """
+        Gets the file record for a handle to data in the backend
+        file-system, creating it if it doesn't exist.
+
+        :param handle:  The backend handle.
+        :param size:    The size of the data in bytes.
+        :return:        The file record.
+        """
         # See if an existing handle was returned
-        existing = File.objects.with_handle(handle.to_database_string())
-        if len(existing) != 0:
-            return existing.first()
+        existing = File.objects.with_handle(handle.to_database_string()).first()
+        if existing is not None:
+            # Record the size if it wasn't known when the file was first stored
+            if existing.size is None:
+                existing.size = size
+                existing.save(update_fields=["size"])
+
+            return existing
 
         # Create a file reference to remember the handle
-        file = File(handle=handle.to_database_string())
+        file = File(handle=handle.to_database_string(), size=size)
 
         # Save it
         file.save()
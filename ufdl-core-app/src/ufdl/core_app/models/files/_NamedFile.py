@@ -50,6 +50,13 @@ class NamedFile(CopyableModel, DeleteOnNoRemainingReferencesOnlyModel, models.Mo
         """
         return self.name.filename
 
+    @property
+    def size(self) -> int:
+        """
+        The size of the file's data in bytes, or 0 if not known.
+        """
+        return self.file.size or 0 if self.file is not None else 0
+
     class Meta(SoftDeleteModel.Meta):
         constraints = [
             # Ensure that each combination of name and file is only stored once
@@ -0,0 +1,167 @@
+from datetime import timedelta
+from time import perf_counter_ns
+from typing import Iterable
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils.timezone import now
+
+from ...exceptions import UploadIncomplete, UploadOffsetMismatch, UploadTooLarge
+from ...profiling import Profiler
+from ...util import accumulate_delete
+from ..mixins import UserRestrictedQuerySet
+from ._File import File
+
+
+class UploadSessionQuerySet(UserRestrictedQuerySet):
+    """
+    Additional functionality for working with query-sets of upload sessions.
+    """
+    def for_user(self, user):
+        # Users can only access the uploads they started
+        return self.filter(creator=user)
+
+    def expired(self):
+        """
+        Filters the query-set to those sessions which have gone too
+        long without receiving a part.
+        """
+        return self.filter(expiry_time__lt=now())
+
+    def delete(self):
+        # Keep a tally of items deleted
+        deletion_accumulator = 0, {}
+
+        # Delete all sessions individually, so their spools are discarded
+        for instance in self.all():
+            deletion_accumulator = accumulate_delete(deletion_accumulator, instance.delete())
+
+        return deletion_accumulator
+
+
+class UploadSession(models.Model):
+    """
+    A file which is being uploaded in parts. The parts are spooled by the
+    file-system backend until the session is committed, at which point the
+    data becomes a file which can be attached to other objects.
+    """
+    # The user uploading the file
+    creator = models.ForeignKey(settings.AUTH_USER_MODEL,
+                                on_delete=models.CASCADE,
+                                related_name="+",
+                                editable=False)
+
+    # The time the upload was started
+    creation_time = models.DateTimeField(auto_now_add=True,
+                                         editable=False)
+
+    # The backend's identifier for the spooled data
+    upload_id = models.CharField(max_length=64,
+                                 editable=False)
+
+    # The total size of the file in bytes, if declared by the uploader
+    size = models.BigIntegerField(null=True, default=None)
+
+    # The number of bytes of the file received so far
+    received = models.BigIntegerField(default=0, editable=False)
+
+    # The time after which the upload is discarded, extended whenever a part is received
+    expiry_time = models.DateTimeField(editable=False)
+
+    objects = UploadSessionQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure each spool belongs to a single session
+            models.UniqueConstraint(name="unique_upload_ids",
+                                    fields=["upload_id"])
+        ]
+
+    @staticmethod
+    def backend():
+        """
+        Gets the file-system backend that uploads are spooled by.
+        """
+        # Get the file-system backend from the settings
+        from ...settings import core_settings
+        return core_settings.FILESYSTEM_BACKEND.instance()
+
+    @staticmethod
+    def lifetime() -> timedelta:
+        """
+        Gets the length of time an upload can go without receiving a part.
+        """
+        from ...settings import core_settings
+        return timedelta(seconds=core_settings.UPLOAD_SESSION_LIFETIME)
+
+    def save(self, *args, **kwargs):
+        # Start spooling when the session is first created
+        if self.upload_id == "":
+            # Discard any abandoned uploads while we're at it
+            UploadSession.objects.expired().delete()
+
+            self.upload_id = self.backend().begin_upload()
+            self.expiry_time = now() + self.lifetime()
+
+        super().save(*args, **kwargs)
+
+    def write_part(self, offset: int, chunks: Iterable[bytes]):
+        """
+        Writes a part of the file. Parts may be re-sent (e.g. after a dropped
+        connection) but can't leave a gap in the data received so far. Should
+        be called on a session locked with select_for_update.
+
+        :param offset:  The offset into the file at which the part starts.
+        :param chunks:  The data of the part.
+        """
+        # Can't leave a gap after the data already received
+        if offset < 0 or offset > self.received:
+            raise UploadOffsetMismatch(offset, self.received)
+
+        start_ns = perf_counter_ns()
+        written = self.backend().write_upload_part(self.upload_id, offset, chunks)
+        Profiler.add_backend_io(written, start_ns)
+
+        # Can't send more data than was declared (any excess in the spool
+        # is discarded on commit)
+        if self.size is not None and offset + written > self.size:
+            raise UploadTooLarge(self.size, offset + written)
+
+        self.received = max(self.received, offset + written)
+        self.expiry_time = now() + self.lifetime()
+        self.save(update_fields=["received", "expiry_time"])
+
+    @transaction.atomic
+    def commit(self) -> File:
+        """
+        Finishes the upload, storing the received data as a file. The spooled
+        data is consumed even if the enclosing transaction is rolled back, so
+        anything which could fail should be checked before calling this.
+
+        :return:    The file record.
+        """
+        # Must have received all data if the size was declared
+        if self.size is not None and self.received != self.size:
+            raise UploadIncomplete(self.size, self.received)
+
+        file = File.create_from_upload(self.upload_id, self.received)
+
+        # The spool has been consumed, so the session is no longer needed
+        super().delete()
+
+        return file
+
+    def delete(self, using=None, keep_parents=False):
+        # Keep a reference to our spool
+        upload_id = self.upload_id
+
+        deletion_accumulator = super().delete(using, keep_parents)
+
+        # Discard the spooled data, but only once the deletion can no longer be rolled back
+        backend = self.backend()
+        transaction.on_commit(lambda: backend.abort_upload(upload_id), using)
+
+        return deletion_accumulator
+
+    def __str__(self):
+        return f"Upload #{self.pk} ({self.received} bytes received)"
@@ -6,3 +6,4 @@ from ._File import File, FileQuerySet
 from ._Filename import Filename, FilenameQuerySet
 from ._FileReference import FileReference, FileReferenceQuerySet
 from ._NamedFile import NamedFile, NamedFileQuerySet
+from ._UploadSession import UploadSession, UploadSessionQuerySet
@@ -1,10 +1,13 @@
+import hashlib
+import json
 from enum import Enum
-from typing import Optional, Union, Tuple, Dict
+from typing import Optional, Union, Set, Tuple, Dict, List
 
-from django.db import models
+from django.db import models, transaction
 from django.utils.timezone import now
 
 from simple_django_teams.mixins import SoftDeleteModel, SoftDeleteQuerySet
+from simple_django_teams.models import Membership, Team
 
 from ufdl.json.core.jobs.notification import (
     NotificationActions,
@@ -15,11 +18,14 @@ from wai.json.raw import RawJSONElement, RawJSONObject
 
 from ...apps import UFDLCoreAppConfig
 from ...exceptions import *
+from ...notifications import get_notification_queue, NotificationEvent
 from ...settings import core_settings
-from ..files import File
+from ..files import File, UploadSession
 from ..nodes import Node
+from .._TeamQuota import TeamQuota
 from .._User import User
 from .notifications import *
+from ._JobMetric import JobMetric
 from ._JobOutput import JobOutput, JobOutputQuerySet
 
 
@@ -38,7 +44,47 @@ class JobQuerySet(SoftDeleteQuerySet):
     """
     A query-set over jobs.
     """
-    pass
+    def awaiting_node(self):
+        """
+        Filters the query-set to those workable jobs which are
+        waiting to be acquired by a node.
+        """
+        return self.active().filter(
+            template__workabletemplate__isnull=False,
+            node__isnull=True,
+            start_time__isnull=True
+        )
+
+    def within_started_quota(self):
+        """
+        Excludes those jobs whose team has already reached its
+        limit on the number of jobs being worked at once.
+        """
+        return self.exclude(
+            team__quota__max_started_jobs__isnull=False,
+            team__quota__started_jobs__gte=models.F("team__quota__max_started_jobs")
+        )
+
+    def successfully_finished(self):
+        """
+        Filters the query-set to those jobs which finished without error.
+        """
+        return self.active().filter(end_time__isnull=False, error_reason__isnull=True)
+
+    def by_locality_to(self, node: Node):
+        """
+        Orders the query-set so that the jobs with the most input files already
+        held in the given node's cache come first, oldest first among equals.
+
+        :param node:    The node.
+        :return:        The ordered query-set.
+        """
+        return self.annotate(
+            num_cached_input_files=models.Count(
+                "input_files",
+                filter=models.Q(input_files__cached_on_nodes=node)
+            )
+        ).order_by("-num_cached_input_files", "pk")
 
 
 class Job(SoftDeleteModel):
@@ -119,12 +165,34 @@ class Job(SoftDeleteModel):
     # A brief description of the job
     description = models.TextField(blank=True)
 
+    # The name of this job in the parent workflow (if it has a parent)
+    child_name = models.TextField(null=True, default=None)
+
     # The inputs to the job
     input_values = models.TextField()
 
     # The arguments to the job template's parameters
     parameter_values = models.TextField(null=True)
 
+    # The team whose quota the job is charged to (if any)
+    team = models.ForeignKey(
+        Team,
+        on_delete=models.DO_NOTHING,
+        related_name="+",
+        null=True,
+        default=None
+    )
+
+    # Hash identifying the result of the job, if its template is deterministic
+    result_key = models.CharField(max_length=64, null=True, default=None, db_index=True)
+
+    # The files that the inputs to the job consist of (datasets, models, etc.)
+    input_files = models.ManyToManyField(
+        f"{UFDLCoreAppConfig.label}.File",
+        related_name="+",
+        blank=True
+    )
+
     # endregion
 
     # region Lifecycle Fields
@@ -138,6 +206,15 @@ class Job(SoftDeleteModel):
         default=None
     )
 
+    # The job this job is being worked in a batch with (if any)
+    batch = models.ForeignKey(
+        f"{UFDLCoreAppConfig.label}.Job",
+        on_delete=models.DO_NOTHING,
+        related_name="batched_jobs",
+        null=True,
+        default=None
+    )
+
     # The time the job was started
     start_time = models.DateTimeField(
         null=True,
@@ -161,6 +238,22 @@ class Job(SoftDeleteModel):
     # The last progress made on the job
     progress_amount = models.FloatField(default=0.0)
 
+    # The counter of the team's quota that currently includes this job. None
+    # if the job isn't charged to a quota, empty once the job no longer counts
+    quota_counter = models.CharField(
+        max_length=16,
+        null=True,
+        default=None,
+        editable=False
+    )
+
+    # The lifecycle phase the job is currently counted in by its template's metrics
+    metrics_phase = models.PositiveSmallIntegerField(
+        null=True,
+        default=None,
+        editable=False
+    )
+
     # endregion
 
     objects = JobQuerySet.as_manager()
@@ -184,19 +277,6 @@ class Job(SoftDeleteModel):
         """
         return self.parent is not None
 
-    @property
-    def child_name(self) -> str:
-        """
-        Gets the name of this job in the parent workflow.
-
-        :return:
-                    The child name.
-        """
-        assert self.has_parent, "Job is not a child"
-
-        # Get our name from our description
-        return self.description[11:].split("'", maxsplit=1)[0]
-
     @property
     def full_child_name(self) -> str:
         """
@@ -237,8 +317,136 @@ class Job(SoftDeleteModel):
         """
         return f"Job-{self.pk}"
 
+    @property
+    def websocket_group_names(self) -> List[str]:
+        """
+        The names of all groups that this job should broadcast transitions to:
+        its own group, the group of its job hierarchy, the group of the node
+        working the job, and the groups of the teams its creator belongs to.
+        """
+        group_names = [
+            self.websocket_group_name,
+            f"JobHierarchy-{self.top_level_parent.pk}"
+        ]
+
+        if self.node_id is not None:
+            group_names.append(f"Node-{self.node_id}")
+
+        group_names.extend(
+            f"Team-{team_pk}"
+            for team_pk in Membership.objects.filter(
+                user_id=self.creator_id,
+                deletion_time__isnull=True
+            ).values_list("team_id", flat=True)
+        )
+
+        return group_names
+
     # endregion
 
+    @staticmethod
+    def resolve_input_files(input_values: Dict[str, Tuple[RawJSONElement, str]]) -> Set[int]:
+        """
+        Gets the primary keys of the files that a set of job input values refer
+        to, for those inputs which are server-resident datasets, pre-trained
+        models or the outputs of other jobs.
+
+        :param input_values:
+                    The input values, as a map from input name to value/type-string pairs.
+        :return:
+                    The primary keys of the files.
+        """
+        # Local import to avoid circular reference error
+        from .. import Dataset, PreTrainedModel
+
+        # The path from each type of server-resident input to its files
+        file_lookups = {
+            "Dataset": (Dataset, "files__file__file"),
+            "PretrainedModel": (PreTrainedModel, "data__file"),
+            "JobOutput": (JobOutput, "data"),
+            "job_output": (JobOutput, "data")
+        }
+
+        # Group the primary keys of the referenced objects by the model they belong to
+        pks: Dict[str, Set[int]] = {}
+        for value, type_string in input_values.values():
+            type_name = type_string.split("<", 1)[0]
+            if type_name not in file_lookups:
+                continue
+
+            try:
+                pks.setdefault(type_name, set()).add(int(value))
+            except (TypeError, ValueError):
+                # Only inputs referenced by primary key can be resolved
+                continue
+
+        file_pks = set()
+        for type_name, type_pks in pks.items():
+            model, file_path = file_lookups[type_name]
+            file_pks.update(
+                file_pk
+                for file_pk in model.objects.filter(pk__in=type_pks).values_list(file_path, flat=True)
+                if file_pk is not None
+            )
+
+        return file_pks
+
+    @staticmethod
+    def resolve_input_fingerprint(
+            input_values: Dict[str, Tuple[RawJSONElement, str]],
+            input_file_pks: Set[int]
+    ) -> str:
+        """
+        Gets a fingerprint of the current contents of the server-resident inputs
+        to a job, which changes whenever the files or annotations of those inputs do.
+
+        :param input_values:
+                    The input values, as a map from input name to value/type-string pairs.
+        :param input_file_pks:
+                    The primary keys of the files the inputs consist of (see resolve_input_files).
+        :return:
+                    The fingerprint.
+        """
+        # Local import to avoid circular reference error
+        from .. import Dataset
+
+        dataset_pks = set()
+        for value, type_string in input_values.values():
+            if type_string.split("<", 1)[0] != "Dataset":
+                continue
+
+            try:
+                dataset_pks.add(int(value))
+            except (TypeError, ValueError):
+                # Only inputs referenced by primary key can be resolved
+                continue
+
+        parts = [",".join(map(str, sorted(input_file_pks)))]
+
+        # Datasets can also change by their annotations, which aren't files
+        parts.extend(
+            f"{dataset.pk}:{dataset.domain_specific.snapshot_fingerprint()}"
+            for dataset in Dataset.objects.filter(pk__in=dataset_pks).select_related("domain").order_by("pk")
+        )
+
+        return hashlib.sha256(" ".join(parts).encode()).hexdigest()
+
+    @classmethod
+    def bulk_set_input_files(cls, jobs: List['Job'], file_pks: Set[int]):
+        """
+        Records the files that the inputs of a number of jobs consist of.
+
+        :param jobs:
+                    The jobs.
+        :param file_pks:
+                    The primary keys of the input files (shared by all jobs).
+        """
+        cls.input_files.through.objects.bulk_create([
+            cls.input_files.through(job_id=job.pk, file_id=file_pk)
+            for job in jobs
+            for file_pk in file_pks
+        ])
+
     @property
     def is_acquired(self) -> bool:
         """
@@ -352,7 +560,10 @@ class Job(SoftDeleteModel):
         self.node = node
         self.save(update_fields=['node'])
 
-        self._perform_notifications(Transition.ACQUIRE)
+        self._record_transition(Transition.ACQUIRE)
+
+        # Give the node any other jobs which can be worked in a batch with this one
+        self._gather_batch(node)
 
     def release(self, node: Node):
         """
@@ -375,9 +586,13 @@ class Job(SoftDeleteModel):
 
         # Mark the job as un-acquired
         self.node = None
-        self.save(update_fields=['node'])
+        self.batch = None
+        self.save(update_fields=['node', 'batch'])
 
-        self._perform_notifications(Transition.RELEASE)
+        self._record_transition(Transition.RELEASE)
+
+        # Return the rest of the batch to the pool of waiting jobs
+        self._update_batch(Transition.RELEASE, self._RELEASED_FIELDS)
 
     def start(self, node: Node):
         """
@@ -403,7 +618,7 @@ class Job(SoftDeleteModel):
         self.start_time = now()
         self.save(update_fields=["start_time"])
 
-        self._perform_notifications(Transition.START)
+        self._record_transition(Transition.START)
 
     def _start_workable(self, node: Node):
         assert not self.is_meta, "_start_workable called on meta-job"
@@ -419,19 +634,25 @@ class Job(SoftDeleteModel):
 
         assert self.node == node, "_start_workable called by another node"
 
+        # Mark the job as started, provided the team has capacity to work it
+        self.start_time = now()
+        self._update_quota(check=True)
+
         # Start the parent meta-job, if any
         if self.has_parent:
             self.parent._start_meta()
 
-        # Mark the job as started
-        self.start_time = now()
         self.save(update_fields=["start_time"])
 
         # Mark the job as this node's current job
         node.current_job = self
         node.save(update_fields=["current_job"])
 
-        self._perform_notifications(Transition.START)
+        self._record_transition(Transition.START)
+
+        # The rest of the batch is worked along with this job, where their teams have capacity
+        self._admit_batch()
+        self._update_batch(Transition.START, {"start_time": self.start_time})
 
     def progress(self, node: Node, progress: float, **other: RawJSONElement):
         """
@@ -459,7 +680,7 @@ class Job(SoftDeleteModel):
         self.progress_amount = progress
         self.save(update_fields=['progress_amount'])
 
-        self._perform_notifications(Transition.PROGRESS, **other)
+        self._record_transition(Transition.PROGRESS, **other)
 
         if self.has_parent:
             self.parent._progress_meta(
@@ -490,7 +711,9 @@ class Job(SoftDeleteModel):
         self.progress_amount = progress
         self.save(update_fields=['progress_amount'])
 
-        self._perform_notifications(Transition.PROGRESS, **other)
+        self._record_transition(Transition.PROGRESS, **other)
+
+        self._update_batch(Transition.PROGRESS, {"progress_amount": progress}, **other)
 
         if self.has_parent:
             self.parent._progress_meta(
@@ -547,7 +770,7 @@ class Job(SoftDeleteModel):
         self.end_time = now()
         self.save(update_fields=["end_time"])
 
-        self._perform_notifications(Transition.FINISH)
+        self._record_transition(Transition.FINISH)
 
         # Let our parent know we've finished
         if self.has_parent:
@@ -574,7 +797,12 @@ class Job(SoftDeleteModel):
         self.save(update_fields=["end_time"])
 
         # Fire notifications
-        self._perform_notifications(Transition.FINISH)
+        self._record_transition(Transition.FINISH)
+
+        # Hand each job in the batch its share of the outputs, and finish it. Jobs the
+        # node produced no outputs for weren't worked, so are returned to the queue
+        self._release_batch_members(self._split_batch_outputs())
+        self._update_batch(Transition.FINISH, {"end_time": self.end_time})
 
         # Finish the parent if we have one
         if self.has_parent:
@@ -608,7 +836,7 @@ class Job(SoftDeleteModel):
         self.error_reason = error
         self.save(update_fields=["end_time", "error_reason"])
 
-        self._perform_notifications(Transition.ERROR)
+        self._record_transition(Transition.ERROR)
 
         # Let our parent know we've finished
         if self.has_parent:
@@ -635,7 +863,9 @@ class Job(SoftDeleteModel):
         self.error_reason = error
         self.save(update_fields=["end_time", "error_reason"])
 
-        self._perform_notifications(Transition.ERROR)
+        self._record_transition(Transition.ERROR)
+
+        self._update_batch(Transition.ERROR, {"end_time": self.end_time, "error_reason": error})
 
         # Error the parent if we have one
         if self.has_parent:
@@ -666,7 +896,7 @@ class Job(SoftDeleteModel):
         self.error_reason = None
         self.save(update_fields=['end_time', 'error_reason'])
 
-        self._perform_notifications(Transition.RESET)
+        self._record_transition(Transition.RESET)
 
         if attempt_reset_parent:
             self._attempt_reset_parent()
@@ -679,7 +909,7 @@ class Job(SoftDeleteModel):
             raise IllegalPhaseTransition(self, "reset", "Job is not in the ERRORED phase")
 
         # Remove any outputs
-        self.outputs.all().delete()
+        self.remove_outputs(self.outputs.all())
 
         # Reset the lifecycle to the CREATED phase
         self.start_time = None
@@ -687,7 +917,9 @@ class Job(SoftDeleteModel):
         self.error_reason = None
         self.save(update_fields=['start_time', 'end_time', 'error_reason'])
 
-        self._perform_notifications(Transition.RESET)
+        self._record_transition(Transition.RESET)
+
+        self._update_batch(Transition.RESET, {"start_time": None, "end_time": None, "error_reason": None})
 
         if attempt_reset_parent:
             self._attempt_reset_parent()
@@ -708,7 +940,7 @@ class Job(SoftDeleteModel):
             raise IllegalPhaseTransition(self, "abort", "Can't abort a finalised job")
 
         # Remove any outputs
-        self.outputs.all().delete()
+        self.remove_outputs(self.outputs.all())
 
         # Reset the lifecycle to the CREATED state, and forcefully remove
         # the acquiring node
@@ -716,9 +948,13 @@ class Job(SoftDeleteModel):
         self.end_time = None
         self.error_reason = None
         self.node = None
-        self.save(update_fields=['start_time', 'end_time', 'error_reason', 'node'])
+        self.batch = None
+        self.save(update_fields=['start_time', 'end_time', 'error_reason', 'node', 'batch'])
+
+        self._record_transition(Transition.ABORT)
 
-        self._perform_notifications(Transition.ABORT)
+        # Return the rest of the batch to the pool of waiting jobs
+        self._update_batch(Transition.ABORT, self._RELEASED_FIELDS)
 
     def cancel(self, called_from_parent: bool = False):
         """
@@ -751,7 +987,7 @@ class Job(SoftDeleteModel):
             child.cancel(True)
 
         # Fire notifications
-        self._perform_notifications(Transition.CANCEL)
+        self._record_transition(Transition.CANCEL)
 
     def _cancel_workable(self, called_from_parent: bool):
         # No-op if already finalised
@@ -768,7 +1004,553 @@ class Job(SoftDeleteModel):
         self.save(update_fields=['end_time', 'error_reason'])
 
         # Fire notifications
-        self._perform_notifications(Transition.CANCEL)
+        self._record_transition(Transition.CANCEL)
+
+        # The rest of the batch is still wanted, so return it to the pool of waiting jobs
+        self._update_batch(Transition.RELEASE, self._RELEASED_FIELDS)
+
+    # endregion
+
+    # region Result Caching
+
+    @staticmethod
+    def compute_result_key(
+            template_pk: int,
+            input_values: str,
+            parameter_values: Optional[str],
+            input_fingerprint: str
+    ) -> str:
+        """
+        Computes the key identifying the result of running a deterministic template
+        on the given inputs and parameters. The JSON values are normalised, so that
+        the key doesn't depend on the order of the inputs/parameters.
+
+        :param template_pk:
+                    The primary key of the template.
+        :param input_values:
+                    The input values to the job, as JSON.
+        :param parameter_values:
+                    The parameter values to the job, as JSON.
+        :param input_fingerprint:
+                    The fingerprint of the contents of the inputs (see resolve_input_fingerprint),
+                    so that jobs on inputs which have since been edited aren't reused.
+        :return:
+                    The result key.
+        """
+        normalised = json.dumps(
+            [
+                template_pk,
+                json.loads(input_values),
+                json.loads(parameter_values) if parameter_values is not None else None,
+                input_fingerprint
+            ],
+            sort_keys=True,
+            separators=(",", ":")
+        )
+
+        return hashlib.sha256(normalised.encode()).hexdigest()
+
+    @classmethod
+    def bulk_finish_from_prior_results(cls, jobs: List['Job']):
+        """
+        Finishes any of the given jobs for which an identical job (same deterministic
+        template, inputs and parameters) has already finished, reusing the outputs of
+        the prior job instead of working the job on a node.
+
+        :param jobs:
+                    The newly-created jobs.
+        """
+        keyed_jobs = [job for job in jobs if job.result_key is not None]
+
+        # Nothing to do if none of the jobs are deterministic
+        if len(keyed_jobs) == 0:
+            return
+
+        # Find the most recent prior job for each key
+        prior_jobs = {}
+        for prior_job in (
+                Job.objects
+                .successfully_finished()
+                .filter(result_key__in={job.result_key for job in keyed_jobs})
+                .order_by("end_time")
+        ):
+            prior_jobs[prior_job.result_key] = prior_job
+
+        for job in keyed_jobs:
+            prior_job = prior_jobs.get(job.result_key, None)
+            if prior_job is not None:
+                job._finish_from_prior_result(prior_job)
+
+    def _finish_from_prior_result(self, prior_job: 'Job'):
+        """
+        Finishes this job with the outputs of an identical job which has
+        already finished.
+
+        :param prior_job:
+                    The prior job.
+        """
+        assert not self.is_meta, "_finish_from_prior_result called on meta-job"
+        assert self.is_created, "_finish_from_prior_result called on job that has been started"
+
+        # If the prior job led a batch, it also carries the outputs of the other jobs in
+        # its batch (named "<job pk>:<output name>"), which aren't part of its own result
+        batched_job_pks = {str(pk) for pk in prior_job.batched_jobs.values_list("pk", flat=True)}
+
+        # Attach the prior job's output data, which is content-addressed so doesn't need copying
+        prior_outputs = [
+            output
+            for output in prior_job.outputs.active().select_related("data")
+            if output.name.partition(":")[0] not in batched_job_pks
+        ]
+        JobOutput.objects.bulk_create([
+            JobOutput(
+                job=self,
+                name=output.name,
+                type=output.type,
+                data_id=output.data_id,
+                creator_id=output.creator_id
+            )
+            for output in prior_outputs
+        ])
+        self._charge_output_bytes(sum(output.data.size or 0 for output in prior_outputs), check=False)
+
+        # Go straight to the Finished phase
+        self.start_time = now()
+        self.end_time = self.start_time
+        self.save(update_fields=["start_time", "end_time"])
+
+        # The job wasn't worked, so its (near-zero) durations would skew the histograms
+        self._record_transition(Transition.START, observe_durations=False)
+        self._record_transition(Transition.FINISH, observe_durations=False, cached_result_of=prior_job.pk)
+
+    # endregion
+
+    # region Inference Batching
+
+    # The field values which return a job in a batch to the pool of waiting jobs
+    _RELEASED_FIELDS: Dict[str, None] = {
+        "node": None,
+        "batch": None,
+        "start_time": None,
+        "end_time": None,
+        "error_reason": None
+    }
+
+    @property
+    def batch_key(self) -> str:
+        """
+        A key which is the same for all jobs that can be worked in the same batch,
+        i.e. jobs whose inputs (other than the datasets to work on) and parameters
+        are all the same.
+        """
+        input_values = json.loads(self.input_values)
+
+        return json.dumps(
+            {
+                "inputs": {
+                    name: value
+                    for name, value in input_values.items()
+                    if not value["type"].startswith("Dataset")
+                },
+                "parameters": self.parameter_values
+            },
+            sort_keys=True
+        )
+
+    @property
+    def is_batchable(self) -> bool:
+        """
+        Whether this job can be worked in a batch with other jobs. Only top-level
+        inference jobs are batched, so that the model is only loaded once per batch.
+        """
+        if self.has_parent or self.is_meta:
+            return False
+
+        return self.template.upcast().implements_contract("Predict")
+
+    def _gather_batch(self, node: Node):
+        """
+        Adds any waiting jobs which can be worked in a batch with this
+        job to its batch, up to the configured batch size.
+
+        :param node:
+                    The node which acquired this job.
+        """
+        batch_size = core_settings.INFERENCE_BATCH_SIZE
+
+        # Nothing to do if batching is disabled or not applicable to this job
+        if batch_size <= 1 or not self.is_batchable:
+            return
+
+        with transaction.atomic():
+            # Lock the candidates, skipping any other nodes are acquiring. Jobs differing only
+            # in their datasets can't be distinguished by the database, so scan a few batches' worth
+            candidates = (
+                Job.objects
+                .awaiting_node()
+                .within_started_quota()
+                .filter(
+                    template_id=self.template_id,
+                    parent__isnull=True,
+                    batch__isnull=True,
+                    parameter_values=self.parameter_values
+                )
+                .exclude(pk=self.pk)
+                .order_by("pk")
+                .select_for_update(skip_locked=True, of=("self",))
+            )[:batch_size * 4]
+
+            batch_key = self.batch_key
+            members = [
+                job
+                for job in candidates
+                if job.batch_key == batch_key
+            ][:batch_size - 1]
+
+            # Nothing to do if there are no compatible jobs waiting
+            if len(members) == 0:
+                return
+
+            Job.objects.filter(pk__in=[member.pk for member in members]).update(node=node, batch=self)
+
+        for member in members:
+            member.node = node
+            member.batch = self
+            member._record_transition(Transition.ACQUIRE)
+
+    def _update_batch(
+            self,
+            transition: Transition,
+            fields: Dict[str, Union[RawJSONElement, Node, 'Job', None]],
+            **other: RawJSONElement
+    ) -> List['Job']:
+        """
+        Applies a lifecycle transition to the jobs being worked in a batch with
+        this job (which have not already been finalised).
+
+        :param transition:
+                    The transition the jobs are making.
+        :param fields:
+                    The values to set on the jobs' fields.
+        :param other:
+                    Any other meta-data for the notifications.
+        :return:
+                    The jobs which made the transition.
+        """
+        members = [
+            member
+            for member in self.batched_jobs.all()
+            if not member.has_been_finalised
+        ]
+
+        # Nothing to do if this job isn't leading a batch
+        if len(members) == 0:
+            return members
+
+        Job.objects.filter(pk__in=[member.pk for member in members]).update(**fields)
+
+        for member in members:
+            for name, value in fields.items():
+                setattr(member, name, value)
+            member._record_transition(transition, **other)
+
+        return members
+
+    def _admit_batch(self):
+        """
+        Moves the jobs in this job's batch to their teams' quotas of started jobs,
+        as this job is started. Any job whose team is already working as many jobs
+        as it is allowed is returned to the pool of waiting jobs instead.
+        """
+        unadmitted = []
+        for member in self.batched_jobs.filter(quota_counter="queued_jobs"):
+            try:
+                TeamQuota.adjust(member.team_id, queued_jobs=-1, started_jobs=1)
+            except QuotaExceeded:
+                unadmitted.append(member)
+            else:
+                # Already moved, so the start transition doesn't move it again
+                member.quota_counter = "started_jobs"
+                member.save(update_fields=["quota_counter"])
+
+        self._release_batch_members(unadmitted)
+
+    def _release_batch_members(self, members: List['Job']):
+        """
+        Returns some of the jobs in this job's batch to the pool of waiting jobs.
+
+        :param members:
+                    The jobs to return.
+        """
+        # Nothing to do if no jobs are being returned
+        if len(members) == 0:
+            return
+
+        Job.objects.filter(pk__in=[member.pk for member in members]).update(**self._RELEASED_FIELDS)
+
+        for member in members:
+            for name, value in self._RELEASED_FIELDS.items():
+                setattr(member, name, value)
+            member._record_transition(Transition.RELEASE)
+
+    def _split_batch_outputs(self) -> List['Job']:
+        """
+        Moves the outputs produced for the jobs being worked in a batch with this job
+        onto those jobs. The outputs for each job in the batch are added to this job
+        with names of the form "<job pk>:<output name>".
+
+        :return:
+                    The jobs in the batch for which no outputs were produced.
+        """
+        members = {
+            str(member.pk): member
+            for member in self.batched_jobs.all()
+            if not member.has_been_finalised
+        }
+
+        # Nothing to do if this job isn't leading a batch
+        if len(members) == 0:
+            return []
+
+        batch_outputs = []
+        output_bytes = {member_pk: 0 for member_pk in members}
+        for output in self.outputs.all().select_related("data"):
+            member_pk, separator, name = output.name.partition(":")
+
+            # Skip outputs of this job itself
+            if separator == "" or member_pk not in members:
+                continue
+
+            output_bytes[member_pk] += output.data.size or 0
+            batch_outputs.append(
+                JobOutput(
+                    job=members[member_pk],
+                    name=name,
+                    type=output.type,
+                    data_id=output.data_id,
+                    creator_id=output.creator_id
+                )
+            )
+
+        JobOutput.objects.bulk_create(batch_outputs)
+
+        for member_pk, member in members.items():
+            member._charge_output_bytes(output_bytes[member_pk], check=False)
+
+        output_member_pks = {output.job.pk for output in batch_outputs}
+
+        return [
+            member
+            for member in members.values()
+            if member.pk not in output_member_pks
+        ]
+
+    # endregion
+
+    # region Quotas
+
+    @staticmethod
+    def resolve_owning_team(input_values: Dict[str, Tuple[RawJSONElement, str]]) -> Optional[int]:
+        """
+        Gets the team that a job with the given input values is charged to, which
+        is the team owning the first server-resident dataset in its inputs.
+
+        :param input_values:
+                    The input values, as a map from input name to value/type-string pairs.
+        :return:
+                    The primary key of the team, or None if the job uses no datasets.
+        """
+        # Local import to avoid circular reference error
+        from .. import Dataset
+
+        dataset_pks = set()
+        for value, type_string in input_values.values():
+            if type_string.split("<", 1)[0] != "Dataset":
+                continue
+
+            try:
+                dataset_pks.add(int(value))
+            except (TypeError, ValueError):
+                # Only inputs referenced by primary key can be resolved
+                continue
+
+        if len(dataset_pks) == 0:
+            return None
+
+        return (
+            Dataset.objects
+            .filter(pk__in=dataset_pks)
+            .order_by("pk")
+            .values_list("project__team_id", flat=True)
+            .first()
+        )
+
+    @property
+    def current_quota_counter(self) -> str:
+        """
+        The counter of the team's quota that should include this job in its current
+        lifecycle phase, or the empty string if it shouldn't be counted.
+        """
+        if self.end_time is not None or self.error_reason is not None:
+            return ""
+        elif self.start_time is not None:
+            return "started_jobs"
+        else:
+            return "queued_jobs"
+
+    @classmethod
+    def bulk_admit(cls, jobs: List['Job'], team_id: Optional[int], check: bool = True):
+        """
+        Charges a number of newly-created workable jobs to a team's quota of
+        queued jobs. Should be called before the jobs are saved.
+
+        :param jobs:
+                    The jobs.
+        :param team_id:
+                    The primary key of the team, or None if not charged to a team.
+        :param check:
+                    Whether to enforce the team's quota.
+        """
+        for job in jobs:
+            job.team_id = team_id
+
+        if team_id is None:
+            return
+
+        TeamQuota.adjust(team_id, check, queued_jobs=len(jobs))
+
+        for job in jobs:
+            job.quota_counter = "queued_jobs"
+
+    def _update_quota(self, check: bool = False):
+        """
+        Moves this job between the counters of its team's quota to match its
+        current lifecycle phase.
+
+        :param check:
+                    Whether to enforce the quota of the counter the job moves to.
+        """
+        # Nothing to do if the job isn't charged to a quota
+        if self.quota_counter is None:
+            return
+
+        counter = self.current_quota_counter
+        if counter == self.quota_counter:
+            return
+
+        deltas = {}
+        if self.quota_counter != "":
+            deltas[self.quota_counter] = -1
+        if counter != "":
+            deltas[counter] = 1
+
+        TeamQuota.adjust(self.team_id, check, **deltas)
+
+        self.quota_counter = counter
+        self.save(update_fields=["quota_counter"])
+
+    def _charge_output_bytes(self, num_bytes: int, check: bool = True):
+        """
+        Charges the storage used by outputs of this job to its team's quota.
+
+        :param num_bytes:
+                    The number of bytes added (or removed, if negative).
+        :param check:
+                    Whether to enforce the quota.
+        """
+        if self.quota_counter is not None:
+            TeamQuota.adjust(self.team_id, check, output_bytes=num_bytes)
+
+    def remove_outputs(self, outputs: JobOutputQuerySet):
+        """
+        Deletes some of this job's outputs, returning their storage
+        to the team's quota.
+
+        :param outputs:
+                    The outputs to delete.
+        """
+        num_bytes = outputs.aggregate(total=models.Sum("data__size"))["total"] or 0
+
+        outputs.delete()
+
+        self._charge_output_bytes(-num_bytes)
+
+    def pre_delete(self):
+        # Release the job's place in its team's quota
+        if self.quota_counter:
+            TeamQuota.adjust(self.team_id, False, **{self.quota_counter: -1})
+            self.quota_counter = ""
+            self.save(update_fields=["quota_counter"])
+
+    @classmethod
+    def pre_delete_bulk(cls, query_set):
+        # Release the jobs' places in their teams' quotas
+        counted = query_set.filter(quota_counter__in=("queued_jobs", "started_jobs"))
+        for team_id, counter, num_jobs in (
+                counted
+                .order_by()
+                .values("team_id", "quota_counter")
+                .annotate(num_jobs=models.Count("pk"))
+                .values_list("team_id", "quota_counter", "num_jobs")
+        ):
+            TeamQuota.adjust(team_id, False, **{counter: -num_jobs})
+
+        counted.update(quota_counter="")
+
+    # endregion
+
+    # region Metrics
+
+    @classmethod
+    def bulk_count_created(cls, jobs: List['Job']):
+        """
+        Counts a number of newly-created jobs of the same template in
+        its metrics. Should be called before the jobs are saved.
+
+        :param jobs:
+                    The jobs.
+        """
+        if len(jobs) == 0:
+            return
+
+        JobMetric.record_phase_change(jobs[0].template_id, None, LifecyclePhase.CREATED, len(jobs))
+
+        for job in jobs:
+            job.metrics_phase = LifecyclePhase.CREATED.value
+
+    def _update_metrics(self, transition: Transition, observe_durations: bool = True):
+        """
+        Updates the metrics of this job's template to reflect a transition.
+
+        :param transition:
+                    The transition the job is making.
+        :param observe_durations:
+                    Whether to record how long the job took to make the transition.
+        """
+        # Move the job to the count for its new phase
+        phase = self.lifecycle_phase
+        if self.metrics_phase != phase.value:
+            JobMetric.record_phase_change(
+                self.template_id,
+                LifecyclePhase(self.metrics_phase) if self.metrics_phase is not None else None,
+                phase
+            )
+            self.metrics_phase = phase.value
+            self.save(update_fields=["metrics_phase"])
+
+        # Record how long the job took to reach this transition
+        if not observe_durations:
+            return
+        elif transition is Transition.ACQUIRE:
+            JobMetric.observe_duration(self.template_id, JobMetric.ACQUIRE_DURATION, now() - self.creation_time)
+        elif transition is Transition.START and self.start_time is not None:
+            JobMetric.observe_duration(self.template_id, JobMetric.WAIT_DURATION, self.start_time - self.creation_time)
+        elif (
+                transition in (Transition.FINISH, Transition.ERROR)
+                and self.start_time is not None
+                and self.end_time is not None
+        ):
+            JobMetric.observe_duration(self.template_id, JobMetric.RUN_DURATION, self.end_time - self.start_time)
 
     # endregion
 
@@ -793,17 +1575,10 @@ class Job(SoftDeleteModel):
         :return:
                     The newly-created output.
         """
-        # Make sure the job has been started
-        if not self.has_been_started:
-            raise JobNotStarted("add_output")
-
-        # Make sure the job isn't already finished
-        if self.is_finished:
-            raise JobFinished("add_output")
+        self.check_can_add_output(name, type)
 
-        # Make sure the job doesn't already have an output by this name
-        if self.outputs.filter(name=name, type=type).exists():
-            raise BadName(name, f"Job already has an output by this name/type ({name}/{type})")
+        # Charge the output to the team's storage quota before storing it
+        self._charge_output_bytes(len(data) if not isinstance(data, File) else data.size or 0)
 
         # Create a file handle to the data if it isn't already one
         if not isinstance(data, File):
@@ -821,6 +1596,75 @@ class Job(SoftDeleteModel):
 
         return output
 
+    def add_output_from_upload(
+            self,
+            name: str,
+            type: str,
+            session: UploadSession,
+            creator: User
+    ):
+        """
+        Adds an output to this job from a file uploaded in parts, committing the
+        upload session. Committing consumes the spooled data (which can't be rolled
+        back), so everything which could prevent the output being added is checked,
+        and the storage reserved, before the session is committed. Should be called
+        in a transaction, with the session locked with select_for_update.
+
+        :param name:
+                    The name of the output.
+        :param type:
+                    The type of the output.
+        :param session:
+                    The upload session of the output's data.
+        :param creator:
+                    The user creating the output.
+        :return:
+                    The newly-created output.
+        """
+        # Lock this job so concurrent additions of the same output are checked one at a time
+        list(Job.objects.filter(pk=self.pk).select_for_update().values_list("pk", flat=True))
+        self.refresh_from_db()
+
+        self.check_can_add_output(name, type)
+
+        # Reserve the team's storage for the output before consuming the upload
+        self._charge_output_bytes(session.received)
+
+        # Create the output
+        output = JobOutput(
+            job=self,
+            name=name,
+            type=type,
+            data=session.commit(),
+            creator=creator
+        )
+        output.save()
+
+        return output
+
+    def check_can_add_output(self, name: str, type: str):
+        """
+        Checks that an output with the given name and type can
+        currently be added to this job. The team's storage quota
+        is enforced when the output is charged to it.
+
+        :param name:
+                    The name of the output.
+        :param type:
+                    The type of the output.
+        """
+        # Make sure the job has been started
+        if not self.has_been_started:
+            raise JobNotStarted("add_output")
+
+        # Make sure the job isn't already finished
+        if self.is_finished:
+            raise JobFinished("add_output")
+
+        # Make sure the job doesn't already have an output by this name
+        if self.outputs.filter(name=name, type=type).exists():
+            raise BadName(name, f"Job already has an output by this name/type ({name}/{type})")
+
     def _try_create_children(self) -> Tuple[bool, Optional[str]]:
         """
         Attempts to create any sub-jobs of this meta-job if the input is
@@ -837,8 +1681,9 @@ class Job(SoftDeleteModel):
         if not self.is_meta:
             return True, error
 
-        # Get our meta-template
+        # Get our meta-template and the dependencies between its children
         template = self.template.upcast()
+        graph = template.child_dependency_graph()
 
         # Get the existing child jobs to this meta-job
         child_jobs = {
@@ -853,41 +1698,19 @@ class Job(SoftDeleteModel):
             if job.is_finished
         }
 
-        # Get all expected children of this job
-        all_child_relations = {
-            child_relation.name: child_relation
-            for child_relation in template.child_relations.all()
-        }
-
         # If there aren't any unfinished child-jobs, we're done
-        if all(child_name in finished_child_jobs for child_name in all_child_relations.keys()):
+        if all(child_name in finished_child_jobs for child_name in graph.child_names):
             return True, error
 
-        # See if any new child-jobs can be created
-        for child_name, child_relation in all_child_relations.items():
-            # Skip any jobs that are already created
-            if child_name in child_jobs:
-                continue
-
-            # Get the names of the dependencies of this template
-            dependency_names = {
-                dependency.name
-                for dependency in template.child_relations.filter(
-                    dependencies__dependency=child_relation
-                ).all()
-            }
-
-            # If all dependencies are finished, create a new sub-job for this child
-            if all(dependency_name in finished_child_jobs for dependency_name in dependency_names):
-                try:
-                    template.create_sub_job(
-                        self,
-                        child_relation,
-                        finished_child_jobs
-                    )
-                except Exception as e:
-                    error = e.args[0]
-                    break
+        # Create new sub-jobs for any children whose dependencies have all finished
+        try:
+            template.create_sub_jobs(
+                self,
+                graph.ready_children(child_jobs.keys(), finished_child_jobs.keys()),
+                finished_child_jobs
+            )
+        except Exception as e:
+            error = e.args[0]
 
         # If we successfully started all the children we could, and there are more to
         # start in future, wait until the next child finishes
@@ -1012,28 +1835,103 @@ class Job(SoftDeleteModel):
         # Attach the notifications from the override
         self.attach_notifications(override.actions)
 
+    @classmethod
+    def bulk_set_notifications_from_override(
+            cls,
+            jobs: List['Job'],
+            override: Optional[JSONNotificationOverride]
+    ):
+        """
+        Sets the notifications for a number of jobs of the same kind (workable
+        or meta) from the same override. Each notification is only looked up
+        once, and all notification actions are created in a single query.
+
+        :param jobs:
+                    The jobs to set the notifications for.
+        :param override:
+                    The override specification.
+        """
+        # Nothing to do if there are no jobs
+        if len(jobs) == 0:
+            return
+
+        # Work out which sets of notification actions to attach
+        default = (
+            core_settings.DEFAULT_META_NOTIFICATIONS
+            if jobs[0].is_meta else
+            core_settings.DEFAULT_WORKABLE_NOTIFICATIONS
+        )
+        all_actions = (
+            [default] if override is None else
+            [default, override.actions] if override.keep_default else
+            [override.actions]
+        )
+
+        # Get an instance of each notification for each transition
+        notifications = [
+            (transition, create_notification_from_json(notification_json), notification_json.suppress_for_parent)
+            for actions in all_actions
+            for transition in Transition
+            for notification_json in actions.get_property(transition.json_property_name)
+        ]
+
+        # Create the associations with every job
+        NotificationAction.objects.bulk_create([
+            NotificationAction(
+                job=job,
+                transition_index=transition.value,
+                notification=notification_instance,
+                suppress=suppress
+            )
+            for job in jobs
+            for transition, notification_instance, suppress in notifications
+        ])
+
+    def _record_transition(
+            self,
+            transition: Transition,
+            observe_durations: bool = True,
+            **other: RawJSONElement
+    ):
+        """
+        Records that this job has made a phase transition: releases or moves its
+        count in the team's job quota, updates its template's metrics, and sends
+        any notifications for the transition.
+
+        :param transition:
+                    The transition the job is making.
+        :param observe_durations:
+                    Whether the time the job took to make the transition should be
+                    recorded in its template's duration histograms.
+        :param other:
+                    Any other meta-data for the notifications.
+        """
+        self._update_quota()
+        self._update_metrics(transition, observe_durations)
+        self._perform_notifications(transition, **other)
+
     def _perform_notifications(self, transition: Transition, **other: RawJSONElement):
         """
-        Performs any notifications specified for this job, based
+        Queues any notifications specified for this job for delivery, based
         on the phase transition it is going through.
 
         :param transition:
                     The transition the job is making.
         """
         # Get our notifications for this transition
-        notification_actions = self.notification_actions.for_transition(transition)
+        notification_actions = self.notification_actions.for_transition(transition).with_notifications()
 
         # Get the notification data for this transition
         notification_data: Dict[str, RawJSONElement] = self._get_notification_data(transition)
         notification_data['transition_data'] = other
 
-        # Perform the notifications
-        for notification_action in notification_actions.all():
+        # Queue the notifications for delivery
+        get_notification_queue().enqueue(
+            NotificationEvent(notification_action.notification.upcast(), self, notification_data)
+            for notification_action in notification_actions
             # Suppress if part of a workflow
-            if notification_action.suppress and self.has_parent:
-                continue
-
-            notification_action.notification.upcast().perform(self, **notification_data)
+            if not (notification_action.suppress and self.has_parent)
+        )
 
     def _get_notification_data(
             self,
@@ -0,0 +1,195 @@
+from bisect import bisect_left
+from datetime import timedelta
+from typing import Dict, Optional, Tuple
+
+from django.db import models
+
+from ...apps import UFDLCoreAppConfig
+
+
+class JobMetricQuerySet(models.QuerySet):
+    """
+    A query-set over job metrics.
+    """
+    pass
+
+
+class JobMetric(models.Model):
+    """
+    An aggregate statistic about the jobs of a template, maintained as the jobs
+    transition so that reporting on the job queue never has to scan the jobs
+    themselves. Each metric is either the number of jobs currently in a lifecycle
+    phase, or a single bucket of a histogram of the durations of a stage of the
+    jobs' lifecycles.
+    """
+    # The prefix of the metrics counting the jobs in each lifecycle phase
+    PHASE_PREFIX: str = "phase:"
+
+    # The durations which are histogrammed, and the times they measure
+    ACQUIRE_DURATION: str = "acquire"  # creation_time -> acquisition by a node
+    WAIT_DURATION: str = "wait"  # creation_time -> start_time
+    RUN_DURATION: str = "run"  # start_time -> end_time
+
+    # The upper bounds (in seconds) of the histogram buckets. Durations
+    # greater than the last bound are counted in an additional bucket
+    DURATION_BUCKETS: Tuple[float, ...] = (
+        1.0, 5.0, 15.0, 60.0, 300.0, 900.0, 3600.0, 14400.0, 43200.0, 86400.0
+    )
+
+    # The template of the jobs the metric is about
+    template = models.ForeignKey(f"{UFDLCoreAppConfig.label}.JobTemplate",
+                                 on_delete=models.CASCADE,
+                                 related_name="+")
+
+    # The name of the metric
+    metric = models.CharField(max_length=32)
+
+    # The index of the histogram bucket (always 0 for phase counts)
+    bucket = models.PositiveSmallIntegerField(default=0)
+
+    # The number of jobs counted by the metric
+    count = models.BigIntegerField(default=0)
+
+    # The sum of the durations counted by the bucket, in seconds
+    total = models.FloatField(default=0.0)
+
+    objects = JobMetricQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure each metric is only counted once
+            models.UniqueConstraint(name="unique_job_metrics",
+                                    fields=["template", "metric", "bucket"])
+        ]
+
+    @classmethod
+    def phase_metric(cls, phase) -> str:
+        """
+        Gets the name of the metric counting the jobs in a lifecycle phase.
+
+        :param phase:   The lifecycle phase.
+        :return:        The metric name.
+        """
+        return f"{cls.PHASE_PREFIX}{phase.name}"
+
+    @classmethod
+    def increment(cls, template_id: int, metric: str, bucket: int = 0, count: int = 1, total: float = 0.0):
+        """
+        Adds to a metric in a single update, creating the metric if
+        it hasn't been recorded before.
+
+        :param template_id:     The primary key of the template.
+        :param metric:          The name of the metric.
+        :param bucket:          The histogram bucket.
+        :param count:           The number of jobs to add.
+        :param total:           The total duration to add.
+        """
+        if count == 0 and total == 0.0:
+            return
+
+        query_set = cls.objects.filter(template_id=template_id, metric=metric, bucket=bucket)
+        changes = dict(count=models.F("count") + count, total=models.F("total") + total)
+
+        if query_set.update(**changes) == 0:
+            cls.objects.get_or_create(template_id=template_id, metric=metric, bucket=bucket)
+            query_set.update(**changes)
+
+    @classmethod
+    def record_phase_change(cls, template_id: int, old_phase, new_phase, count: int = 1):
+        """
+        Moves a number of jobs from the count of one lifecycle phase to another.
+
+        :param template_id:     The primary key of the jobs' template.
+        :param old_phase:       The phase the jobs were counted in, or None if not counted.
+        :param new_phase:       The phase the jobs are now in.
+        :param count:           The number of jobs.
+        """
+        if old_phase is new_phase:
+            return
+
+        if old_phase is not None:
+            cls.increment(template_id, cls.phase_metric(old_phase), count=-count)
+
+        cls.increment(template_id, cls.phase_metric(new_phase), count=count)
+
+    @classmethod
+    def observe_duration(cls, template_id: int, metric: str, duration: timedelta):
+        """
+        Adds a duration to the histogram for a stage of the lifecycles
+        of a template's jobs.
+
+        :param template_id:     The primary key of the template.
+        :param metric:          The duration being observed.
+        :param duration:        The duration.
+        """
+        seconds = max(duration.total_seconds(), 0.0)
+
+        cls.increment(template_id, metric, bisect_left(cls.DURATION_BUCKETS, seconds), total=seconds)
+
+    @classmethod
+    def summarise(cls, query_set: Optional[JobMetricQuerySet] = None) -> Dict[int, dict]:
+        """
+        Collates the metrics of each template into a summary containing the number
+        of its jobs in each lifecycle phase and cumulative histograms of its jobs'
+        durations.
+
+        :param query_set:   The metrics to summarise. Defaults to all metrics.
+        :return:            A map from template primary key to its summary.
+        """
+        # Local import to avoid circular reference error
+        from ._Job import LifecyclePhase
+
+        if query_set is None:
+            query_set = cls.objects.all()
+
+        summaries: Dict[int, dict] = {}
+
+        for template_id, template_name, template_version, metric, bucket, count, total in (
+                query_set
+                .order_by("template_id", "metric", "bucket")
+                .values_list(
+                    "template_id",
+                    "template__name",
+                    "template__version",
+                    "metric",
+                    "bucket",
+                    "count",
+                    "total"
+                )
+        ):
+            summary = summaries.get(template_id, None)
+            if summary is None:
+                summary = summaries[template_id] = {
+                    "template": template_id,
+                    "name": template_name,
+                    "version": template_version,
+                    "phases": {phase.name: 0 for phase in LifecyclePhase},
+                    "durations": {}
+                }
+
+            # Phase counts are simple gauges
+            if metric.startswith(cls.PHASE_PREFIX):
+                summary["phases"][metric[len(cls.PHASE_PREFIX):]] = count
+                continue
+
+            histogram = summary["durations"].get(metric, None)
+            if histogram is None:
+                histogram = summary["durations"][metric] = {
+                    "buckets": [
+                        [bound, 0]
+                        for bound in cls.DURATION_BUCKETS + (None,)
+                    ],
+                    "count": 0,
+                    "sum": 0.0
+                }
+
+            # Buckets are cumulative, so the count applies to this bucket and all wider ones
+            for upper_bucket in histogram["buckets"][bucket:]:
+                upper_bucket[1] += count
+            histogram["count"] += count
+            histogram["sum"] += total
+
+        return summaries
+
+    def __str__(self):
+        return f"{self.metric}[{self.bucket}] of template {self.template_id}: {self.count}"
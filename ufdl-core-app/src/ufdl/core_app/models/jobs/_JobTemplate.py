@@ -1,6 +1,9 @@
-from typing import Iterator, Optional, Dict, Tuple
+import hashlib
+import json
+from typing import Iterator, List, Optional, Dict, Tuple
 
-from django.db import models
+from django.core.cache import cache
+from django.db import models, transaction
 
 from simple_django_teams.mixins import SoftDeleteModel, SoftDeleteQuerySet
 
@@ -9,7 +12,7 @@ from ufdl.jobtypes.base import UFDLJSONType
 from ufdl.json.core.jobs import JobTemplateSpec
 from ufdl.json.core.jobs.notification import NotificationOverride
 
-from wai.json.raw import RawJSONElement
+from wai.json.raw import RawJSONElement, RawJSONObject
 
 from ...apps import UFDLCoreAppConfig
 from ...exceptions import InvalidJobInput, MissingParameter, UnknownParameters
@@ -18,6 +21,10 @@ from .._User import User
 from ._Job import Job
 from ._Parameter import Parameter
 
+# The number of seconds a cached parameter description is kept for, as a
+# backstop in case an invalidation is missed
+PARAMETER_BUNDLE_TIMEOUT = 60 * 60
+
 
 class JobTemplateQuerySet(SoftDeleteQuerySet):
     """
@@ -101,6 +108,77 @@ class JobTemplate(SoftDeleteModel):
         """
         return self.parameters.filter(name=name).first()
 
+    def parameter_bundle(self) -> Tuple[RawJSONObject, str]:
+        """
+        Gets the JSON description of this template's parameters (including the
+        schemas of their types), along with an ETag identifying the description.
+        The description is cached (in the cache shared by all server processes)
+        until the template or its parameters change, the type registry is rebuilt,
+        or PARAMETER_BUNDLE_TIMEOUT elapses.
+
+        :return:
+                    The parameter description and its ETag.
+        """
+        # Local import to avoid circular reference error
+        from ...initialise import current_registry_version, parse_type
+
+        registry_version = current_registry_version()
+
+        # Use the cached bundle if it was built against the current registry
+        cached = cache.get(self.parameter_bundle_key(self.pk), None)
+        if cached is not None and cached[0] == registry_version:
+            return cached[1], cached[2]
+
+        parameters = {}
+        for parameter in self.parameters.all():
+            parameter_json = {
+                "types": {
+                    parameter_type: parse_type(parameter_type).json_schema
+                    for parameter_type in parameter.types.split("|")
+                },
+                "help": parameter.help
+            }
+
+            if parameter.default is not None:
+                parameter_json["default"] = {
+                    "value": json.loads(parameter.default),
+                    "type": parameter.default_type,
+                    "schema": parse_type(parameter.default_type).json_schema,
+                    "const": parameter.const
+                }
+
+            parameters[parameter.name] = parameter_json
+
+        etag = hashlib.sha256(json.dumps(parameters, sort_keys=True).encode()).hexdigest()
+
+        cache.set(self.parameter_bundle_key(self.pk), (registry_version, parameters, etag), timeout=PARAMETER_BUNDLE_TIMEOUT)
+
+        return parameters, etag
+
+    @staticmethod
+    def parameter_bundle_key(pk: int) -> str:
+        """
+        Gets the cache key of the parameter description of a template.
+
+        :param pk:
+                    The primary key of the template.
+        :return:
+                    The cache key.
+        """
+        return f"ufdl-template-parameters-{pk}"
+
+    @classmethod
+    def invalidate_parameter_bundle(cls, pk: int):
+        """
+        Discards the cached parameter description of a template
+        once the current transaction commits.
+
+        :param pk:
+                    The primary key of the template.
+        """
+        key = cls.parameter_bundle_key(pk)
+        transaction.on_commit(lambda: cache.delete(key))
+
     def upcast(self) -> 'JobTemplate':
         """
         Up-casts this job template to the specific version, either
@@ -167,21 +245,46 @@ class JobTemplate(SoftDeleteModel):
         for input_name in unknown_input_names:
             input_values.pop(input_name)
 
+    def realise_parameters(self) -> List[Tuple[Parameter, Tuple[UFDLJSONType, ...]]]:
+        """
+        Loads the parameters to this template along with their parsed types,
+        so that multiple sets of parameter values can be checked without
+        reloading them.
+
+        :return:
+                    The parameters and their allowed types.
+        """
+        return [
+            (parameter, parameter.realise_types())
+            for parameter in self.parameters.all()
+        ]
+
     def check_parameter_values(
             self,
-            parameter_values: Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]]
+            parameter_values: Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]],
+            parameters: Optional[List[Tuple[Parameter, Tuple[UFDLJSONType, ...]]]] = None
     ):
         """
-        TODO
+        Checks that the parameter values match the names/types expected
+        by this template.
+
+        :param parameter_values:
+                    The parameter values.
+        :param parameters:
+                    The parameters to this template, as returned by realise_parameters.
+                    Loaded from the database if not given.
         """
         if parameter_values is None:
             parameter_values = {}
 
+        if parameters is None:
+            parameters = self.realise_parameters()
+
         # Keep a set of known parameter names
         known_parameter_names = set()
 
         # Check all required parameters are set
-        for parameter in self.parameters.all():
+        for parameter, allowed_parameter_types in parameters:
             parameter_name = parameter.name
             if parameter.default is None:
                 if parameter_name not in parameter_values:
@@ -193,7 +296,7 @@ class JobTemplate(SoftDeleteModel):
             if parameter_name in parameter_values:
                 parameter_value, parameter_type = parameter_values[parameter_name]
 
-                if not any(parameter_type.is_subtype_of(allowed_parameter_type) for allowed_parameter_type in parameter.realise_types()):
+                if not any(parameter_type.is_subtype_of(allowed_parameter_type) for allowed_parameter_type in allowed_parameter_types):
                     raise InvalidJobInput(f"Parameter type {parameter_type} is invalid for '{parameter_name}'")
 
                 known_parameter_names.add(parameter_name)
@@ -214,7 +317,8 @@ class JobTemplate(SoftDeleteModel):
             parameter_values: Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]] = None,
             description: Optional[str] = None,
             notification_override: Optional[NotificationOverride] = None,
-            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None
+            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None,
+            child_name: Optional[str] = None
     ) -> Job:
         """
         Creates a new job from this template.
@@ -234,6 +338,8 @@ class JobTemplate(SoftDeleteModel):
                     The override for this jobs notifications.
         :param child_notification_overrides:
                     The overrides for any children of this job.
+        :param child_name:
+                    The name of the job in its parent's workflow, if it has a parent.
         :return:
                     The created job.
         """
@@ -245,9 +351,52 @@ class JobTemplate(SoftDeleteModel):
             parameter_values,
             description,
             notification_override,
-            child_notification_overrides
+            child_notification_overrides,
+            child_name
         )
 
+    def create_jobs(
+            self,
+            user: User,
+            input_values: Dict[str, Tuple[RawJSONElement, UFDLJSONType]],
+            parameter_value_sets: List[Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]]],
+            description: Optional[str] = None,
+            notification_override: Optional[NotificationOverride] = None,
+            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None
+    ) -> List[Job]:
+        """
+        Creates a number of top-level jobs from this template which share the
+        same inputs, but have different parameter values (e.g. for a parameter
+        sweep). Sub-types may override this to create the jobs more efficiently.
+
+        :param user:
+                    The user creating the jobs.
+        :param input_values:
+                    The values provided as input to all jobs.
+        :param parameter_value_sets:
+                    The parameter values for each job.
+        :param description:
+                    A description to help identify the jobs.
+        :param notification_override:
+                    The override for the jobs' notifications.
+        :param child_notification_overrides:
+                    The overrides for any children of the jobs.
+        :return:
+                    The created jobs.
+        """
+        return [
+            self.upcast().create_job(
+                user,
+                None,
+                dict(input_values),
+                parameter_values,
+                description,
+                notification_override,
+                child_notification_overrides
+            )
+            for parameter_values in parameter_value_sets
+        ]
+
     def to_json(self) -> JobTemplateSpec:
         """
         Formats this job template as a specification for export.
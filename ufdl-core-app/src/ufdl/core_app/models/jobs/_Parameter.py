@@ -3,7 +3,6 @@ from typing import Tuple
 from django.db import models
 
 from ufdl.jobtypes.base import UFDLJSONType
-from ufdl.jobtypes.util import parse_type
 
 from ...apps import UFDLCoreAppConfig
 from ..mixins import DeleteOnNoRemainingReferencesOnlyModel, DeleteOnNoRemainingReferencesOnlyQuerySet
@@ -50,12 +49,18 @@ class Parameter(DeleteOnNoRemainingReferencesOnlyModel):
         return f"{self.name} : {self.type} = '{self.default}'"
 
     def realise_types(self) -> Tuple[UFDLJSONType, ...]:
+        # Local import to avoid circular reference error
+        from ...initialise import parse_type
+
         return tuple(
             parse_type(type_string)
             for type_string in self.types.split("|")
         )
 
     def realise_default_type(self) -> UFDLJSONType:
+        # Local import to avoid circular reference error
+        from ...initialise import parse_type
+
         return parse_type(self.default_type)
 
     class Meta:
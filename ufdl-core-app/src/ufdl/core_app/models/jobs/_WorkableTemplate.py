@@ -1,10 +1,9 @@
 import json
-from typing import Iterator, Optional, Dict, Tuple
+from typing import Iterable, Iterator, List, Optional, Dict, Set, Tuple
 
-from django.db import models
+from django.db import models, transaction
 
 from ufdl.jobcontracts.base import UFDLJobContract
-from ufdl.jobcontracts.util import parse_contract
 
 from ufdl.jobtypes.base import UFDLJSONType
 
@@ -16,14 +15,62 @@ from wai.json.raw import RawJSONElement
 
 from .._User import User
 from ._Job import Job
+from ._JobContract import JobContract
 from ._JobTemplate import JobTemplate, JobTemplateQuerySet
+from ._WorkableTemplateContract import WorkableTemplateContract
+from ._WorkableTemplateInputType import WorkableTemplateInputType
 
 
 class WorkableTemplateQuerySet(JobTemplateQuerySet):
     """
     A query-set over externally-worked job templates.
     """
-    pass
+    def needing_compatibility_index(self):
+        """
+        Filters the query-set to those templates which haven't yet been
+        added to the template-compatibility index.
+        """
+        # Every template implements at least its own contract, so is indexed if it has any contracts
+        return self.filter(indexed_contracts=None)
+
+    def index_compatibility(self):
+        """
+        (Re-)adds the templates in the query-set to the template-compatibility index.
+        """
+        # Local import to avoid circular reference error
+        from ...initialise import initialise
+        from ._JobType import JobType
+
+        # Contracts are parsed against the registry, so make sure it is up-to-date
+        initialise(JobType, JobContract)
+
+        for template in self:
+            template.index_compatibility()
+
+    def implementing(self, contract: JobContract):
+        """
+        Filters the query-set to those templates which implement the given contract,
+        according to the template-compatibility index.
+
+        :param contract:    The contract.
+        :return:            The filtered query-set.
+        """
+        return self.filter(indexed_contracts__contract=contract)
+
+    def accepting(self, input_name: str, types: Iterable[str]):
+        """
+        Filters the query-set to those templates with an input of the given name
+        which accepts any of the given types, according to the template-compatibility
+        index.
+
+        :param input_name:  The name of the input.
+        :param types:       The types that the input can accept.
+        :return:            The filtered query-set.
+        """
+        return self.filter(
+            indexed_input_types__input_name=input_name,
+            indexed_input_types__type__in=types
+        )
 
 
 class WorkableTemplate(JobTemplate):
@@ -39,19 +86,70 @@ class WorkableTemplate(JobTemplate):
     # The dependencies required by the job
     required_packages = models.TextField(blank=True, default="")
 
+    # Whether jobs always produce the same outputs for the same inputs and parameters,
+    # so that the outputs of prior jobs can be reused
+    deterministic = models.BooleanField(default=False)
+
     objects = WorkableTemplateQuerySet.as_manager()
 
     def contract(self) -> UFDLJobContract:
+        # Local import to avoid circular reference error
+        from ...initialise import parse_contract
+
         return parse_contract(self.type)
 
     def iterate_inputs(self) -> Iterator[Tuple[str, Tuple[UFDLJSONType, ...]]]:
-        contract = parse_contract(self.type)
+        contract = self.contract()
 
         return (
             (input_name, input.types)
             for input_name, input in contract.inputs.items()
         )
 
+    def implements_contract(self, contract_name: str) -> bool:
+        """
+        Whether this template implements the named contract, according
+        to the template-compatibility index.
+
+        :param contract_name:   The name of the contract.
+        :return:                Whether the template implements it.
+        """
+        # Make sure this template is in the index
+        if not self.indexed_contracts.exists():
+            # Local import to avoid circular reference error
+            from ...initialise import initialise
+            from ._JobType import JobType
+
+            initialise(JobType, JobContract)
+            self.index_compatibility()
+
+        return self.indexed_contracts.filter(contract__name=contract_name).exists()
+
+    @transaction.atomic
+    def index_compatibility(self):
+        """
+        (Re-)adds this template to the template-compatibility index, recording which
+        contracts it implements and which types each of its inputs accepts, so that
+        templates can be matched to inputs without parsing their contracts.
+        """
+        contract = self.contract()
+
+        # Remove any existing entries for this template
+        self.indexed_contracts.all().delete()
+        self.indexed_input_types.all().delete()
+
+        WorkableTemplateContract.objects.bulk_create([
+            WorkableTemplateContract(template=self, contract=job_contract)
+            for job_contract in JobContract.objects.all()
+            if isinstance(contract, job_contract.realise_cls())
+        ])
+
+        WorkableTemplateInputType.objects.bulk_create([
+            WorkableTemplateInputType(template=self, input_name=input_name, type=input_type)
+            for input_name, input_types in self.iterate_inputs()
+            for input_type in set(map(str, input_types))
+        ])
+
     def create_job(
             self,
             user: User,
@@ -60,7 +158,8 @@ class WorkableTemplate(JobTemplate):
             parameter_values: Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]] = None,
             description: Optional[str] = None,
             notification_override: Optional[NotificationOverride] = None,
-            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None
+            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None,
+            child_name: Optional[str] = None
     ) -> Job:
         # Should never pass child notification overrides to a workable job
         assert child_notification_overrides is None, "Workable jobs can't have children"
@@ -89,15 +188,188 @@ class WorkableTemplate(JobTemplate):
                 for parameter_name, parameter in parameter_values.items()
             }) if parameter_values is not None else None,
             description=description if description is not None else "",
+            child_name=child_name,
             creator=user
         )
+        # Get the files the job's inputs consist of
+        input_file_pks = self.resolve_input_files(input_values)
+
+        job.result_key = self.result_key_for(
+            job,
+            self.resolve_input_fingerprint(input_values, input_file_pks) if self.deterministic and parent is None else None
+        )
+
+        # Charge the job to its team's quota (child jobs were admitted along with their parent)
+        Job.bulk_admit(
+            [job],
+            parent.team_id if parent is not None else self.resolve_owning_team(input_values),
+            check=parent is None
+        )
+
+        # Count the job in its template's metrics
+        Job.bulk_count_created([job])
+
         job.save()
 
+        # Record which files the job's inputs consist of, for placing it on nodes which hold them
+        Job.bulk_set_input_files([job], input_file_pks)
+
         # Attach the notification overrides
         job.set_notifications_from_override(notification_override)
 
+        # Reuse the result of an identical prior job, if there is one
+        Job.bulk_finish_from_prior_results([job])
+
         return job
 
+    def create_jobs(
+            self,
+            user: User,
+            input_values: Dict[str, Tuple[RawJSONElement, UFDLJSONType]],
+            parameter_value_sets: List[Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]]],
+            description: Optional[str] = None,
+            notification_override: Optional[NotificationOverride] = None,
+            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None
+    ) -> List[Job]:
+        # Should never pass child notification overrides to a workable job
+        assert child_notification_overrides is None, "Workable jobs can't have children"
+
+        # The inputs are shared by all jobs, so only need checking once
+        self.check_input_values(input_values)
+
+        # Check each set of parameter values against the parameters, loading them only once
+        parameters = self.realise_parameters()
+        for parameter_values in parameter_value_sets:
+            self.check_parameter_values(parameter_values, parameters)
+
+        # Format the input values (shared by all jobs)
+        input_values_json = json.dumps({
+            input_name: {
+                "value": input[0],
+                "type": str(input[1])
+            }
+            for input_name, input in input_values.items()
+        })
+
+        # Create all job instances in one query
+        jobs = [
+            Job(
+                template=self,
+                parent=None,
+                input_values=input_values_json,
+                parameter_values=json.dumps({
+                    parameter_name: {
+                        "value": parameter[0],
+                        "type": str(parameter[1])
+                    }
+                    for parameter_name, parameter in parameter_values.items()
+                }) if parameter_values is not None else None,
+                description=description if description is not None else "",
+                creator=user
+            )
+            for parameter_values in parameter_value_sets
+        ]
+        # Get the files the jobs' shared inputs consist of
+        input_file_pks = self.resolve_input_files(input_values)
+
+        # The inputs are shared by all jobs, so only need fingerprinting once
+        input_fingerprint = (
+            self.resolve_input_fingerprint(input_values, input_file_pks)
+            if self.deterministic else
+            None
+        )
+        for job in jobs:
+            job.result_key = self.result_key_for(job, input_fingerprint)
+
+        # Charge all jobs to their team's quota and count them in the template's metrics at once
+        Job.bulk_admit(jobs, self.resolve_owning_team(input_values))
+        Job.bulk_count_created(jobs)
+
+        jobs = Job.objects.bulk_create(jobs)
+
+        # Record which files the jobs' shared inputs consist of
+        Job.bulk_set_input_files(jobs, input_file_pks)
+
+        # Attach the notification overrides to all jobs at once
+        Job.bulk_set_notifications_from_override(jobs, notification_override)
+
+        # Reuse the results of identical prior jobs, if there are any
+        Job.bulk_finish_from_prior_results(jobs)
+
+        return jobs
+
+    def result_key_for(self, job: Job, input_fingerprint: Optional[str]) -> Optional[str]:
+        """
+        Gets the key identifying the result of a job of this template, if
+        the result can be reused by identical jobs.
+
+        :param job:
+                    The job.
+        :param input_fingerprint:
+                    The fingerprint of the contents of the job's inputs
+                    (see resolve_input_fingerprint), or None if not fingerprinted.
+        :return:
+                    The result key, or None if results of this template aren't reused.
+        """
+        # Only top-level jobs of deterministic templates reuse results
+        if not self.deterministic or job.parent is not None or input_fingerprint is None:
+            return None
+
+        return Job.compute_result_key(self.pk, job.input_values, job.parameter_values, input_fingerprint)
+
+    @staticmethod
+    def resolve_input_files(input_values: Dict[str, Tuple[RawJSONElement, UFDLJSONType]]) -> Set[int]:
+        """
+        Gets the primary keys of the files that the given input values refer to.
+
+        :param input_values:
+                    The input values to a job.
+        :return:
+                    The primary keys of the files.
+        """
+        return Job.resolve_input_files({
+            input_name: (input[0], str(input[1]))
+            for input_name, input in input_values.items()
+        })
+
+    @staticmethod
+    def resolve_input_fingerprint(
+            input_values: Dict[str, Tuple[RawJSONElement, UFDLJSONType]],
+            input_file_pks: Set[int]
+    ) -> str:
+        """
+        Gets a fingerprint of the current contents of the given input values.
+
+        :param input_values:
+                    The input values to a job.
+        :param input_file_pks:
+                    The primary keys of the files the input values refer to.
+        :return:
+                    The fingerprint.
+        """
+        return Job.resolve_input_fingerprint(
+            {
+                input_name: (input[0], str(input[1]))
+                for input_name, input in input_values.items()
+            },
+            input_file_pks
+        )
+
+    @staticmethod
+    def resolve_owning_team(input_values: Dict[str, Tuple[RawJSONElement, UFDLJSONType]]) -> Optional[int]:
+        """
+        Gets the team that a job with the given input values is charged to.
+
+        :param input_values:
+                    The input values to a job.
+        :return:
+                    The primary key of the team, if any.
+        """
+        return Job.resolve_owning_team({
+            input_name: (input[0], str(input[1]))
+            for input_name, input in input_values.items()
+        })
+
     def to_json(self) -> JobTemplateSpec:
         return JobTemplateSpec(
             name=self.name,
@@ -0,0 +1,41 @@
+from django.db import models
+
+from ...apps import UFDLCoreAppConfig
+
+
+class WorkableTemplateContractQuerySet(models.QuerySet):
+    """
+    A query-set of the contracts implemented by workable templates.
+    """
+    pass
+
+
+class WorkableTemplateContract(models.Model):
+    """
+    Index entry recording that a workable template implements a contract
+    (either its own contract, or one that its contract specialises).
+    """
+    # The template implementing the contract
+    template = models.ForeignKey(
+        f"{UFDLCoreAppConfig.label}.WorkableTemplate",
+        on_delete=models.CASCADE,
+        related_name="indexed_contracts"
+    )
+
+    # The contract implemented by the template
+    contract = models.ForeignKey(
+        f"{UFDLCoreAppConfig.label}.JobContract",
+        on_delete=models.CASCADE,
+        related_name="indexed_templates"
+    )
+
+    objects = WorkableTemplateContractQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure that each template/contract pair is only indexed once
+            models.UniqueConstraint(
+                name="unique_workable_template_contracts",
+                fields=["template", "contract"]
+            )
+        ]
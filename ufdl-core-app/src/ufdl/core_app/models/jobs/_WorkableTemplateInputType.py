@@ -0,0 +1,54 @@
+from django.db import models
+
+from ...apps import UFDLCoreAppConfig
+
+
+class WorkableTemplateInputTypeQuerySet(models.QuerySet):
+    """
+    A query-set of the types accepted by the inputs of workable templates.
+    """
+    def for_input(self, input_name: str):
+        """
+        Filters the query-set to the types accepted by inputs with the given name.
+
+        :param input_name:  The name of the input.
+        :return:            The filtered query-set.
+        """
+        return self.filter(input_name=input_name)
+
+
+class WorkableTemplateInputType(models.Model):
+    """
+    Index entry recording that an input of a workable template
+    accepts values of a given type.
+    """
+    # The template with the input
+    template = models.ForeignKey(
+        f"{UFDLCoreAppConfig.label}.WorkableTemplate",
+        on_delete=models.CASCADE,
+        related_name="indexed_input_types"
+    )
+
+    # The name of the input
+    input_name = models.CharField(max_length=128)
+
+    # The type accepted by the input
+    type = models.CharField(max_length=256)
+
+    objects = WorkableTemplateInputTypeQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure that each accepted type is only indexed once per input
+            models.UniqueConstraint(
+                name="unique_workable_template_input_types",
+                fields=["template", "input_name", "type"]
+            )
+        ]
+        indexes = [
+            # Matching looks up templates by the types accepted by a named input
+            models.Index(
+                name="workable_template_input_types",
+                fields=["input_name", "type"]
+            )
+        ]
@@ -4,10 +4,13 @@ Package for models related to managing jobs performed on worker nodes.
 from ._WorkableTemplate import WorkableTemplate, WorkableTemplateQuerySet
 from ._Job import Job, JobQuerySet
 from ._JobContract import JobContract, JobContractQuerySet
+from ._JobMetric import JobMetric, JobMetricQuerySet
 from ._JobOutput import JobOutput, JobOutputQuerySet
 from ._JobTemplate import JobTemplate, JobTemplateQuerySet
 from ._JobType import JobType, JobTypeQuerySet
 from ._Parameter import Parameter, ParameterQuerySet
+from ._WorkableTemplateContract import WorkableTemplateContract, WorkableTemplateContractQuerySet
+from ._WorkableTemplateInputType import WorkableTemplateInputType, WorkableTemplateInputTypeQuerySet
 
 # Include all sub-packages as well
 from .meta import *
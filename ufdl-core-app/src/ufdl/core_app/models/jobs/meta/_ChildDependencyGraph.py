@@ -0,0 +1,165 @@
+from typing import AbstractSet, Dict, FrozenSet, List, Tuple
+
+from ._MetaTemplateDependency import MetaTemplateDependency
+
+
+class ChildNode:
+    """
+    A child of a meta-template in its compiled dependency graph.
+    """
+    def __init__(
+            self,
+            name: str,
+            relation_pk: int,
+            template_pk: int,
+            input_dependencies: Dict[str, Tuple[str, str, str]]
+    ):
+        # The name given to the child in the meta-template
+        self.name: str = name
+
+        # The primary key of the child-relation
+        self.relation_pk: int = relation_pk
+
+        # The primary key of the child template
+        self.template_pk: int = template_pk
+
+        # Map from the name of each internally-connected input of the child to the
+        # name of the child providing it, and the name and type of the output
+        self.input_dependencies: Dict[str, Tuple[str, str, str]] = input_dependencies
+
+        # The names of the children this child depends on
+        self.dependency_names: FrozenSet[str] = frozenset(
+            dependency_name
+            for dependency_name, _, _ in input_dependencies.values()
+        )
+
+
+class ChildDependencyGraph:
+    """
+    The dependencies between the children of a meta-template, loaded from the
+    database once so that working out which children are ready to run doesn't
+    require any further queries. Meta-templates are never modified once
+    imported, so the compiled graph for each can be shared for the life of
+    the process.
+    """
+    def __init__(self, children: List[ChildNode]):
+        # The children, in topological order (dependencies before dependents)
+        self.children: Tuple[ChildNode, ...] = self._topological_order(children)
+
+        # The children, keyed by name
+        self.children_by_name: Dict[str, ChildNode] = {
+            child.name: child
+            for child in self.children
+        }
+
+    @property
+    def child_names(self) -> AbstractSet[str]:
+        """
+        The names of all children in the graph.
+        """
+        return self.children_by_name.keys()
+
+    def ready_children(
+            self,
+            created: AbstractSet[str],
+            finished: AbstractSet[str]
+    ) -> List[ChildNode]:
+        """
+        Gets the children which haven't been created yet, but whose
+        dependencies have all finished.
+
+        :param created:
+                    The names of the children which have already been created.
+        :param finished:
+                    The names of the children which have finished.
+        :return:
+                    The children which are ready to be created, in topological order.
+        """
+        return [
+            child
+            for child in self.children
+            if child.name not in created and child.dependency_names.issubset(finished)
+        ]
+
+    @staticmethod
+    def _topological_order(children: List[ChildNode]) -> Tuple[ChildNode, ...]:
+        """
+        Orders the children so that each comes after all of its dependencies.
+
+        :param children:
+                    The children to order.
+        :return:
+                    The ordered children.
+        """
+        remaining = {child.name: child for child in children}
+        ordered = []
+        placed = set()
+
+        while len(remaining) > 0:
+            ready = [
+                child
+                for child in remaining.values()
+                if child.dependency_names.issubset(placed)
+            ]
+
+            if len(ready) == 0:
+                raise ValueError(f"Cyclic dependencies between children: {', '.join(remaining.keys())}")
+
+            for child in ready:
+                ordered.append(child)
+                placed.add(child.name)
+                del remaining[child.name]
+
+        return tuple(ordered)
+
+
+# The compiled graphs of each meta-template, keyed by the template's primary key
+COMPILED_GRAPHS: Dict[int, ChildDependencyGraph] = {}
+
+
+def get_child_dependency_graph(meta_template) -> ChildDependencyGraph:
+    """
+    Gets the compiled dependency graph of a meta-template, compiling
+    it if this is the first time it has been requested.
+
+    :param meta_template:
+                The meta-template.
+    :return:
+                The compiled graph.
+    """
+    graph = COMPILED_GRAPHS.get(meta_template.pk, None)
+
+    if graph is not None:
+        return graph
+
+    # Load the children and their dependencies in two queries
+    child_relations = list(meta_template.child_relations.all())
+    input_dependencies: Dict[int, Dict[str, Tuple[str, str, str]]] = {
+        child_relation.pk: {}
+        for child_relation in child_relations
+    }
+    for dependency in (
+            MetaTemplateDependency.objects
+            .filter(dependent__parent=meta_template)
+            .select_related("dependency")
+    ):
+        output_name, output_type = dependency.output.split("\n")
+        input_dependencies[dependency.dependent_id][str(dependency.input)] = (
+            dependency.dependency.name,
+            output_name,
+            output_type
+        )
+
+    graph = ChildDependencyGraph([
+        ChildNode(
+            child_relation.name,
+            child_relation.pk,
+            child_relation.child_id,
+            input_dependencies[child_relation.pk]
+        )
+        for child_relation in child_relations
+    ])
+
+    COMPILED_GRAPHS[meta_template.pk] = graph
+
+    return graph
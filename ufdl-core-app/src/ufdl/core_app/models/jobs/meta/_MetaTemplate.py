@@ -1,7 +1,6 @@
 import json
-from typing import Optional, Dict, Iterator
+from typing import Optional, Dict, Iterator, List
 
-from django.db import models
 from ufdl.json.core.jobs import JobTemplateSpec, ValueTypePair
 from ufdl.json.core.jobs.meta import DependencyGraph, Node, Dependency
 from ufdl.json.core.jobs.notification import NotificationOverride
@@ -10,8 +9,9 @@ from wai.json.object import Absent
 from ....exceptions import InvalidJobInput
 from ..._User import User
 from .._Job import Job
+from .._JobOutput import JobOutput
 from .._JobTemplate import JobTemplate, JobTemplateQuerySet
-from ._MetaTemplateChildRelation import MetaTemplateChildRelation
+from ._ChildDependencyGraph import ChildDependencyGraph, ChildNode, get_child_dependency_graph
 
 
 class MetaTemplateQuerySet(JobTemplateQuerySet):
@@ -70,7 +70,8 @@ class MetaTemplate(JobTemplate):
             parameter_values: Dict[str, str],
             description: Optional[str] = None,
             notification_override: Optional[NotificationOverride] = None,
-            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None
+            child_notification_overrides: Optional[Dict[str, NotificationOverride]] = None,
+            child_name: Optional[str] = None
     ) -> Job:
         # Check all inputs values are present and of a valid type
         if parent is None:
@@ -83,8 +84,23 @@ class MetaTemplate(JobTemplate):
             input_values=json.dumps(input_values),
             parameter_values=json.dumps(parameter_values),
             description=description if description is not None else "",
+            child_name=child_name,
             creator=user
         )
+
+        # Charge the meta-job's children to the same team as it
+        meta_job.team_id = (
+            parent.team_id
+            if parent is not None else
+            Job.resolve_owning_team({
+                input_name: (input[0], str(input[1]))
+                for input_name, input in input_values.items()
+            })
+        )
+
+        # Count the meta-job in its template's metrics
+        Job.bulk_count_created([meta_job])
+
         meta_job.save()
 
         # Add the notification override for this job and any children
@@ -92,145 +108,193 @@ class MetaTemplate(JobTemplate):
         if child_notification_overrides is not None:
             meta_job.attach_notification_overrides(child_notification_overrides)
 
-        # Get the children which have no dependencies
-        dependencyless_children = (
-            self.child_relations
-                .annotate(num_dependencies=models.Count('dependencies'))
-                .filter(num_dependencies=0)
-        )
-
         # Create all sub-jobs with no dependencies
-        for child in dependencyless_children.all():
-            self.create_sub_job(
-                meta_job,
-                child
-            )
+        self.create_sub_jobs(
+            meta_job,
+            self.child_dependency_graph().ready_children(frozenset(), frozenset())
+        )
 
         return meta_job
 
-    def create_sub_job(
+    def child_dependency_graph(self) -> ChildDependencyGraph:
+        """
+        Gets the compiled graph of the dependencies between
+        the children of this meta-template.
+        """
+        return get_child_dependency_graph(self)
+
+    def create_sub_jobs(
             self,
             parent_job: Job,
-            child_relation: MetaTemplateChildRelation,
+            children: List[ChildNode],
             job_dependencies: Optional[Dict[str, Job]] = None
-    ) -> Job:
+    ) -> List[Job]:
         """
-        Creates a sub-job for this meta-template using the provided child,
-        and output values from the provided job-dependencies.
+        Creates sub-jobs for this meta-template using the provided children,
+        and output values from the provided job-dependencies. All values the
+        children need from the database are loaded up-front, rather than
+        per child/input.
 
         :param parent_job:
                     The parent meta-job controlling the execution of this
                     meta-template.
-        :param child_relation:
-                    The child-relation to the child template to execute.
+        :param children:
+                    The children of this meta-template to create jobs for.
         :param job_dependencies:
-                    A map containing the jobs from which the new child
-                    should draw its required inputs.
+                    A map containing the jobs from which the new children
+                    should draw their required inputs.
         :return:
-                    The created child job.
+                    The created child jobs.
         """
-        # Get the input values that apply to this sub-job
-        input_values = json.loads(parent_job.input_values)
-        child_input_values = {}
-        for input in child_relation.child.inputs.all():
-            # Get the name of the correlated input on the parent
-            parent_input_name = f"{child_relation.name}:{input.name}"
-
-            # If a value is provided directly, for the input, use it
-            if parent_input_name in input_values:
-                child_input_values[input.name] = input_values[parent_input_name]
-                continue
-
-            # If no dependency-jobs are provided, there is no way to get a value for this input
-            if job_dependencies is None:
-                raise InvalidJobInput(
-                    "Tried to create dependent sub-job without dependencies"
-                )
+        # Nothing to do if there are no children to create
+        if len(children) == 0:
+            return []
+
+        if job_dependencies is None:
+            job_dependencies = {}
+
+        # Load the child templates
+        child_templates = {
+            template.pk: template.upcast()
+            for template in (
+                JobTemplate.objects
+                    .filter(pk__in=[child.template_pk for child in children])
+                    .select_related("workabletemplate", "metatemplate")
+            )
+        }
+
+        # Load all outputs the children depend on
+        dependency_outputs = {
+            (output.job_id, output.name, output.type): output
+            for output in JobOutput.objects.filter(
+                job__in=[
+                    job_dependencies[dependency_name]
+                    for child in children
+                    for dependency_name in child.dependency_names
+                    if dependency_name in job_dependencies
+                ]
+            )
+        }
+
+        # Load the parameters of this template, for their defaults
+        parameters = {
+            parameter.name: parameter
+            for parameter in self.parameters.all()
+        }
+
+        # Get the fully-qualified name of the new jobs in their parent hierarchy
+        full_child_names = {
+            child.name: (
+                f"{parent_job.full_child_name}:{child.name}"
+                if parent_job.has_parent else
+                child.name
+            )
+            for child in children
+        }
+
+        # Get the notification overrides for the children from the top-level parent
+        overrides = {
+            override.name: NotificationOverride.from_json_string(override.override)
+            for override in (
+                parent_job
+                    .top_level_parent
+                    .notification_overrides
+                    .filter(name__in=full_child_names.values())
+            )
+        }
 
-            # Get the dependency of this template that should provide the input
-            dependency = child_relation.dependencies.filter(input=input).first()
+        input_values = json.loads(parent_job.input_values)
+        parameter_values = json.loads(parent_job.parameter_values)
 
-            # Get the name of the dependency
-            dependency_name = dependency.dependency.name
+        child_jobs = []
+        for child in children:
+            child_template = child_templates[child.template_pk]
 
-            # Get the job that should provide the output for this input
-            job_dependency = job_dependencies[dependency_name]
+            # Inputs provided directly to the parent for this child
+            input_prefix = f"{child.name}:"
+            child_input_values = {
+                input_name[len(input_prefix):]: value
+                for input_name, value in input_values.items()
+                if input_name.startswith(input_prefix)
+            }
 
-            # Make sure the job-dependency is present
-            if job_dependency is None:
-                raise InvalidJobInput(
-                    f"Tried to create dependent sub-job without dependency '{dependency_name}'"
-                )
-            elif not job_dependency.is_finished:
-                raise InvalidJobInput(
-                    f"Tried to create dependent sub-job when dependency '{dependency_name}' "
-                    f"is not finished"
-                )
+            # Get the names of the inputs the child requires (meta-templates don't
+            # define their own inputs, so can only be checked against their dependencies)
+            child_input_names = (
+                [input_name for input_name, _ in child_template.iterate_inputs()]
+                if not isinstance(child_template, MetaTemplate) else
+                list(child.input_dependencies.keys())
+            )
 
-            # Get the name and type of the output this input depends on
-            output_dependency_name, output_dependency_type = dependency.output.split("\n")
+            # Inputs provided by the outputs of other children
+            for input_name in child_input_names:
+                # If a value is provided directly, for the input, use it
+                if input_name in child_input_values:
+                    continue
+
+                # If no dependency provides the input, there is no way to get a value for it
+                if input_name not in child.input_dependencies:
+                    raise InvalidJobInput(
+                        f"No input value or dependency provided for input '{input_name}' "
+                        f"of sub-job '{child.name}'"
+                    )
 
-            # Get the output dependency from the job
-            output_dependency = job_dependency.outputs.filter(
-                name=output_dependency_name,
-                type=output_dependency_type
-            ).first()
+                dependency_name, output_name, output_type = child.input_dependencies[input_name]
 
-            # Make sure the output exists
-            if output_dependency is None:
-                raise InvalidJobInput(
-                    f"Job-dependency '{dependency_name}' produced no output "
-                    f"'{output_dependency_name}' of type {output_dependency_type}"
-                )
+                # Get the job that should provide the output for this input
+                job_dependency = job_dependencies.get(dependency_name, None)
 
-            # Add the job's output as the input value
-            child_input_values[input.name] = {
-                "value": str(output_dependency.pk),
-                "type": f"job_output<{output_dependency_type}>"
-            }
+                # Make sure the job-dependency is present
+                if job_dependency is None:
+                    raise InvalidJobInput(
+                        f"Tried to create dependent sub-job without dependency '{dependency_name}'"
+                    )
+                elif not job_dependency.is_finished:
+                    raise InvalidJobInput(
+                        f"Tried to create dependent sub-job when dependency '{dependency_name}' "
+                        f"is not finished"
+                    )
 
-        # Get the parameter values that apply to this sub-job
-        parameter_values = json.loads(parent_job.parameter_values)
-        child_parameter_values = {}
-        for parameter in child_relation.child.parameters.all():
-            parent_parameter_name = f"{child_relation.name}:{parameter.name}"
-            child_parameter_values[parameter.name] = (
-                parameter_values[parent_parameter_name]
-                if parent_parameter_name in parameter_values else
-                self.get_parameter_by_name(parent_parameter_name).default
-            )
+                # Get the output dependency from the job
+                output_dependency = dependency_outputs.get((job_dependency.pk, output_name, output_type), None)
 
-        # Get the fully-qualified name of the new job in its parent hierarchy
-        full_child_name = (
-            f"{parent_job.full_child_name}:{child_relation.name}"
-            if parent_job.has_parent else
-            child_relation.name
-        )
+                # Make sure the output exists
+                if output_dependency is None:
+                    raise InvalidJobInput(
+                        f"Job-dependency '{dependency_name}' produced no output "
+                        f"'{output_name}' of type {output_type}"
+                    )
 
-        # Get the notification overrides for this child from the top-level parent
-        override = (
-            parent_job
-                .top_level_parent
-                .notification_overrides
-                .with_name(full_child_name)
-                .first()
-        )
+                # Add the job's output as the input value
+                child_input_values[input_name] = {
+                    "value": str(output_dependency.pk),
+                    "type": f"job_output<{output_type}>"
+                }
+
+            # Get the parameter values that apply to this sub-job
+            child_parameter_values = {}
+            for parameter in child_template.parameters.all():
+                parent_parameter_name = f"{child.name}:{parameter.name}"
+                child_parameter_values[parameter.name] = (
+                    parameter_values[parent_parameter_name]
+                    if parent_parameter_name in parameter_values else
+                    parameters[parent_parameter_name].default
+                )
 
-        # Convert the overrides to JSON
-        if override is not None:
-            override = NotificationOverride.from_json_string(override.override)
-
-        # Create the child job
-        child_job = child_relation.child.create_job(
-            parent_job.creator,
-            parent_job,
-            child_input_values,
-            child_parameter_values,
-            f"child job '{child_relation.name}' of meta-job {self.name_and_version}",
-            override
-        )
+            # Create the child job
+            child_jobs.append(
+                child_template.create_job(
+                    parent_job.creator,
+                    parent_job,
+                    child_input_values,
+                    child_parameter_values,
+                    f"child job '{child.name}' of meta-job {self.name_and_version}",
+                    overrides.get(full_child_names[child.name], None),
+                    child_name=child.name
+                )
+            )
 
-        return child_job
+        return child_jobs
 
     def to_json(self) -> JobTemplateSpec:
         return JobTemplateSpec(
@@ -2,6 +2,7 @@
 Package specifying models related to meta-job templates, which coordinate
 other templates into a workflow.
 """
+from ._ChildDependencyGraph import ChildDependencyGraph, ChildNode, get_child_dependency_graph
 from ._MetaTemplate import MetaTemplate, MetaTemplateQuerySet
 from ._MetaTemplateChildRelation import MetaTemplateChildRelation, MetaTemplateChildRelationQuerySet
 from ._MetaTemplateDependency import MetaTemplateDependency, MetaTemplateDependencyQuerySet
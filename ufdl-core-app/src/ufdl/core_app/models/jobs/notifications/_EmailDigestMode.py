@@ -0,0 +1,17 @@
+from enum import Enum
+
+
+class EmailDigestMode(Enum):
+    """
+    Enumeration of the ways email notifications can be grouped
+    into digests before sending.
+    """
+    # Each notification is sent as its own email
+    NONE = "none"
+
+    # Notifications to the same recipients are grouped over a time window
+    WINDOW = "window"
+
+    # Notifications to the same recipients are grouped over a time window,
+    # separately for each top-level job hierarchy
+    HIERARCHY = "hierarchy"
@@ -1,6 +1,6 @@
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
-from django.core.mail import EmailMessage
+from django.core.mail import EmailMessage, get_connection
 from django.db import models
 
 from ufdl.json.core.jobs.notification import EmailNotification as JSONEmailNotification
@@ -8,6 +8,9 @@ from ufdl.json.core.jobs.notification import EmailNotification as JSONEmailNotif
 from wai.json.object import Absent
 from wai.json.raw import RawJSONElement, is_raw_json_primitive
 
+from ....notifications import get_email_digest_buffer
+from ....settings import core_settings
+from ._EmailDigestMode import EmailDigestMode
 from ._Notification import Notification, NotificationQuerySet
 
 
@@ -37,6 +40,16 @@ class EmailNotification(Notification):
     # The blind-copied recipients of the email
     bcc = models.TextField(null=True)
 
+    # How the email is grouped with others into a digest before sending
+    digest_mode = models.CharField(
+        max_length=16,
+        choices=tuple(
+            (mode.value, mode.name)
+            for mode in EmailDigestMode
+        ),
+        default=EmailDigestMode.NONE.value
+    )
+
     objects = EmailNotificationQuerySet.as_manager()
 
     class Meta:
@@ -44,7 +57,7 @@ class EmailNotification(Notification):
             # Ensure that each notification specification is unique
             models.UniqueConstraint(
                 name="unique_email_notifications",
-                fields=["subject", "body", "to", "cc", "bcc"]
+                fields=["subject", "body", "to", "cc", "bcc", "digest_mode"]
             )
         ]
 
@@ -55,7 +68,8 @@ class EmailNotification(Notification):
             body: str,
             to: List[str],
             cc: List[str],
-            bcc: List[str]
+            bcc: List[str],
+            digest_mode: Optional[EmailDigestMode] = None
     ) -> 'EmailNotification':
         """
         Creates an instance of this model, or returns a matching existing
@@ -71,16 +85,24 @@ class EmailNotification(Notification):
                     The list of copied recipients.
         :param bcc:
                     The list of blind-copied recipients.
+        :param digest_mode:
+                    How the email is grouped into digests. Defaults to
+                    the server-wide setting.
         :return:
                     The new or existing instance.
         """
+        # Use the server-wide digest mode if none is specified
+        if digest_mode is None:
+            digest_mode = core_settings.EMAIL_NOTIFICATION_DIGEST_MODE
+
         # Format the arguments for the constructor
         kwargs = dict(
             subject=subject,
             body=body,
             to="\n".join(to) if len(to) > 0 else None,
             cc="\n".join(cc) if len(cc) > 0 else None,
-            bcc="\n".join(bcc) if len(bcc) > 0 else None
+            bcc="\n".join(bcc) if len(bcc) > 0 else None,
+            digest_mode=digest_mode.value
         )
 
         # Check if an equivalent instance already exists
@@ -113,6 +135,85 @@ class EmailNotification(Notification):
         )
 
     def perform(self, job: 'Job', **data: RawJSONElement):
+        message = self.create_message(job, **data)
+
+        if self.digest is EmailDigestMode.NONE:
+            message.send()
+        else:
+            self.add_to_digest(job, message)
+
+    @classmethod
+    def perform_batch(
+            cls,
+            events: List['NotificationEvent']
+    ) -> List[Tuple['NotificationEvent', Exception]]:
+        failures = []
+
+        # Create the messages, passing those in digest mode on to the digest buffer
+        messages = []
+        for event in events:
+            try:
+                message = event.notification.create_message(event.job, **event.data)
+                if event.notification.digest is EmailDigestMode.NONE:
+                    messages.append((event, message))
+                else:
+                    event.notification.add_to_digest(event.job, message)
+            except Exception as e:
+                failures.append((event, e))
+
+        # Nothing more to do if all messages were digested
+        if len(messages) == 0:
+            return failures
+
+        # Send the remaining emails in the batch over a single connection to the mail server
+        with get_connection() as connection:
+            for event, message in messages:
+                try:
+                    message.connection = connection
+                    message.send()
+                except Exception as e:
+                    failures.append((event, e))
+
+        return failures
+
+    @property
+    def digest(self) -> EmailDigestMode:
+        """
+        How this email is grouped into digests.
+        """
+        return EmailDigestMode(self.digest_mode)
+
+    def add_to_digest(self, job: 'Job', message: EmailMessage):
+        """
+        Adds a message created by this notification to the pending
+        digest for its recipients.
+
+        :param job:
+                    The job that made the transition.
+        :param message:
+                    The message to add.
+        """
+        if self.digest is EmailDigestMode.HIERARCHY:
+            top_level_job = job.top_level_parent
+            key = (top_level_job.pk, tuple(message.to), tuple(message.cc), tuple(message.bcc))
+            title = f"UFDL notifications for job #{top_level_job.pk}"
+        else:
+            key = (None, tuple(message.to), tuple(message.cc), tuple(message.bcc))
+            title = "UFDL job notifications"
+
+        get_email_digest_buffer().add(key, title, message)
+
+    def create_message(self, job: 'Job', **data: RawJSONElement) -> EmailMessage:
+        """
+        Creates the email to send for a job transition.
+
+        :param job:
+                    The job that made the transition.
+        :param data:
+                    The notification data for the transition.
+        :return:
+                    The email message.
+        """
         # Stringify the data
         all_data_str: Dict[str, str] = {key: str(value) for key, value in data.items()}
         primitive_data_str: Dict[str, str] = {
@@ -121,7 +222,7 @@ class EmailNotification(Notification):
         }
 
         # Create and format the email to send
-        message = EmailMessage(
+        return EmailMessage(
             subject=self.subject.format(**primitive_data_str),
             body=self.body.format(**all_data_str),
             to=(
@@ -140,9 +241,3 @@ class EmailNotification(Notification):
                 None
             )
         )
-
-        # Send the email
-        try:
-            message.send()
-        except Exception as e:
-            print(f"Error sending email notification: {e}")
@@ -1,3 +1,5 @@
+from typing import List, Tuple
+
 from ufdl.json.core.jobs.notification import Notification as JSONNotification
 
 from wai.json.raw import RawJSONElement
@@ -65,6 +67,31 @@ class Notification(DeleteOnNoRemainingReferencesOnlyModel):
 
     def perform(self, job: 'Job', **data: RawJSONElement):
         """
-        Performs the notification.
+        Performs the notification. Should raise an exception if the
+        notification could not be delivered, so that delivery can be retried.
         """
         raise NotImplementedError(self.perform.__qualname__)
+
+    @classmethod
+    def perform_batch(
+            cls,
+            events: List['NotificationEvent']
+    ) -> List[Tuple['NotificationEvent', Exception]]:
+        """
+        Performs a batch of queued notifications of this type. Sub-types
+        can override this to share resources across the batch.
+
+        :param events:
+                    The notification events to perform.
+        :return:
+                    The events which failed, along with the error that occurred.
+        """
+        failures = []
+
+        for event in events:
+            try:
+                event.perform()
+            except Exception as e:
+                failures.append((event, e))
+
+        return failures
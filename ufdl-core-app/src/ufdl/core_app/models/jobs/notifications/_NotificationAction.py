@@ -21,6 +21,20 @@ class NotificationActionQuerySet(DeleteOnNoRemainingReferencesOnlyQuerySet):
         """
         return self.filter(transition_index=transition.value)
 
+    def with_notifications(self):
+        """
+        Loads the specialised notification of each action along with
+        the action, so that up-casting doesn't query the database.
+
+        :return:
+                    The query-set.
+        """
+        return self.select_related(
+            "notification__emailnotification",
+            "notification__printnotification",
+            "notification__websocketnotification"
+        )
+
 
 class NotificationAction(DeleteOnNoRemainingReferencesOnlyModel):
     """
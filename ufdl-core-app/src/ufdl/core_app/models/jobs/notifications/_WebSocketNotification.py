@@ -1,17 +1,21 @@
 from typing import Dict, Optional
+from urllib.parse import parse_qs
 
 from asgiref.sync import async_to_sync
 
 from channels.generic.websocket import JsonWebsocketConsumer
-from channels.layers import get_channel_layer
+
+from simple_django_teams.models import Membership
 
 from ufdl.json.core.jobs.notification import WebSocketNotification as JSONWebSocketNotification
 
 from wai.json.raw import RawJSONElement
 
+from ....notifications import get_websocket_broadcaster
 from ._Notification import Notification, NotificationQuerySet
 from ._Transition import Transition
 
+
 class WebSocketNotificationQuerySet(NotificationQuerySet):
     """
     A query-set of web-socket notifications.
@@ -52,57 +56,154 @@ class WebSocketNotification(Notification):
         return JSONWebSocketNotification()
 
     def perform(self, job: 'Job', **data: RawJSONElement):
-        try:
-            channel_layer = get_channel_layer()
+        broadcaster = get_websocket_broadcaster()
 
-            async_to_sync(channel_layer.group_send)(
-                job.websocket_group_name,
-                {
-                    'type': 'transition.enact',
-                    'content': data
-                }
-            )
-        except Exception as e:
-            print(f"Error sending web-socket message: {e}")
+        # Progress messages can be coalesced, but other transitions must
+        # not overtake any progress that is waiting to be sent
+        if data.get('transition') == Transition.PROGRESS.name.lower():
+            broadcaster.broadcast(job.websocket_group_names, data, coalesce_key=job.pk)
+        else:
+            broadcaster.flush_progress(job.pk)
+            broadcaster.broadcast(job.websocket_group_names, data)
 
 
-class WebSocketNotificationConsumer(JsonWebsocketConsumer):
+class GroupWebSocketConsumer(JsonWebsocketConsumer):
     """
-    TODO
+    Base class for consumers which subscribe to a group of job-transition
+    broadcasts. Subscribers can resume from the last message they received
+    by supplying its sequence number in the 'since' query parameter.
     """
     @property
-    def job_pk(self) -> int:
+    def pk(self) -> int:
+        """
+        The primary key of the object the group is for.
+        """
         return int(self.scope['url_route']['kwargs']['pk'])
 
     @property
     def group_name(self) -> str:
-        return f"Job-{self.job_pk}"
+        """
+        The name of the group to subscribe to.
+        """
+        raise NotImplementedError(f"{GroupWebSocketConsumer.__qualname__}.group_name")
+
+    @property
+    def since(self) -> Optional[int]:
+        """
+        The sequence number the subscriber is resuming from, if any.
+        """
+        since = parse_qs(self.scope.get('query_string', b'').decode()).get('since', None)
+
+        if since is None or not since[0].isdigit():
+            return None
+
+        return int(since[0])
+
+    def can_subscribe(self) -> bool:
+        """
+        Whether the connecting client is allowed to subscribe to the group.
+        """
+        raise NotImplementedError(self.can_subscribe.__qualname__)
+
+    def user_is_admin(self) -> bool:
+        """
+        Whether the connecting user is a staff-member or superuser.
+        """
+        user = self.scope.get('user', None)
+
+        return (
+            user is not None
+            and user.is_authenticated
+            and user.is_active
+            and (user.is_staff or user.is_superuser)
+        )
+
+    def user_is_member(self, team_pk: Optional[int]) -> bool:
+        """
+        Whether the connecting user is an active member of a team.
+
+        :param team_pk:     The primary key of the team, or None for no team.
+        :return:            Whether the user is a member.
+        """
+        if team_pk is None:
+            return False
+
+        return Membership.objects.filter(
+            team_id=team_pk,
+            user_id=getattr(self.scope.get('user', None), "pk", None),
+            deletion_time__isnull=True
+        ).exists()
 
     def connect(self):
+        # Reject the client before it joins the group if it can't subscribe
+        if not self.can_subscribe():
+            self.close()
+            return
+
         # Join room group
         async_to_sync(self.channel_layer.group_add)(
             self.group_name,
             self.channel_name
         )
 
+        self.accept()
+
+        # Replay any messages the subscriber missed
+        since = self.since
+        if since is not None:
+            for content in get_websocket_broadcaster().replay(self.group_name, since):
+                self.send_json(content)
+        else:
+            self.on_new_subscription()
+
+    def on_new_subscription(self):
+        """
+        Called when a client subscribes without resuming from a
+        previous subscription. Does nothing by default.
+        """
+        pass
+
+    def disconnect(self, close_code):
+        # Leave room group
+        async_to_sync(self.channel_layer.group_discard)(
+            self.group_name,
+            self.channel_name
+        )
+
+    def transition_enact(self, event):
+        self.send_json(event['content'])
+
+
+class WebSocketNotificationConsumer(GroupWebSocketConsumer):
+    """
+    Subscribes to the transitions of a single job.
+    """
+    @property
+    def job_pk(self) -> int:
+        return self.pk
+
+    @property
+    def group_name(self) -> str:
+        return f"Job-{self.job_pk}"
+
+    def can_subscribe(self) -> bool:
         # Get the job being monitored
-        from .._Job import Job, LifecyclePhase
+        from .._Job import Job
         job: Optional[Job] = Job.objects.filter(pk=self.job_pk).first()
 
         # If the job doesn't exist, no messages will be sent
         if job is None:
-            self.close()
-            return
+            return False
 
         # If the job has no web-socket notifications, no messages will be sent
-        if not any(
+        return any(
             isinstance(notification_action.notification.upcast(), WebSocketNotification)
-            for notification_action in job.notification_actions.all()
-        ):
-            self.close()
-            return
+            for notification_action in job.notification_actions.with_notifications()
+        )
 
-        self.accept()
+    def on_new_subscription(self):
+        from .._Job import Job, LifecyclePhase
+        job: Job = Job.objects.get(pk=self.job_pk)
 
         # Work out a proxy for the last transition
         transition = {
@@ -121,23 +222,60 @@ class WebSocketNotificationConsumer(JsonWebsocketConsumer):
         notification_data: Dict[str, RawJSONElement] = job._get_notification_data(transition)
         notification_data['transition_data'] = {}
 
-        # Perform the notifications
-        for notification_action in job.notification_actions.for_transition(transition).all():
+        # Send the last transition to the new subscriber if it would have been notified
+        for notification_action in job.notification_actions.for_transition(transition).with_notifications():
             # Suppress if part of a workflow
             if notification_action.suppress and job.has_parent:
                 continue
 
-            notification = notification_action.notification.upcast()
+            if isinstance(notification_action.notification.upcast(), WebSocketNotification):
+                self.send_json(notification_data)
+                break
 
-            if isinstance(notification, WebSocketNotification):
-                notification.perform(job, **notification_data)
 
-    def disconnect(self, close_code):
-        # Leave room group
-        async_to_sync(self.channel_layer.group_discard)(
-            self.group_name,
-            self.channel_name
-        )
+class JobHierarchyWebSocketConsumer(GroupWebSocketConsumer):
+    """
+    Subscribes to the transitions of all jobs in the hierarchy
+    under a top-level job. Only members of the team the job is
+    charged to, and staff, can subscribe.
+    """
+    @property
+    def group_name(self) -> str:
+        return f"JobHierarchy-{self.pk}"
 
-    def transition_enact(self, event):
-        self.send_json(event['content'])
+    def can_subscribe(self) -> bool:
+        from .._Job import Job
+        team_pks = Job.objects.filter(pk=self.pk, parent__isnull=True).values_list("team_id", flat=True)
+
+        # Can't subscribe to jobs that don't exist or aren't top-level
+        if len(team_pks) == 0:
+            return False
+
+        return self.user_is_admin() or self.user_is_member(team_pks[0])
+
+
+class NodeWebSocketConsumer(GroupWebSocketConsumer):
+    """
+    Subscribes to the transitions of all jobs worked by a node.
+    Only staff can subscribe.
+    """
+    @property
+    def group_name(self) -> str:
+        return f"Node-{self.pk}"
+
+    def can_subscribe(self) -> bool:
+        from ...nodes import Node
+        return self.user_is_admin() and Node.objects.filter(pk=self.pk).exists()
+
+
+class TeamWebSocketConsumer(GroupWebSocketConsumer):
+    """
+    Subscribes to the transitions of all jobs created by members of a team.
+    Only members of the team can subscribe.
+    """
+    @property
+    def group_name(self) -> str:
+        return f"Team-{self.pk}"
+
+    def can_subscribe(self) -> bool:
+        return self.user_is_member(self.pk)
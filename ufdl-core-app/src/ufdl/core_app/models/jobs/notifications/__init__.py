@@ -3,6 +3,7 @@ Models and functions for sending notifications when jobs transition
 between phases of their lifecycles.
 """
 from ._create import create_notification_from_json
+from ._EmailDigestMode import EmailDigestMode
 from ._EmailNotification import EmailNotification, EmailNotificationQuerySet
 from ._Notification import Notification, NotificationQuerySet
 from ._NotificationAction import NotificationAction, NotificationActionQuerySet
@@ -12,5 +13,9 @@ from ._Transition import Transition
 from ._WebSocketNotification import (
     WebSocketNotification,
     WebSocketNotificationQuerySet,
-    WebSocketNotificationConsumer
+    GroupWebSocketConsumer,
+    WebSocketNotificationConsumer,
+    JobHierarchyWebSocketConsumer,
+    NodeWebSocketConsumer,
+    TeamWebSocketConsumer
 )
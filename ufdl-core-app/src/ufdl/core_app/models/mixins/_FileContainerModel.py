@@ -33,6 +33,21 @@ class FileContainerModel(models.Model):
         """
         Adds a file to the container.
 
+        :param filename:    The filename to save the file under.
+        :param data:        The file data, or a canonical source to the data.
+        :return:            The file association.
+        """
+        # Charge the data against the owner's storage quota
+        if isinstance(data, bytes):
+            self.adjust_storage_quota(len(data))
+
+        return self._add_file(filename, data)
+
+    def _add_file(self, filename: str, data: Union[bytes, str]) -> 'NamedFile':
+        """
+        Adds a file to the container, without charging it
+        against the owner's storage quota.
+
         :param filename:    The filename to save the file under.
         :param data:        The file data, or a canonical source to the data.
         :return:            The file association.
@@ -78,9 +93,12 @@ class FileContainerModel(models.Model):
                 for filename in zip_file.namelist()
             }
 
+        # Charge all of the files against the owner's storage quota at once
+        self.adjust_storage_quota(sum(map(len, raw_files.values())))
+
         # Add the files to the container
         return [
-            self.add_file(filename, file_data)
+            self._add_file(filename, file_data)
             for filename, file_data in raw_files.items()
         ]
 
@@ -169,8 +187,21 @@ class FileContainerModel(models.Model):
         # Delete the file (tentatively)
         reference.delete()
 
+        # Return the file's storage to the owner's quota
+        self.adjust_storage_quota(-reference.file.size)
+
         return reference.file
 
+    def adjust_storage_quota(self, num_bytes: int, check: bool = True):
+        """
+        Adjusts the amount of storage charged to the owner of this container.
+        Containers which are subject to quotas should override this.
+
+        :param num_bytes:   The number of bytes added (or removed, if negative).
+        :param check:       Whether to enforce the owner's quota.
+        """
+        pass
+
     def get_file_metadata(self, filename: str) -> str:
         """
         Gets the meta-data associated with a file.
@@ -11,10 +11,11 @@ class SetFileModel(models.Model):
     class Meta:
         abstract = True
 
-    def set_file(self, data: Union[None, str, bytes]):
+    def set_file(self, data: Union[None, str, bytes, 'File']):
         """
         Sets the file for the model to the given data.
 
-        :param data:    The file data, or None to delete the file.
+        :param data:    The file data (or an existing file record),
+                        or None to delete the file.
         """
         raise NotImplementedError(SetFileModel.set_file.__qualname__)
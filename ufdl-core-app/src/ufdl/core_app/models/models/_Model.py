@@ -61,7 +61,7 @@ class Model(SetFileModel, AsFileModel, SoftDeleteModel):
     def as_file(self, file_format: str, **parameters: QueryParameterValue) -> bytes:
         return self.data.get_data() if self.data is not None else b''
 
-    def set_file(self, data: Union[None, str, bytes]):
+    def set_file(self, data: Union[None, str, bytes, 'File']):
         # Local import to avoid dependency cycles
         from ..files import NamedFile
 
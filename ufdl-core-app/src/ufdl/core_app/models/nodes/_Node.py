@@ -1,9 +1,10 @@
-from typing import Optional
+from typing import Dict, List, Optional
 
 from django.db import models
 
 from ...apps import UFDLCoreAppConfig
 from ...exceptions import *
+from ..files import File
 from ..mixins import DeleteOnNoRemainingReferencesOnlyModel, DeleteOnNoRemainingReferencesOnlyQuerySet
 
 
@@ -11,7 +12,22 @@ class NodeQuerySet(DeleteOnNoRemainingReferencesOnlyQuerySet):
     """
     A query-set over worker nodes.
     """
-    pass
+    def utilisation(self) -> Dict[str, int]:
+        """
+        Counts the nodes in the query-set which are busy working a job and
+        those which are idle.
+
+        :return:    The number of busy and idle nodes.
+        """
+        counts = self.aggregate(
+            total=models.Count("pk"),
+            busy=models.Count("pk", filter=models.Q(current_job__isnull=False))
+        )
+
+        return {
+            "busy": counts["busy"],
+            "idle": counts["total"] - counts["busy"]
+        }
 
 
 class Node(DeleteOnNoRemainingReferencesOnlyModel):
@@ -49,6 +65,11 @@ class Node(DeleteOnNoRemainingReferencesOnlyModel):
                                     null=True,
                                     default=None)
 
+    # The files the node holds in its local cache
+    cached_files = models.ManyToManyField(f"{UFDLCoreAppConfig.label}.File",
+                                          related_name="cached_on_nodes",
+                                          blank=True)
+
     objects = NodeQuerySet.as_manager()
 
     class Meta:
@@ -65,6 +86,19 @@ class Node(DeleteOnNoRemainingReferencesOnlyModel):
         """
         return self.current_job is not None
 
+    def set_cached_files(self, handles: List[str]) -> List[str]:
+        """
+        Replaces the set of files the node reports holding in its local cache.
+
+        :param handles:     The handles of the cached files.
+        :return:            The handles which are known to the server.
+        """
+        files = list(File.objects.filter(handle__in=handles))
+
+        self.cached_files.set(files)
+
+        return [file.handle for file in files]
+
     @classmethod
     def from_request(cls, request) -> Optional['Node']:
         """
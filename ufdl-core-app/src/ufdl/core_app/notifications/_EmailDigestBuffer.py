@@ -0,0 +1,210 @@
+from threading import Condition, Thread
+from time import monotonic
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+
+
+class EmailDigestBuffer:
+    """
+    Collects email messages which are bound for the same recipients and sends
+    them as a single digest message once the digest window has elapsed. All
+    digests which are due at the same time are sent over a single connection
+    to the mail server.
+    """
+    def __init__(
+            self,
+            window: float,
+            max_retries: int
+    ):
+        # The time (in seconds) that messages are collected for before sending
+        self._window: float = window
+
+        # The number of times to retry sending a digest that fails
+        self._max_retries: int = max_retries
+
+        # The pending digests, keyed by their digest key. Each entry holds the time
+        # the digest is due, the title of the digest, the messages in it, and the
+        # number of attempts made to send it
+        self._digests: Dict[Hashable, Tuple[float, str, List[EmailMessage], int]] = {}
+
+        # Condition to wake the sending thread when digests are added
+        self._condition: Condition = Condition()
+
+        # The sending thread (started on first use)
+        self._thread: Optional[Thread] = None
+
+    def add(self, key: Hashable, title: str, message: EmailMessage):
+        """
+        Adds a message to the digest for the given key, starting a
+        new digest if there isn't one pending.
+
+        :param key:
+                    The digest key. Messages with the same key must have the same recipients.
+        :param title:
+                    The subject to use for the digest if it contains more than one message.
+        :param message:
+                    The message to add to the digest.
+        """
+        with self._condition:
+            if key in self._digests:
+                self._digests[key][2].append(message)
+            else:
+                self._digests[key] = (monotonic() + self._window, title, [message], 0)
+
+            self._start()
+            self._condition.notify()
+
+    def flush(self):
+        """
+        Sends all pending digests now, on the calling thread, without waiting
+        for their windows to elapse. Digests which fail are retried immediately
+        until they run out of retries.
+        """
+        while True:
+            with self._condition:
+                due = [
+                    (key, *self._digests.pop(key)[1:])
+                    for key in list(self._digests)
+                ]
+
+            if len(due) == 0:
+                return
+
+            try:
+                self._send(due)
+            finally:
+                close_old_connections()
+
+    def _start(self):
+        """
+        Starts the sending thread, if it isn't already running.
+        """
+        if self._thread is None:
+            self._thread = Thread(target=self._work, name="ufdl-email-digest", daemon=True)
+            self._thread.start()
+
+    def _work(self):
+        """
+        The main loop of the sending thread.
+        """
+        while True:
+            with self._condition:
+                # Wait until at least one digest is due
+                due = self._take_due()
+                while len(due) == 0:
+                    self._condition.wait(self._time_until_next_due())
+                    due = self._take_due()
+
+            try:
+                self._send(due)
+            finally:
+                close_old_connections()
+
+    def _time_until_next_due(self) -> Optional[float]:
+        """
+        Gets the time until the next pending digest is due. Must be called
+        while holding the condition.
+
+        :return:
+                    The time in seconds, or None if there are no pending digests.
+        """
+        if len(self._digests) == 0:
+            return None
+
+        return max(0.0, min(digest[0] for digest in self._digests.values()) - monotonic())
+
+    def _take_due(self) -> List[Tuple[Hashable, str, List[EmailMessage], int]]:
+        """
+        Removes all digests which are due from the pending digests. Must
+        be called while holding the condition.
+
+        :return:
+                    The key, title, messages and attempts for each due digest.
+        """
+        current_time = monotonic()
+
+        due_keys = [
+            key
+            for key, (due_time, _, _, _) in self._digests.items()
+            if due_time <= current_time
+        ]
+
+        return [
+            (key, *self._digests.pop(key)[1:])
+            for key in due_keys
+        ]
+
+    def _send(self, due: List[Tuple[Hashable, str, List[EmailMessage], int]]):
+        """
+        Sends the given digests over a single connection.
+
+        :param due:
+                    The digests to send.
+        """
+        # Local import to avoid circular reference error
+        from ..logging import get_backend_logger
+
+        failures = []
+
+        try:
+            with get_connection() as connection:
+                for digest in due:
+                    try:
+                        message = self.combine(digest[1], digest[2])
+                        message.connection = connection
+                        message.send()
+                    except Exception as e:
+                        failures.append((digest, e))
+        except Exception as e:
+            # Couldn't connect to the mail server, so all digests failed
+            failures = [(digest, e) for digest in due]
+
+        for (key, title, messages, attempts), error in failures:
+            # Give up on the digest if it has run out of retries
+            if attempts >= self._max_retries:
+                get_backend_logger().error(
+                    f"Failed to send digest of {len(messages)} email notification(s) "
+                    f"after {attempts + 1} attempt(s): {error}"
+                )
+                continue
+
+            # Otherwise merge it back into the pending digests for the next window
+            with self._condition:
+                if key in self._digests:
+                    due_time, _, pending, _ = self._digests[key]
+                    self._digests[key] = (due_time, title, messages + pending, attempts + 1)
+                else:
+                    self._digests[key] = (monotonic() + self._window, title, messages, attempts + 1)
+
+    @staticmethod
+    def combine(title: str, messages: List[EmailMessage]) -> EmailMessage:
+        """
+        Combines a number of messages to the same recipients into a single message.
+
+        :param title:
+                    The subject of the combined message.
+        :param messages:
+                    The messages to combine.
+        :return:
+                    The combined message.
+        """
+        # A digest of one message is just that message
+        if len(messages) == 1:
+            return messages[0]
+
+        first = messages[0]
+
+        return EmailMessage(
+            subject=f"{title} ({len(messages)} notifications)",
+            body="\n\n".join(
+                f"==== {message.subject} ====\n"
+                f"\n"
+                f"{message.body}"
+                for message in messages
+            ),
+            to=first.to,
+            cc=first.cc,
+            bcc=first.bcc
+        )
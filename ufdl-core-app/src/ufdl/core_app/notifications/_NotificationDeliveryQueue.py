@@ -0,0 +1,227 @@
+from queue import Queue, Empty
+from threading import Lock, Thread, Timer
+from typing import Dict, Iterable, List, Tuple, Type
+
+from django.db import close_old_connections, transaction
+
+from ._NotificationEvent import NotificationEvent
+
+
+class NotificationDeliveryQueue:
+    """
+    Delivers notifications for job transitions on a pool of background
+    worker threads, so that slow notification targets (e.g. mail servers)
+    don't hold up the request which caused the transition.
+
+    Events are only queued once the transaction which caused them commits.
+    Workers take events from the queue in batches, and pass all events for
+    the same type of notification to that type's perform_batch method, so
+    that connections can be shared across the batch. Failed deliveries are
+    retried with exponential backoff.
+
+    Queued events are held in memory, so any undelivered notifications are
+    lost if the server process exits.
+    """
+    def __init__(
+            self,
+            num_workers: int,
+            batch_size: int,
+            max_retries: int,
+            retry_backoff: float
+    ):
+        # The number of worker threads to deliver notifications with
+        self._num_workers: int = num_workers
+
+        # The maximum number of events each worker delivers at once
+        self._batch_size: int = batch_size
+
+        # The number of times to retry delivering a failed notification
+        self._max_retries: int = max_retries
+
+        # The delay before the first retry of a failed notification
+        self._retry_backoff: float = retry_backoff
+
+        # The events waiting to be delivered
+        self._queue: Queue = Queue()
+
+        # The failed events waiting to be retried, keyed by the timer which re-queues them
+        self._retries: Dict[Timer, NotificationEvent] = {}
+        self._retries_lock: Lock = Lock()
+
+        # The worker threads (started on first use)
+        self._workers: List[Thread] = []
+        self._workers_lock: Lock = Lock()
+
+    @property
+    def is_synchronous(self) -> bool:
+        """
+        Whether notifications are delivered on the calling thread
+        instead of by background workers.
+        """
+        return self._num_workers == 0
+
+    def enqueue(self, events: Iterable[NotificationEvent]):
+        """
+        Queues events for delivery once the current transaction commits.
+
+        :param events:
+                    The notification events to deliver.
+        """
+        events = list(events)
+
+        # Nothing to do if there are no events
+        if len(events) == 0:
+            return
+
+        transaction.on_commit(lambda: self._put(events))
+
+    def flush(self):
+        """
+        Blocks until all queued events have been processed, retrying failed
+        events immediately instead of waiting for their backoff, and then
+        sends any pending email digests.
+        """
+        # Local import to avoid circular reference error
+        from ._get_email_digest_buffer import get_email_digest_buffer
+
+        if not self.is_synchronous:
+            while True:
+                # Re-queue the events waiting to be retried now
+                with self._retries_lock:
+                    retries = list(self._retries.items())
+                    self._retries.clear()
+
+                for timer, event in retries:
+                    timer.cancel()
+                    self._queue.put(event)
+
+                self._queue.join()
+
+                # Delivering may have failed again, scheduling more retries
+                with self._retries_lock:
+                    if len(self._retries) == 0:
+                        break
+
+        get_email_digest_buffer().flush()
+
+    def _put(self, events: List[NotificationEvent]):
+        """
+        Hands the events to the workers (or delivers them
+        immediately if synchronous).
+
+        :param events:
+                    The events to deliver.
+        """
+        if self.is_synchronous:
+            self._deliver(events)
+            return
+
+        self._start_workers()
+
+        for event in events:
+            self._queue.put(event)
+
+    def _start_workers(self):
+        """
+        Starts the worker threads, if they are not already running.
+        """
+        with self._workers_lock:
+            while len(self._workers) < self._num_workers:
+                worker = Thread(
+                    target=self._work,
+                    name=f"ufdl-notification-worker-{len(self._workers)}",
+                    daemon=True
+                )
+                worker.start()
+                self._workers.append(worker)
+
+    def _work(self):
+        """
+        The main loop of each worker thread.
+        """
+        while True:
+            # Wait for an event, then take any others which are ready, up to the batch size
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except Empty:
+                    break
+
+            try:
+                self._deliver(batch)
+            finally:
+                # Don't hold on to database connections between batches
+                close_old_connections()
+
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, events: List[NotificationEvent]):
+        """
+        Delivers a batch of events, scheduling retries for those that fail.
+
+        :param events:
+                    The events to deliver.
+        """
+        # Group the events by notification type, preserving the order of events
+        batches: Dict[Type['Notification'], List[NotificationEvent]] = {}
+        for event in events:
+            batches.setdefault(type(event.notification), []).append(event)
+
+        for notification_type, batch in batches.items():
+            for event in batch:
+                event.attempts += 1
+
+            try:
+                failures: List[Tuple[NotificationEvent, Exception]] = notification_type.perform_batch(batch)
+            except Exception as e:
+                failures = [(event, e) for event in batch]
+
+            for event, error in failures:
+                self._retry(event, error)
+
+    def _retry(self, event: NotificationEvent, error: Exception):
+        """
+        Schedules a failed event to be re-queued after a backoff period,
+        or gives up on it if it has run out of retries.
+
+        :param event:
+                    The event that failed.
+        :param error:
+                    The error that caused the failure.
+        """
+        # Local import to avoid circular reference error
+        from ..logging import get_backend_logger
+
+        # Synchronous delivery can't wait to retry without blocking the request
+        if self.is_synchronous or event.attempts > self._max_retries:
+            get_backend_logger().error(
+                f"Failed to deliver notification {event} after {event.attempts} attempt(s): {error}"
+            )
+            return
+
+        timer = Timer(
+            self._retry_backoff * 2 ** (event.attempts - 1),
+            lambda: self._requeue(timer)
+        )
+        timer.daemon = True
+
+        with self._retries_lock:
+            self._retries[timer] = event
+
+        timer.start()
+
+    def _requeue(self, timer: Timer):
+        """
+        Re-queues a failed event once its backoff period has elapsed.
+
+        :param timer:
+                    The timer which was waiting to retry the event.
+        """
+        with self._retries_lock:
+            event = self._retries.pop(timer, None)
+
+        # The event may have already been re-queued by a flush
+        if event is not None:
+            self._queue.put(event)
@@ -0,0 +1,37 @@
+from wai.json.raw import RawJSONObject
+
+
+class NotificationEvent:
+    """
+    A single notification which is waiting to be delivered for
+    a job's phase transition.
+    """
+    def __init__(
+            self,
+            notification: 'Notification',
+            job: 'Job',
+            data: RawJSONObject
+    ):
+        # The (up-cast) notification to perform
+        self.notification = notification
+
+        # The job which made the transition
+        self.job = job
+
+        # The formatting data for the notification
+        self.data = data
+
+        # The number of delivery attempts made so far
+        self.attempts: int = 0
+
+    def perform(self):
+        """
+        Performs the notification for this event.
+        """
+        self.notification.perform(self.job, **self.data)
+
+    def __str__(self) -> str:
+        return (
+            f"{type(self.notification).__name__} #{self.notification.pk} "
+            f"for job #{self.job.pk} ({self.data.get('transition')})"
+        )
@@ -0,0 +1,241 @@
+from threading import Lock, Timer
+from time import monotonic
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from asgiref.sync import async_to_sync
+
+from channels.layers import get_channel_layer
+
+from django.core.cache import cache
+
+from wai.json.raw import RawJSONObject
+
+
+class WebSocketBroadcaster:
+    """
+    Sends job transitions to groups of web-socket subscribers.
+
+    Each message sent to a group is given a sequence number (per group), and
+    the most recent messages for each group are kept in the cache so that
+    subscribers can resume from the last sequence number they saw. Progress
+    messages are coalesced, so that each job only broadcasts its latest
+    progress at most once per progress interval.
+
+    Sequence numbers and replay logs are kept in the default Django cache,
+    which is shared between server processes (Redis), so subscribers can
+    resume against any process. Each recorded message is stored under its
+    own key (by group and sequence number), so concurrent broadcasts never
+    overwrite each other's entries in the replay log.
+    """
+    def __init__(
+            self,
+            progress_interval: float,
+            replay_length: int
+    ):
+        # The minimum time (in seconds) between progress broadcasts for a job
+        self._progress_interval: float = progress_interval
+
+        # The number of messages to keep for each group for resuming subscribers
+        self._replay_length: int = replay_length
+
+        # The time each job last broadcast its progress, keyed by coalescing key
+        self._last_progress: Dict[Hashable, float] = {}
+
+        # Progress messages waiting for the progress interval to elapse
+        self._pending_progress: Dict[Hashable, Tuple[List[str], RawJSONObject]] = {}
+
+        self._lock: Lock = Lock()
+
+    def broadcast(
+            self,
+            groups: List[str],
+            content: RawJSONObject,
+            coalesce_key: Optional[Hashable] = None
+    ):
+        """
+        Broadcasts a message to a number of groups.
+
+        :param groups:
+                    The names of the groups to send the message to.
+        :param content:
+                    The message content.
+        :param coalesce_key:
+                    If given, the message is a progress message which can be replaced
+                    by later messages with the same key within the progress interval.
+                    Otherwise, any pending progress messages for the key are sent first.
+        """
+        if coalesce_key is not None:
+            with self._lock:
+                # If the job broadcast progress recently, hold the message until the interval elapses
+                delay = self._last_progress.get(coalesce_key, float("-inf")) + self._progress_interval - monotonic()
+                if delay > 0:
+                    if coalesce_key not in self._pending_progress:
+                        timer = Timer(delay, self._flush_progress, (coalesce_key,))
+                        timer.daemon = True
+                        timer.start()
+                    self._pending_progress[coalesce_key] = (groups, content)
+                    return
+
+                self._last_progress[coalesce_key] = monotonic()
+
+                self._prune_last_progress()
+
+        self._send(groups, content)
+
+    def flush_progress(self, coalesce_key: Hashable):
+        """
+        Immediately sends any pending progress message for the given key, e.g.
+        before sending a later transition for the same job.
+
+        :param coalesce_key:
+                    The key of the pending progress message.
+        """
+        with self._lock:
+            pending = self._pending_progress.pop(coalesce_key, None)
+            self._last_progress.pop(coalesce_key, None)
+
+        if pending is not None:
+            self._send(*pending)
+
+    def _flush_progress(self, coalesce_key: Hashable):
+        """
+        Sends the pending progress message for the given key once
+        the progress interval has elapsed.
+
+        :param coalesce_key:
+                    The key of the pending progress message.
+        """
+        with self._lock:
+            pending = self._pending_progress.pop(coalesce_key, None)
+            if pending is not None:
+                self._last_progress[coalesce_key] = monotonic()
+
+        if pending is not None:
+            self._send(*pending)
+
+    def _prune_last_progress(self):
+        """
+        Forgets the last progress times which are older than the progress
+        interval, as they no longer delay any messages. Should be called
+        with the lock held.
+        """
+        expired = monotonic() - self._progress_interval
+        for coalesce_key in [
+            coalesce_key
+            for coalesce_key, last_progress in self._last_progress.items()
+            if last_progress <= expired and coalesce_key not in self._pending_progress
+        ]:
+            del self._last_progress[coalesce_key]
+
+    def _send(self, groups: List[str], content: RawJSONObject):
+        """
+        Sends a message to a number of groups, recording it in the
+        replay log of each group.
+
+        :param groups:
+                    The names of the groups to send the message to.
+        :param content:
+                    The message content.
+        """
+        channel_layer = get_channel_layer()
+
+        for group in groups:
+            sequence = self._next_sequence(group)
+            sequenced_content = dict(content, group=group, sequence=sequence)
+
+            self._record(group, sequence, sequenced_content)
+
+            async_to_sync(channel_layer.group_send)(
+                group,
+                {
+                    'type': 'transition.enact',
+                    'content': sequenced_content
+                }
+            )
+
+    def replay(self, group: str, since: int) -> List[RawJSONObject]:
+        """
+        Gets the recorded messages sent to a group after a given sequence number.
+
+        :param group:
+                    The name of the group.
+        :param since:
+                    The last sequence number the subscriber saw.
+        :return:
+                    The messages sent since, oldest first. If messages have dropped out of
+                    the replay log, only those still in the log are returned.
+        """
+        # Nothing is recorded if replay is disabled
+        if self._replay_length == 0:
+            return []
+
+        # Only the most recent messages are kept
+        latest = cache.get(self._sequence_key(group), 0)
+        first = max(since + 1, latest - self._replay_length + 1)
+        keys = [self._replay_key(group, sequence) for sequence in range(first, latest + 1)]
+
+        recorded = cache.get_many(keys)
+
+        return [
+            recorded[key]
+            for key in keys
+            if key in recorded
+        ]
+
+    def _next_sequence(self, group: str) -> int:
+        """
+        Gets the next sequence number for a group.
+
+        :param group:
+                    The name of the group.
+        :return:
+                    The sequence number.
+        """
+        key = self._sequence_key(group)
+        cache.add(key, 0, timeout=None)
+        return cache.incr(key)
+
+    def _record(self, group: str, sequence: int, content: RawJSONObject):
+        """
+        Adds a message to the replay log of a group, dropping the
+        message which has fallen out of the log.
+
+        :param group:
+                    The name of the group.
+        :param sequence:
+                    The sequence number of the message.
+        :param content:
+                    The sequenced message content.
+        """
+        # Nothing to do if replay is disabled
+        if self._replay_length == 0:
+            return
+
+        cache.set(self._replay_key(group, sequence), content, timeout=None)
+        cache.delete(self._replay_key(group, sequence - self._replay_length))
+
+    @staticmethod
+    def _sequence_key(group: str) -> str:
+        """
+        Gets the cache key of the latest sequence number of a group.
+
+        :param group:
+                    The name of the group.
+        :return:
+                    The cache key.
+        """
+        return f"ufdl-websocket-sequence-{group}"
+
+    @staticmethod
+    def _replay_key(group: str, sequence: int) -> str:
+        """
+        Gets the cache key of a message in the replay log of a group.
+
+        :param group:
+                    The name of the group.
+        :param sequence:
+                    The sequence number of the message.
+        :return:
+                    The cache key.
+        """
+        return f"ufdl-websocket-replay-{group}-{sequence}"
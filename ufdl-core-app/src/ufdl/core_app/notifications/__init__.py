@@ -0,0 +1,10 @@
+"""
+Package for the background delivery of job notifications.
+"""
+from ._EmailDigestBuffer import EmailDigestBuffer
+from ._get_email_digest_buffer import get_email_digest_buffer
+from ._get_notification_queue import get_notification_queue
+from ._get_websocket_broadcaster import get_websocket_broadcaster
+from ._NotificationDeliveryQueue import NotificationDeliveryQueue
+from ._NotificationEvent import NotificationEvent
+from ._WebSocketBroadcaster import WebSocketBroadcaster
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from ..settings import core_settings
+from ._EmailDigestBuffer import EmailDigestBuffer
+
+# The server-wide email digest buffer
+__buffer: Optional[EmailDigestBuffer] = None
+
+
+def get_email_digest_buffer() -> EmailDigestBuffer:
+    """
+    Gets the server-wide buffer for collecting email notifications
+    into digests, creating it on first access.
+
+    :return:    The digest buffer.
+    """
+    global __buffer
+
+    if __buffer is None:
+        __buffer = EmailDigestBuffer(
+            core_settings.EMAIL_NOTIFICATION_DIGEST_WINDOW,
+            core_settings.NOTIFICATION_DELIVERY_MAX_RETRIES
+        )
+
+    return __buffer
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from ..settings import core_settings
+from ._NotificationDeliveryQueue import NotificationDeliveryQueue
+
+# The server-wide notification delivery queue
+__queue: Optional[NotificationDeliveryQueue] = None
+
+
+def get_notification_queue() -> NotificationDeliveryQueue:
+    """
+    Gets the server-wide queue for delivering notifications,
+    creating it on first access.
+
+    :return:    The notification queue.
+    """
+    global __queue
+
+    if __queue is None:
+        __queue = NotificationDeliveryQueue(
+            core_settings.NOTIFICATION_DELIVERY_WORKERS,
+            core_settings.NOTIFICATION_DELIVERY_BATCH_SIZE,
+            core_settings.NOTIFICATION_DELIVERY_MAX_RETRIES,
+            core_settings.NOTIFICATION_DELIVERY_RETRY_BACKOFF
+        )
+
+    return __queue
@@ -0,0 +1,25 @@
+from typing import Optional
+
+from ..settings import core_settings
+from ._WebSocketBroadcaster import WebSocketBroadcaster
+
+# The server-wide web-socket broadcaster
+__broadcaster: Optional[WebSocketBroadcaster] = None
+
+
+def get_websocket_broadcaster() -> WebSocketBroadcaster:
+    """
+    Gets the server-wide broadcaster for web-socket notifications,
+    creating it on first access.
+
+    :return:    The broadcaster.
+    """
+    global __broadcaster
+
+    if __broadcaster is None:
+        __broadcaster = WebSocketBroadcaster(
+            core_settings.WEBSOCKET_PROGRESS_INTERVAL,
+            core_settings.WEBSOCKET_REPLAY_LENGTH
+        )
+
+    return __broadcaster
@@ -0,0 +1,12 @@
+from rest_framework.permissions import BasePermission
+
+
+class IsCreator(BasePermission):
+    """
+    Permission for users accessing objects they created.
+    """
+    def has_permission(self, request, view):
+        return request.user.is_authenticated
+
+    def has_object_permission(self, request, view, obj):
+        return obj.creator == request.user
@@ -1,6 +1,7 @@
 from ._AllowNone import AllowNone
 from ._IsAdminUser import IsAdminUser
 from ._IsAuthenticated import IsAuthenticated
+from ._IsCreator import IsCreator
 from ._IsMember import IsMember
 from ._IsNode import IsNode
 from ._IsOwnMembership import IsOwnMembership
@@ -0,0 +1,123 @@
+from bisect import bisect_left
+from collections import deque
+from threading import Lock
+from typing import Deque, Dict, List, Tuple
+
+from django.utils.timezone import now
+
+from ._Profiler import Profiler
+
+
+class ProfileStatistics:
+    """
+    Aggregates the profiles of the requests handled by this server process into
+    histograms per view-set action, and keeps a sample of the slowest requests.
+    """
+    # The histogrammed timings of each request
+    TIMINGS: Tuple[str, ...] = ("wall", "db", "io")
+
+    # The upper bounds (in seconds) of the histogram buckets. Timings
+    # greater than the last bound are counted in an additional bucket
+    TIMING_BUCKETS: Tuple[float, ...] = (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+    )
+
+    def __init__(self, slow_request_threshold: float, slow_request_sample_size: int):
+        self._slow_request_threshold: float = slow_request_threshold
+        self._lock: Lock = Lock()
+        self._actions: Dict[str, dict] = {}
+        self._slow_requests: Deque[dict] = deque(maxlen=slow_request_sample_size)
+
+    def record(self, action: str, method: str, path: str, status: int, profiler: Profiler) -> bool:
+        """
+        Adds the profile of a request to the statistics.
+
+        :param action:      The name of the view-set action that handled the request.
+        :param method:      The HTTP method of the request.
+        :param path:        The path of the request.
+        :param status:      The status code of the response.
+        :param profiler:    The profiler which recorded the request.
+        :return:            Whether the request was slow.
+        """
+        timings = {
+            "wall": profiler.wall_time,
+            "db": profiler.db_time,
+            "io": profiler.io_time
+        }
+
+        is_slow = 0 < self._slow_request_threshold <= profiler.wall_time
+
+        with self._lock:
+            statistics = self._actions.get(action, None)
+            if statistics is None:
+                statistics = self._actions[action] = {
+                    "requests": 0,
+                    "db_queries": 0,
+                    "io_bytes": 0,
+                    "timings": {
+                        timing: {
+                            "buckets": [0] * (len(self.TIMING_BUCKETS) + 1),
+                            "sum": 0.0
+                        }
+                        for timing in self.TIMINGS
+                    }
+                }
+
+            statistics["requests"] += 1
+            statistics["db_queries"] += profiler.db_queries
+            statistics["io_bytes"] += profiler.io_bytes
+            for timing, seconds in timings.items():
+                histogram = statistics["timings"][timing]
+                histogram["buckets"][bisect_left(self.TIMING_BUCKETS, seconds)] += 1
+                histogram["sum"] += seconds
+
+            if is_slow:
+                self._slow_requests.append({
+                    "time": now().isoformat(),
+                    "action": action,
+                    "method": method,
+                    "path": path,
+                    "status": status,
+                    "wall_time": profiler.wall_time,
+                    "db_queries": profiler.db_queries,
+                    "db_time": profiler.db_time,
+                    "io_bytes": profiler.io_bytes,
+                    "io_time": profiler.io_time
+                })
+
+        return is_slow
+
+    def summarise(self) -> Dict[str, object]:
+        """
+        Gets a summary of the statistics, with cumulative histograms
+        of the timings of each action.
+
+        :return:    The summary.
+        """
+        with self._lock:
+            actions: List[dict] = []
+            for action, statistics in sorted(self._actions.items()):
+                summary = {
+                    "action": action,
+                    "requests": statistics["requests"],
+                    "db_queries": statistics["db_queries"],
+                    "io_bytes": statistics["io_bytes"],
+                    "timings": {}
+                }
+                for timing, histogram in statistics["timings"].items():
+                    cumulative = 0
+                    buckets = []
+                    for bound, count in zip(self.TIMING_BUCKETS + (None,), histogram["buckets"]):
+                        cumulative += count
+                        buckets.append([bound, cumulative])
+                    summary["timings"][timing] = {
+                        "buckets": buckets,
+                        "count": cumulative,
+                        "sum": histogram["sum"]
+                    }
+                actions.append(summary)
+
+            return {
+                "actions": actions,
+                "slow_requests": list(self._slow_requests)
+            }
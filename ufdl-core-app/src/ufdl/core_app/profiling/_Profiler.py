@@ -0,0 +1,108 @@
+from contextlib import ExitStack
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Optional
+
+from django.db import connections
+
+# The profiler recording the request currently being handled (if any)
+_current_profiler: ContextVar[Optional['Profiler']] = ContextVar("current_profiler", default=None)
+
+
+class Profiler:
+    """
+    Records where the time goes while handling a single request: the total (wall)
+    time, the number of database queries and the time spent in them, and the amount
+    of data transferred to/from the file-system backend and the time spent doing so.
+
+    Used as a context manager around the handling of the request. While active,
+    database queries are recorded automatically, and backend I/O is recorded by
+    calls to Profiler.add_backend_io.
+    """
+    def __init__(self):
+        self._start_ns: int = 0
+        self._exit_stack: Optional[ExitStack] = None
+        self._token = None
+
+        self.wall_ns: int = 0
+        self.db_queries: int = 0
+        self.db_ns: int = 0
+        self.io_bytes: int = 0
+        self.io_ns: int = 0
+
+    @staticmethod
+    def current() -> Optional['Profiler']:
+        """
+        Gets the profiler recording the current request, if there is one.
+        """
+        return _current_profiler.get()
+
+    @staticmethod
+    def add_backend_io(num_bytes: int, since_ns: int):
+        """
+        Records a transfer of data to/from the file-system backend
+        against the current request, if it is being profiled.
+
+        :param num_bytes:   The number of bytes transferred.
+        :param since_ns:    The value of perf_counter_ns when the transfer began.
+        """
+        profiler = _current_profiler.get()
+
+        if profiler is not None:
+            profiler.io_bytes += num_bytes
+            profiler.io_ns += perf_counter_ns() - since_ns
+
+    def _execute_wrapper(self, execute, sql, params, many, context):
+        """
+        Database execute-wrapper which records the time spent in each query.
+        """
+        start_ns = perf_counter_ns()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_queries += 1
+            self.db_ns += perf_counter_ns() - start_ns
+
+    @property
+    def wall_time(self) -> float:
+        """
+        The total time spent handling the request, in seconds.
+        """
+        return self.wall_ns / 1e9
+
+    @property
+    def db_time(self) -> float:
+        """
+        The time spent in database queries, in seconds.
+        """
+        return self.db_ns / 1e9
+
+    @property
+    def io_time(self) -> float:
+        """
+        The time spent transferring data to/from the file-system backend, in seconds.
+        """
+        return self.io_ns / 1e9
+
+    def server_timing_header(self) -> str:
+        """
+        Formats the recorded timings as the value of a Server-Timing header.
+        """
+        return (
+            f'total;dur={self.wall_ns / 1e6:.3f}, '
+            f'db;dur={self.db_ns / 1e6:.3f};desc="{self.db_queries} queries", '
+            f'io;dur={self.io_ns / 1e6:.3f};desc="{self.io_bytes} bytes"'
+        )
+
+    def __enter__(self) -> 'Profiler':
+        self._exit_stack = ExitStack()
+        for connection in connections.all():
+            self._exit_stack.enter_context(connection.execute_wrapper(self._execute_wrapper))
+        self._token = _current_profiler.set(self)
+        self._start_ns = perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.wall_ns = perf_counter_ns() - self._start_ns
+        _current_profiler.reset(self._token)
+        self._exit_stack.close()
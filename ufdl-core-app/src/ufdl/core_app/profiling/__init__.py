@@ -0,0 +1,6 @@
+"""
+Package for profiling the handling of requests by the UFDL backend.
+"""
+from ._get_profile_statistics import get_profile_statistics
+from ._Profiler import Profiler
+from ._ProfileStatistics import ProfileStatistics
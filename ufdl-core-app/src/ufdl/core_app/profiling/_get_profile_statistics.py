@@ -0,0 +1,25 @@
+from typing import Optional
+
+from ..settings import core_settings
+from ._ProfileStatistics import ProfileStatistics
+
+# The statistics of the requests handled by this server process
+__statistics: Optional[ProfileStatistics] = None
+
+
+def get_profile_statistics() -> ProfileStatistics:
+    """
+    Gets the statistics of the requests handled by this server
+    process, creating them on first access.
+
+    :return:    The profile statistics.
+    """
+    global __statistics
+
+    if __statistics is None:
+        __statistics = ProfileStatistics(
+            core_settings.SLOW_REQUEST_THRESHOLD,
+            core_settings.SLOW_REQUEST_SAMPLE_SIZE
+        )
+
+    return __statistics
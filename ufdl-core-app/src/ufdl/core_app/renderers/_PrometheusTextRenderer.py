@@ -0,0 +1,151 @@
+from typing import Dict, Iterator
+
+from rest_framework import renderers
+
+
+class PrometheusTextRenderer(renderers.BaseRenderer):
+    """
+    Renderer which formats the job metrics and request metrics
+    summaries in the Prometheus text exposition format.
+    """
+    media_type = "text/plain"
+    format = "prometheus"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        # Data must be a metrics summary
+        if isinstance(data, dict) and "templates" in data:
+            lines = self.format_job_metric_lines(data)
+        elif isinstance(data, dict) and "actions" in data:
+            lines = self.format_request_metric_lines(data)
+        else:
+            # Assume it's an error, and return the JSON rendering
+            return renderers.JSONRenderer().render(data, accepted_media_type, renderer_context)
+
+        return "".join(f"{line}\n" for line in lines).encode(self.charset)
+
+    @classmethod
+    def format_job_metric_lines(cls, data: dict) -> Iterator[str]:
+        """
+        Formats the lines of the exposition of a job metrics summary.
+
+        :param data:    The metrics summary.
+        :return:        An iterator over the lines.
+        """
+        yield "# HELP ufdl_jobs The number of jobs in each lifecycle phase."
+        yield "# TYPE ufdl_jobs gauge"
+        for template in data["templates"]:
+            for phase, count in template["phases"].items():
+                yield f"ufdl_jobs{cls.format_labels(cls.template_labels(template), phase=phase)} {count}"
+
+        # Collect the names of all histogrammed durations
+        durations = []
+        for template in data["templates"]:
+            for duration in template["durations"]:
+                if duration not in durations:
+                    durations.append(duration)
+
+        for duration in durations:
+            name = f"ufdl_job_{duration}_seconds"
+            yield f"# HELP {name} The {duration} durations of jobs."
+            yield f"# TYPE {name} histogram"
+            for template in data["templates"]:
+                histogram = template["durations"].get(duration, None)
+                if histogram is None:
+                    continue
+                yield from cls.format_histogram_lines(name, cls.template_labels(template), histogram)
+
+        yield "# HELP ufdl_nodes The number of worker nodes which are busy or idle."
+        yield "# TYPE ufdl_nodes gauge"
+        for state, count in data["nodes"].items():
+            if state != "busy_ratio":
+                yield f"ufdl_nodes{cls.format_labels({}, state=state)} {count}"
+
+        yield "# HELP ufdl_nodes_busy_ratio The proportion of worker nodes which are busy."
+        yield "# TYPE ufdl_nodes_busy_ratio gauge"
+        yield f"ufdl_nodes_busy_ratio {data['nodes']['busy_ratio']}"
+
+    @classmethod
+    def format_request_metric_lines(cls, data: dict) -> Iterator[str]:
+        """
+        Formats the lines of the exposition of a request metrics summary.
+
+        :param data:    The metrics summary.
+        :return:        An iterator over the lines.
+        """
+        yield "# HELP ufdl_requests_total The number of requests handled by each action."
+        yield "# TYPE ufdl_requests_total counter"
+        for action in data["actions"]:
+            yield f"ufdl_requests_total{cls.format_labels({'action': action['action']})} {action['requests']}"
+
+        yield "# HELP ufdl_request_db_queries_total The number of database queries made by each action."
+        yield "# TYPE ufdl_request_db_queries_total counter"
+        for action in data["actions"]:
+            yield f"ufdl_request_db_queries_total{cls.format_labels({'action': action['action']})} {action['db_queries']}"
+
+        yield "# HELP ufdl_request_io_bytes_total The file-system I/O performed by each action."
+        yield "# TYPE ufdl_request_io_bytes_total counter"
+        for action in data["actions"]:
+            yield f"ufdl_request_io_bytes_total{cls.format_labels({'action': action['action']})} {action['io_bytes']}"
+
+        # Collect the names of all histogrammed timings
+        timings = []
+        for action in data["actions"]:
+            for timing in action["timings"]:
+                if timing not in timings:
+                    timings.append(timing)
+
+        for timing in timings:
+            name = f"ufdl_request_{timing}_seconds"
+            yield f"# HELP {name} The {timing} time of requests."
+            yield f"# TYPE {name} histogram"
+            for action in data["actions"]:
+                yield from cls.format_histogram_lines(name, {"action": action["action"]}, action["timings"][timing])
+
+    @classmethod
+    def format_histogram_lines(cls, name: str, labels: Dict[str, str], histogram: dict) -> Iterator[str]:
+        """
+        Formats the lines of the exposition of a cumulative histogram.
+
+        :param name:        The name of the histogram.
+        :param labels:      The labels identifying the histogram.
+        :param histogram:   The histogram.
+        :return:            An iterator over the lines.
+        """
+        for bound, count in histogram["buckets"]:
+            le = "+Inf" if bound is None else str(float(bound))
+            yield f"{name}_bucket{cls.format_labels(labels, le=le)} {count}"
+        yield f"{name}_sum{cls.format_labels(labels)} {histogram['sum']}"
+        yield f"{name}_count{cls.format_labels(labels)} {histogram['count']}"
+
+    @staticmethod
+    def template_labels(template: dict) -> Dict[str, str]:
+        """
+        Gets the labels identifying a template's metrics.
+
+        :param template:    The template's summary.
+        :return:            The labels.
+        """
+        return {
+            "template": template["name"],
+            "version": str(template["version"])
+        }
+
+    @staticmethod
+    def format_labels(labels: Dict[str, str], **extra: str) -> str:
+        """
+        Formats a set of labels, escaping their values.
+
+        :param labels:  The labels.
+        :param extra:   Additional labels.
+        :return:        The formatted labels.
+        """
+        labels = {**labels, **extra}
+
+        if len(labels) == 0:
+            return ""
+
+        return "{" + ",".join(
+            f'{name}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+            for name, value in labels.items()
+        ) + "}"
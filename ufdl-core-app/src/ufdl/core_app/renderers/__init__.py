@@ -2,3 +2,4 @@
 Package for UFDL custom response renderers.
 """
 from ._BinaryFileRenderer import BinaryFileRenderer
+from ._PrometheusTextRenderer import PrometheusTextRenderer
@@ -21,6 +21,7 @@ class UFDLRouter(routers.DefaultRouter):
             ClearDatasetViewSet.get_routes() +
             CopyableViewSet.get_routes() +
             CreateJobViewSet.get_routes() +
+            DeterministicTemplateViewSet.get_routes() +
             DownloadableViewSet.get_routes() +
             FileContainerViewSet.get_routes() +
             GetAllMatchingTemplatesViewSet.get_routes() +
@@ -28,10 +29,15 @@ class UFDLRouter(routers.DefaultRouter):
             GetByNameViewSet.get_routes() +
             GetHardwareGenerationViewSet.get_routes() +
             ImportTemplateViewSet.get_routes() +
+            JobMetricsViewSet.get_routes() +
             LicenceSubdescriptorViewSet.get_routes() +
             MembershipViewSet.get_routes() +
             MergeViewSet.get_routes() +
+            NodeCacheViewSet.get_routes() +
             PingNodeViewSet.get_routes() +
+            RequestMetricsViewSet.get_routes() +
             SetFileViewSet.get_routes() +
-            SoftDeleteViewSet.get_routes()
+            SoftDeleteViewSet.get_routes() +
+            TeamQuotaViewSet.get_routes() +
+            UploadPartViewSet.get_routes()
     )
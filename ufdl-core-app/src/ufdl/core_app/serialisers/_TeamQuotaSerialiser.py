@@ -0,0 +1,17 @@
+from rest_framework import serializers
+
+from ..models import TeamQuota
+
+
+class TeamQuotaSerialiser(serializers.ModelSerializer):
+    class Meta:
+        model = TeamQuota
+        fields = ["max_queued_jobs",
+                  "max_started_jobs",
+                  "max_dataset_bytes",
+                  "max_output_bytes",
+                  "queued_jobs",
+                  "started_jobs",
+                  "dataset_bytes",
+                  "output_bytes"]
+        read_only_fields = ["queued_jobs", "started_jobs", "dataset_bytes", "output_bytes"]
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+
+from ..models.files import UploadSession
+
+
+class UploadSessionSerialiser(serializers.ModelSerializer):
+    def create(self, validated_data):
+        validated_data["creator"] = self.context["request"].user
+        return super().create(validated_data)
+
+    class Meta:
+        model = UploadSession
+        fields = ["pk",
+                  "creator",
+                  "creation_time",
+                  "size",
+                  "received",
+                  "expiry_time"]
+        read_only_fields = ["creator", "creation_time", "received", "expiry_time"]
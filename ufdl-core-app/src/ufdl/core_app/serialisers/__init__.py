@@ -7,6 +7,8 @@ from ._LicenceSerialiser import LicenceSerialiser
 from ._LogEntrySerialiser import LogEntrySerialiser
 from ._MembershipSerialiser import MembershipSerialiser
 from ._NamedFileSerialiser import NamedFileSerialiser
+from ._TeamQuotaSerialiser import TeamQuotaSerialiser
 from ._TeamSerialiser import TeamSerialiser
 from ._ProjectSerialiser import ProjectSerialiser
+from ._UploadSessionSerialiser import UploadSessionSerialiser
 from ._UserSerialiser import UserSerialiser
@@ -58,6 +58,8 @@ class JobSerialiser(SoftDeleteModelSerialiser):
                   "input_values",
                   "parameter_values",
                   "node",
+                  "batch",
+                  "batched_jobs",
                   "outputs",
                   "description",
                   "is_cancelled"] + SoftDeleteModelSerialiser.base_fields
@@ -69,5 +71,7 @@ class JobSerialiser(SoftDeleteModelSerialiser):
                             "input_values",
                             "parameter_values",
                             "node",
+                            "batch",
+                            "batched_jobs",
                             "outputs",
                             "is_cancelled"]
@@ -34,6 +34,7 @@ class JobTemplateSerialiser(SoftDeleteModelSerialiser):
             representation["type"] = instance.type
             representation["executor_class"] = instance.executor_class
             representation["required_packages"] = instance.required_packages
+            representation["deterministic"] = instance.deterministic
 
             parameters = {}
             for parameter in instance.parameters.all():
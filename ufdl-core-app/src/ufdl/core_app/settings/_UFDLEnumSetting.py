@@ -0,0 +1,30 @@
+from enum import Enum
+from typing import Any, Type, Union
+
+from django.utils.module_loading import import_string
+
+from ._UFDLSetting import UFDLSetting
+
+
+class UFDLEnumSetting(UFDLSetting):
+    """
+    Setting type which expects the value of a member of an enumeration,
+    and prepares it as that member.
+    """
+    def __init__(self, default: Any, enum: Union[str, Type[Enum]]):
+        super().__init__(default)
+        self._enum = enum
+
+    def _prepare(self, value: Any) -> Any:
+        # The enumeration can be given by name, to avoid circular imports
+        enum = (
+            import_string(self._enum)
+            if isinstance(self._enum, str)
+            else self._enum
+        )
+
+        # Must be the value of one of the members
+        try:
+            return enum(value)
+        except ValueError:
+            self._error(value, f"Not one of {', '.join(repr(member.value) for member in enum)}")
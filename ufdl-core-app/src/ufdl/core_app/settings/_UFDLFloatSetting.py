@@ -0,0 +1,19 @@
+from typing import Any
+
+from ._UFDLSetting import UFDLSetting
+
+
+class UFDLFloatSetting(UFDLSetting):
+    """
+    Setting which takes a non-negative numeric value.
+    """
+    def _prepare(self, value: Any) -> Any:
+        # Must be a number (but not a boolean)
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            self._error(value, "Not a number")
+
+        # Must be non-negative
+        if value < 0:
+            self._error(value, "Must be non-negative")
+
+        return float(value)
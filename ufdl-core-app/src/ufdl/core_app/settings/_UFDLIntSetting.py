@@ -0,0 +1,23 @@
+from typing import Any
+
+from ._UFDLSetting import UFDLSetting
+
+
+class UFDLIntSetting(UFDLSetting):
+    """
+    Setting which takes an integer value.
+    """
+    def __init__(self, default: int, minimum: int = 0):
+        super().__init__(default)
+        self._minimum = minimum
+
+    def _prepare(self, value: Any) -> Any:
+        # Must be an integer (but not a boolean)
+        if not isinstance(value, int) or isinstance(value, bool):
+            self._error(value, "Not an integer")
+
+        # Must be at least the minimum value
+        if value < self._minimum:
+            self._error(value, f"Must be at least {self._minimum}")
+
+        return value
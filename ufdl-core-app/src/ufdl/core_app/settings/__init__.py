@@ -4,6 +4,9 @@ Package for UFDL-specific settings.
 from ._core_settings import core_settings
 from ._UFDLBoolSetting import UFDLBoolSetting
 from ._UFDLClassSetting import UFDLClassSetting
+from ._UFDLEnumSetting import UFDLEnumSetting
+from ._UFDLFloatSetting import UFDLFloatSetting
+from ._UFDLIntSetting import UFDLIntSetting
 from ._UFDLNotificationActionsSetting import UFDLNotificationActionsSetting
 from ._UFDLSetting import UFDLSetting
 from ._UFDLSettings import UFDLSettings
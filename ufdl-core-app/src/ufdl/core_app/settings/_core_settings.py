@@ -4,7 +4,11 @@ Defines the core settings for UFDL.
 from ufdl.json.core.jobs.notification import *
 
 from ..backend.filesystem import FileSystemBackend
+from ._UFDLBoolSetting import UFDLBoolSetting
 from ._UFDLClassSetting import UFDLClassSetting
+from ._UFDLEnumSetting import UFDLEnumSetting
+from ._UFDLFloatSetting import UFDLFloatSetting
+from ._UFDLIntSetting import UFDLIntSetting
 from ._UFDLNotificationActionsSetting import UFDLNotificationActionsSetting
 from ._UFDLSettings import UFDLSettings
 from ._UFDLStringSetting import UFDLStringSetting
@@ -30,9 +34,81 @@ class UFDLCoreSettings(UFDLSettings):
     # The directory to store files under when using a local-disk file-system backend
     LOCAL_DISK_FILE_DIRECTORY = UFDLStringSetting(default="./fs")
 
+    # The directory to spool files under while they are being uploaded in parts
+    UPLOAD_SPOOL_DIRECTORY = UFDLStringSetting(default="./uploads")
+
+    # The number of seconds an upload can go without receiving a part before it is discarded
+    UPLOAD_SESSION_LIFETIME = UFDLFloatSetting(default=86400.0)
+
+    # ============ #
+    # Job Settings #
+    # ============ #
+    # The maximum number of jobs that can be created in a single bulk-create request
+    BULK_CREATE_JOBS_LIMIT = UFDLIntSetting(default=1000, minimum=1)
+
+    # The number of best-placed waiting jobs a node tries to acquire when asking for
+    # its next job, before giving up because other nodes are acquiring them
+    ACQUIRE_NEXT_JOB_CANDIDATES = UFDLIntSetting(default=10, minimum=1)
+
+    # The maximum number of waiting inference jobs (with the same template, model and
+    # parameters) given to a node together when it acquires one of them. 1 disables batching
+    INFERENCE_BATCH_SIZE = UFDLIntSetting(default=1, minimum=1)
+
+    # ============== #
+    # Quota Settings #
+    # ============== #
+    # The default limits given to teams on their resource usage (0 for no limit)
+    DEFAULT_TEAM_QUEUED_JOBS_QUOTA = UFDLIntSetting(default=0, minimum=0)
+    DEFAULT_TEAM_STARTED_JOBS_QUOTA = UFDLIntSetting(default=0, minimum=0)
+    DEFAULT_TEAM_DATASET_BYTES_QUOTA = UFDLIntSetting(default=0, minimum=0)
+    DEFAULT_TEAM_OUTPUT_BYTES_QUOTA = UFDLIntSetting(default=0, minimum=0)
+
+    # ================== #
+    # Profiling Settings #
+    # ================== #
+    # Whether to profile the time taken, database queries and file-system I/O of each request
+    PROFILE_REQUESTS = UFDLBoolSetting(default=True)
+
+    # Whether to report each request's profile to the client in a Server-Timing header
+    SERVER_TIMING_HEADERS = UFDLBoolSetting(default=False)
+
+    # The time (in seconds) a request must take to be logged as slow. 0 disables the slow-request log
+    SLOW_REQUEST_THRESHOLD = UFDLFloatSetting(default=1.0)
+
+    # The number of recent slow requests kept by each server process for reporting
+    SLOW_REQUEST_SAMPLE_SIZE = UFDLIntSetting(default=100)
+
     # ===================== #
     # Notification Settings #
     # ===================== #
+    # The number of background threads delivering notifications. If zero,
+    # notifications are delivered synchronously on the transitioning thread
+    NOTIFICATION_DELIVERY_WORKERS = UFDLIntSetting(default=2)
+
+    # The maximum number of queued notifications a delivery worker handles at once
+    NOTIFICATION_DELIVERY_BATCH_SIZE = UFDLIntSetting(default=32, minimum=1)
+
+    # The number of times delivery of a notification is retried after failing
+    NOTIFICATION_DELIVERY_MAX_RETRIES = UFDLIntSetting(default=3)
+
+    # The delay (in seconds) before the first retry, doubled for each subsequent retry
+    NOTIFICATION_DELIVERY_RETRY_BACKOFF = UFDLFloatSetting(default=1.0)
+
+    # How email notifications are grouped into digests ("none", "window" or "hierarchy")
+    EMAIL_NOTIFICATION_DIGEST_MODE = UFDLEnumSetting(
+        default="none",
+        enum="ufdl.core_app.models.jobs.notifications.EmailDigestMode"
+    )
+
+    # The time window (in seconds) over which email notifications are grouped into a digest
+    EMAIL_NOTIFICATION_DIGEST_WINDOW = UFDLFloatSetting(default=60.0)
+
+    # The minimum time (in seconds) between web-socket progress broadcasts for each job
+    WEBSOCKET_PROGRESS_INTERVAL = UFDLFloatSetting(default=1.0)
+
+    # The number of recent web-socket messages kept per group for resuming subscribers
+    WEBSOCKET_REPLAY_LENGTH = UFDLIntSetting(default=100)
+
     # The default set of notifications to send when a workable job transitions
     DEFAULT_WORKABLE_NOTIFICATIONS = UFDLNotificationActionsSetting(
         default=NotificationActions(
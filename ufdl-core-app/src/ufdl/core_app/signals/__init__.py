@@ -3,5 +3,8 @@ Package for managing signals on the UFDL backend.
 """
 from ._all_requests import all_requests
 from ._dataset_domains import dataset_domains
+from ._index_template_compatibility import index_template_compatibility, index_migrated_template_compatibility
+from ._invalidate_job_registry import invalidate_job_registry
+from ._invalidate_parameter_bundles import invalidate_parameter_bundles
 from ._update_node_last_seen import update_node_last_seen
 from ._update_user_last_login import update_user_last_login
@@ -0,0 +1,45 @@
+from django.db import transaction
+from django.db.models.signals import post_migrate, post_save
+from django.dispatch import receiver
+
+from ..apps import UFDLCoreAppConfig
+from ..models.jobs import WorkableTemplate
+
+
+@receiver(post_save, sender=WorkableTemplate, dispatch_uid='index_template_compatibility')
+def index_template_compatibility(sender, **kwargs):
+    """
+    Adds a workable template to the template-compatibility index once it
+    has been created/imported, or its contract has changed.
+
+    :param sender:  The sender of the signal (unused).
+    :param kwargs:  The signal arguments (should include 'instance' and 'update_fields' keywords).
+    """
+    # Get the template from the keyword arguments
+    template_pk = kwargs['instance'].pk
+
+    # Saves which don't change the contract don't change the index
+    update_fields = kwargs.get('update_fields', None)
+    if update_fields is not None and "type" not in update_fields:
+        return
+
+    # Wait until the template (and any contracts added with it) are committed
+    transaction.on_commit(
+        lambda: WorkableTemplate.objects.filter(pk=template_pk).index_compatibility()
+    )
+
+
+@receiver(post_migrate, dispatch_uid='index_migrated_template_compatibility')
+def index_migrated_template_compatibility(sender, **kwargs):
+    """
+    Adds any workable templates added by migrations to the template-compatibility
+    index, as migrations don't trigger the signals of the models.
+
+    :param sender:  The app-config of the migrated app.
+    :param kwargs:  The signal arguments (unused).
+    """
+    # Only needs doing once per migration run
+    if sender.label != UFDLCoreAppConfig.label:
+        return
+
+    WorkableTemplate.objects.active().needing_compatibility_index().index_compatibility()
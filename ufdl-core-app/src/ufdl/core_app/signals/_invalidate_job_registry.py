@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models.jobs import JobContract, JobType, WorkableTemplate, WorkableTemplateContract
+
+
+@receiver(post_save, sender=JobType, dispatch_uid='invalidate_job_registry_type_saved')
+@receiver(post_delete, sender=JobType, dispatch_uid='invalidate_job_registry_type_deleted')
+@receiver(post_save, sender=JobContract, dispatch_uid='invalidate_job_registry_contract_saved')
+@receiver(post_delete, sender=JobContract, dispatch_uid='invalidate_job_registry_contract_deleted')
+def invalidate_job_registry(sender, **kwargs):
+    """
+    Causes the job-type/contract registry to be rebuilt by all server
+    processes when a job type or contract changes.
+
+    :param sender:  The sender of the signal.
+    :param kwargs:  The signal arguments (unused).
+    """
+    # Local import to avoid circular reference error
+    from ..initialise import invalidate_registry
+
+    invalidate_registry()
+
+    # Which contracts each template implements may have changed, so drop the
+    # contracts from the template-compatibility index, and rebuild it once the
+    # new registry is in place
+    if sender is JobContract:
+        WorkableTemplateContract.objects.all().delete()
+        transaction.on_commit(
+            lambda: WorkableTemplate.objects.active().needing_compatibility_index().index_compatibility()
+        )
@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from ..models.jobs import JobTemplate, Parameter, WorkableTemplate
+from ..models.jobs.meta import MetaTemplate
+
+
+@receiver(post_save, sender=JobTemplate, dispatch_uid='invalidate_parameter_bundles_template_saved')
+@receiver(post_delete, sender=JobTemplate, dispatch_uid='invalidate_parameter_bundles_template_deleted')
+@receiver(post_save, sender=WorkableTemplate, dispatch_uid='invalidate_parameter_bundles_workable_saved')
+@receiver(post_delete, sender=WorkableTemplate, dispatch_uid='invalidate_parameter_bundles_workable_deleted')
+@receiver(post_save, sender=MetaTemplate, dispatch_uid='invalidate_parameter_bundles_meta_saved')
+@receiver(post_delete, sender=MetaTemplate, dispatch_uid='invalidate_parameter_bundles_meta_deleted')
+@receiver(post_save, sender=Parameter, dispatch_uid='invalidate_parameter_bundles_parameter_saved')
+@receiver(post_delete, sender=Parameter, dispatch_uid='invalidate_parameter_bundles_parameter_deleted')
+def invalidate_parameter_bundles(sender, **kwargs):
+    """
+    Discards the cached parameter description of a job template
+    when the template or any of its parameters change.
+
+    :param sender:  The sender of the signal.
+    :param kwargs:  The signal arguments (should include an 'instance' keyword).
+    """
+    # Get the instance from the keyword arguments
+    instance = kwargs['instance']
+
+    if sender is Parameter:
+        JobTemplate.invalidate_parameter_bundle(instance.template_id)
+    else:
+        JobTemplate.invalidate_parameter_bundle(instance.pk)
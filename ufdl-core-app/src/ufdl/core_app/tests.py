@@ -1,3 +1,349 @@
+import json
+from datetime import timedelta
+from typing import List
+
 from django.test import TestCase
+from django.utils.timezone import now
+
+from simple_django_teams.models import Membership, Team
+
+from .exceptions import QuotaExceeded, UploadTooLarge
+from .models import Dataset, Licence, Node, Project, TeamQuota, UploadSession, User
+from .models.jobs import Job, WorkableTemplate
+from .models.jobs.notifications import (
+    GroupWebSocketConsumer,
+    JobHierarchyWebSocketConsumer,
+    NodeWebSocketConsumer,
+    TeamWebSocketConsumer
+)
+
+
+class TeamQuotaTestCase(TestCase):
+    """
+    Tests the enforcement of team resource quotas.
+    """
+    def setUp(self):
+        user = User.objects.create_user("quota-user", "quota-user@example.com", "password")
+        self.team = Team.objects.create(name="quota-team", creator=user)
+        TeamQuota.objects.create(team=self.team, max_queued_jobs=2, max_dataset_bytes=100)
+
+    def quota(self) -> TeamQuota:
+        return TeamQuota.objects.get(team=self.team)
+
+    def test_adjust_within_limit(self):
+        TeamQuota.adjust(self.team.pk, queued_jobs=2, dataset_bytes=100)
+
+        quota = self.quota()
+        self.assertEqual(quota.queued_jobs, 2)
+        self.assertEqual(quota.dataset_bytes, 100)
+
+    def test_adjust_over_limit_is_rejected(self):
+        TeamQuota.adjust(self.team.pk, queued_jobs=1, dataset_bytes=60)
+
+        with self.assertRaises(QuotaExceeded):
+            TeamQuota.adjust(self.team.pk, queued_jobs=1, dataset_bytes=41)
+
+        # A rejected adjustment changes none of the counters
+        quota = self.quota()
+        self.assertEqual(quota.queued_jobs, 1)
+        self.assertEqual(quota.dataset_bytes, 60)
+
+    def test_adjust_without_check_ignores_limit(self):
+        TeamQuota.adjust(self.team.pk, False, dataset_bytes=150)
+
+        self.assertEqual(self.quota().dataset_bytes, 150)
+
+    def test_decrease_over_limit_is_allowed(self):
+        TeamQuota.adjust(self.team.pk, False, queued_jobs=5)
+        TeamQuota.adjust(self.team.pk, queued_jobs=-1, dataset_bytes=10)
+
+        quota = self.quota()
+        self.assertEqual(quota.queued_jobs, 4)
+        self.assertEqual(quota.dataset_bytes, 10)
+
+    def test_unlimited_counter(self):
+        TeamQuota.adjust(self.team.pk, started_jobs=1000)
+
+        self.assertEqual(self.quota().started_jobs, 1000)
+
+    def test_no_team_is_no_op(self):
+        TeamQuota.adjust(None, queued_jobs=1000)
+
+        self.assertEqual(self.quota().queued_jobs, 0)
+
+    def test_check_available(self):
+        TeamQuota.adjust(self.team.pk, dataset_bytes=90)
+
+        TeamQuota.check_available(self.team.pk, dataset_bytes=10)
+        with self.assertRaises(QuotaExceeded):
+            TeamQuota.check_available(self.team.pk, dataset_bytes=11)
+
+        # Checking doesn't reserve anything
+        self.assertEqual(self.quota().dataset_bytes, 90)
+
+
+class QuotaReleaseTestCase(TestCase):
+    """
+    Tests that deleting jobs and data-sets returns their resources to the team's quota.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user("release-user", "release-user@example.com", "password")
+        self.team = Team.objects.create(name="release-team", creator=self.user)
+        self.project = Project.objects.create(name="release-project", team=self.team, creator=self.user)
+        TeamQuota.objects.create(team=self.team, max_queued_jobs=2, max_dataset_bytes=100)
+
+        self.template = WorkableTemplate.objects.create(
+            name="release-template",
+            scope="public",
+            licence=Licence.objects.first(),
+            type="",
+            creator=self.user
+        )
+
+    def create_jobs(self, num_jobs: int) -> List[Job]:
+        jobs = [
+            Job(template=self.template, input_values="{}", creator=self.user)
+            for _ in range(num_jobs)
+        ]
+        Job.bulk_admit(jobs, self.team.pk)
+
+        return Job.objects.bulk_create(jobs)
+
+    def create_dataset(self, name: str, num_bytes: int) -> Dataset:
+        dataset = Dataset.objects.create(
+            name=name,
+            project=self.project,
+            licence=Licence.objects.first(),
+            tags="",
+            creator=self.user
+        )
+        dataset.add_file("data.bin", bytes(num_bytes))
+
+        return dataset
+
+    def test_delete_job_then_readmit(self):
+        first, second = self.create_jobs(2)
+        with self.assertRaises(QuotaExceeded):
+            self.create_jobs(1)
+
+        first.delete()
+        self.create_jobs(1)
+
+        self.assertEqual(TeamQuota.objects.get(team=self.team).queued_jobs, 2)
+
+    def test_bulk_delete_jobs_then_readmit(self):
+        jobs = self.create_jobs(2)
+
+        Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+        self.create_jobs(2)
+
+        self.assertEqual(TeamQuota.objects.get(team=self.team).queued_jobs, 2)
+
+    def test_output_over_quota_is_rejected(self):
+        TeamQuota.objects.filter(team=self.team).update(max_output_bytes=100)
+        job, = self.create_jobs(1)
+        job.start_time = now()
+
+        job.add_output("first", "bytes", bytes(60), self.user)
+        with self.assertRaises(QuotaExceeded):
+            job.add_output("second", "bytes", bytes(60), self.user)
+
+        self.assertEqual(TeamQuota.objects.get(team=self.team).output_bytes, 60)
+        self.assertFalse(job.outputs.filter(name="second").exists())
+
+    def test_delete_dataset_then_readmit(self):
+        dataset = self.create_dataset("first", 60)
+        with self.assertRaises(QuotaExceeded):
+            self.create_dataset("second", 60)
+
+        dataset.delete()
+        self.create_dataset("third", 60)
+
+        self.assertEqual(TeamQuota.objects.get(team=self.team).dataset_bytes, 60)
+
+    def test_delete_project_releases_datasets(self):
+        self.create_dataset("first", 60)
+
+        Project.objects.filter(pk=self.project.pk).delete()
+
+        self.assertEqual(TeamQuota.objects.get(team=self.team).dataset_bytes, 0)
+
+
+class WebSocketSubscriptionTestCase(TestCase):
+    """
+    Tests which users can subscribe to the web-socket groups of jobs.
+    """
+    def setUp(self):
+        self.member = User.objects.create_user("ws-member", "ws-member@example.com", "password")
+        self.non_member = User.objects.create_user("ws-non-member", "ws-non-member@example.com", "password")
+        self.staff = User.objects.create_user("ws-staff", "ws-staff@example.com", "password", is_staff=True)
+        self.team = Team.objects.create(name="ws-team", creator=self.member)
+        Membership.objects.create(team=self.team, user=self.member, creator=self.member)
+
+        template = WorkableTemplate.objects.create(
+            name="ws-template",
+            scope="public",
+            licence=Licence.objects.first(),
+            type="",
+            creator=self.member
+        )
+        self.job = Job.objects.create(
+            template=template,
+            input_values="{}",
+            team=self.team,
+            creator=self.member
+        )
+
+    @staticmethod
+    def can_subscribe(consumer_class, user: User, pk: int) -> bool:
+        consumer: GroupWebSocketConsumer = consumer_class()
+        consumer.scope = {'user': user, 'url_route': {'kwargs': {'pk': pk}}}
+        return consumer.can_subscribe()
+
+    def test_job_hierarchy(self):
+        self.assertTrue(self.can_subscribe(JobHierarchyWebSocketConsumer, self.member, self.job.pk))
+        self.assertTrue(self.can_subscribe(JobHierarchyWebSocketConsumer, self.staff, self.job.pk))
+        self.assertFalse(self.can_subscribe(JobHierarchyWebSocketConsumer, self.non_member, self.job.pk))
+
+    def test_node(self):
+        self.assertFalse(self.can_subscribe(NodeWebSocketConsumer, self.member, 1))
+        self.assertFalse(self.can_subscribe(NodeWebSocketConsumer, self.non_member, 1))
+
+    def test_team(self):
+        self.assertTrue(self.can_subscribe(TeamWebSocketConsumer, self.member, self.team.pk))
+        self.assertFalse(self.can_subscribe(TeamWebSocketConsumer, self.non_member, self.team.pk))
+
+
+class ResultReuseTestCase(TestCase):
+    """
+    Tests the reuse of the results of prior jobs of deterministic templates.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user("reuse-user", "reuse-user@example.com", "password")
+        team = Team.objects.create(name="reuse-team", creator=self.user)
+        project = Project.objects.create(name="reuse-project", team=team, creator=self.user)
+        self.dataset = Dataset.objects.create(
+            name="reuse-dataset",
+            project=project,
+            licence=Licence.objects.first(),
+            tags="",
+            creator=self.user
+        )
+        self.dataset.add_file("first.txt", b"first")
+
+        self.template = WorkableTemplate.objects.create(
+            name="reuse-template",
+            scope="public",
+            licence=Licence.objects.first(),
+            type="",
+            deterministic=True,
+            creator=self.user
+        )
+
+    def submit(self) -> Job:
+        """
+        Submits a job on the data-set, reusing the result of a prior identical job if there is one.
+        """
+        input_values = {"dataset": (self.dataset.pk, "Dataset")}
+        input_file_pks = Job.resolve_input_files(input_values)
+
+        job = Job(
+            template=self.template,
+            input_values=json.dumps({
+                input_name: {"value": value, "type": type_string}
+                for input_name, (value, type_string) in input_values.items()
+            }),
+            creator=self.user
+        )
+        job.result_key = self.template.result_key_for(job, Job.resolve_input_fingerprint(input_values, input_file_pks))
+        job.save()
+
+        Job.bulk_finish_from_prior_results([job])
+
+        return Job.objects.get(pk=job.pk)
+
+    def finish(self, job: Job):
+        Job.objects.filter(pk=job.pk).update(start_time=now(), end_time=now())
+
+    def test_unchanged_inputs_share_result_key(self):
+        first = self.submit()
+        self.finish(first)
+
+        second = self.submit()
+
+        self.assertEqual(first.result_key, second.result_key)
+
+    def test_edited_dataset_is_not_reused(self):
+        first = self.submit()
+        self.finish(first)
+
+        self.dataset.add_file("second.txt", b"second")
+        second = self.submit()
+
+        self.assertNotEqual(first.result_key, second.result_key)
+        self.assertIsNone(second.end_time)
+
+
+class InferenceBatchTestCase(TestCase):
+    """
+    Tests finishing a batch of jobs worked together on a node.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user("batch-user", "batch-user@example.com", "password")
+        template = WorkableTemplate.objects.create(
+            name="batch-template",
+            scope="public",
+            licence=Licence.objects.first(),
+            type="",
+            creator=self.user
+        )
+        self.node = Node.objects.create(ip="127.0.0.1", index=0, cpu_mem=0)
+
+        self.leader, self.worked, self.unworked = (
+            Job.objects.create(template=template, input_values="{}", creator=self.user, node=self.node)
+            for _ in range(3)
+        )
+        Job.objects.filter(pk__in=[self.worked.pk, self.unworked.pk]).update(batch=self.leader)
+
+    def test_members_without_outputs_are_released(self):
+        self.leader.start(self.node)
+        self.leader.add_output("model", "bytes", b"leader", self.user)
+        self.leader.add_output(f"{self.worked.pk}:model", "bytes", b"worked", self.user)
+
+        self.leader.finish(self.node)
+
+        worked = Job.objects.get(pk=self.worked.pk)
+        self.assertIsNotNone(worked.end_time)
+        self.assertTrue(worked.outputs.filter(name="model").exists())
+
+        # The job the node produced nothing for goes back to waiting for a node
+        unworked = Job.objects.get(pk=self.unworked.pk)
+        self.assertIsNone(unworked.end_time)
+        self.assertIsNone(unworked.start_time)
+        self.assertIsNone(unworked.node)
+        self.assertIsNone(unworked.batch)
+
+
+class UploadSessionTestCase(TestCase):
+    """
+    Tests uploading files in parts.
+    """
+    def setUp(self):
+        self.user = User.objects.create_user("upload-user", "upload-user@example.com", "password")
+
+    def test_overflow_is_rejected(self):
+        session = UploadSession.objects.create(creator=self.user, size=4)
+
+        with self.assertRaises(UploadTooLarge):
+            session.write_part(0, [b"too long"])
+
+        self.assertEqual(UploadSession.objects.get(pk=session.pk).received, 0)
+
+    def test_expired_sessions_are_discarded(self):
+        expired = UploadSession.objects.create(creator=self.user)
+        UploadSession.objects.filter(pk=expired.pk).update(expiry_time=now() - timedelta(seconds=1))
+
+        active = UploadSession.objects.create(creator=self.user)
 
-# Create your tests here.
+        self.assertFalse(UploadSession.objects.filter(pk=expired.pk).exists())
+        self.assertTrue(UploadSession.objects.filter(pk=active.pk).exists())
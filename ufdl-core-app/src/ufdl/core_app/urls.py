@@ -25,6 +25,7 @@ router.register("job-contracts", views.jobs.JobContractViewSet)
 router.register("jobs", views.jobs.JobViewSet)
 router.register("job-templates", views.jobs.JobTemplateViewSet)
 router.register("job-outputs", views.jobs.JobOutputViewSet)
+router.register("uploads", views.UploadSessionViewSet)
 
 # The final set of URLs routed by this app
 urlpatterns = [
@@ -2,9 +2,9 @@ from ._accumulate_delete import accumulate_delete
 from ._for_user import for_user
 from ._format_query_params import format_query_params
 from ._format_suffix import format_suffix
-from ._Profiler import Profiler
 from ._query_sets import (
-    max_value
+    max_value,
+    pk_fingerprint
 )
 from ._split_multipart_field import split_multipart_field
 from ._typing import (
@@ -13,3 +13,4 @@ from ._typing import (
     is_query_parameters,
     is_query_parameter_value
 )
+from ._write_npz import Column, write_npz
@@ -18,3 +18,21 @@ def max_value(query_set: models.QuerySet, field_name: str, default=None):
         return default
 
     return query_set.aggregate(models.Max(field_name))[f'{field_name}__max']
+
+
+def pk_fingerprint(query_set: models.QuerySet) -> str:
+    """
+    Gets a cheap fingerprint of the set of primary-keys in a query-set. As
+    primary-keys are never reused, the fingerprint changes whenever a row
+    is added to or removed from the set.
+
+    :param query_set:   The query-set to fingerprint.
+    :return:            The fingerprint.
+    """
+    aggregates = query_set.order_by().aggregate(
+        count=models.Count("pk"),
+        max=models.Max("pk"),
+        sum=models.Sum("pk")
+    )
+
+    return f"{aggregates['count']}:{aggregates['max']}:{aggregates['sum']}"
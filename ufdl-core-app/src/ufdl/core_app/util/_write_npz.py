@@ -0,0 +1,109 @@
+"""
+Writing of NumPy .npz archives without requiring NumPy itself.
+"""
+import sys
+from array import array
+from io import BytesIO
+from typing import Dict, List, Tuple, Union
+from zipfile import ZipFile, ZIP_STORED
+
+# The NumPy type descriptors of the supported array type-codes, with their item sizes
+NPY_DESCRIPTORS: Dict[str, Tuple[str, int]] = {
+    "B": ("|u1", 1),
+    "i": ("<i4", 4),
+    "q": ("<i8", 8),
+    "d": ("<f8", 8)
+}
+
+# The magic string and version (1.0) at the start of each .npy file
+NPY_MAGIC = b"\x93NUMPY\x01\x00"
+
+# The alignment of the array data within each .npy file
+NPY_ALIGNMENT = 64
+
+# The types of column that can be written
+Column = Union[array, List[str]]
+
+
+def write_npz(columns: Dict[str, Column]) -> bytes:
+    """
+    Writes a set of one-dimensional columns as an uncompressed NumPy .npz
+    archive, so that clients can load (or memory-map) them without parsing.
+
+    :param columns:     The columns to write, by name. Each is either an array
+                        of one of the type-codes in NPY_DESCRIPTORS, or a list
+                        of strings (written as fixed-width unicode).
+    :return:            The contents of the .npz archive.
+    """
+    # Create an in-memory buffer for the archive contents
+    npz_buffer = BytesIO()
+
+    # Members are stored (not compressed) so their data can be mapped directly
+    with ZipFile(npz_buffer, 'w', compression=ZIP_STORED) as npz_file:
+        for name, column in columns.items():
+            if isinstance(column, array):
+                descriptor, data = array_npy_data(column)
+            else:
+                descriptor, data = strings_npy_data(column)
+
+            npz_file.writestr(f"{name}.npy", npy_header(descriptor, len(column)) + data)
+
+    # Reset the buffer to the beginning for reading
+    npz_buffer.seek(0)
+
+    return npz_buffer.read()
+
+
+def npy_header(descriptor: str, length: int) -> bytes:
+    """
+    Formats the header of a .npy file containing a one-dimensional array.
+
+    :param descriptor:  The NumPy type descriptor of the array.
+    :param length:      The number of elements in the array.
+    :return:            The header, padded so that the array data is aligned.
+    """
+    header = f"{{'descr': '{descriptor}', 'fortran_order': False, 'shape': ({length},), }}"
+
+    # Pad with spaces (and a terminating newline) to the alignment boundary
+    unpadded_length = len(NPY_MAGIC) + 2 + len(header) + 1
+    header += " " * (-unpadded_length % NPY_ALIGNMENT) + "\n"
+
+    return NPY_MAGIC + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+
+def array_npy_data(column: array) -> Tuple[str, bytes]:
+    """
+    Gets the NumPy type descriptor and little-endian data of an array.
+
+    :param column:  The array.
+    :return:        The descriptor and data.
+    """
+    descriptor, item_size = NPY_DESCRIPTORS[column.typecode]
+
+    # Platform type sizes can vary, so make sure the array matches its descriptor
+    if column.itemsize != item_size:
+        raise ValueError(
+            f"Array type-code '{column.typecode}' has item size {column.itemsize} "
+            f"on this platform, expected {item_size}"
+        )
+
+    if sys.byteorder != "little":
+        column = array(column.typecode, column)
+        column.byteswap()
+
+    return descriptor, column.tobytes()
+
+
+def strings_npy_data(column: List[str]) -> Tuple[str, bytes]:
+    """
+    Gets the NumPy type descriptor and data of a list of strings,
+    as a fixed-width unicode array.
+
+    :param column:  The strings.
+    :return:        The descriptor and data.
+    """
+    width = max(map(len, column), default=1) or 1
+
+    data = b"".join(string.ljust(width, "\0").encode("utf-32-le") for string in column)
+
+    return f"<U{width}", data
@@ -1,10 +1,11 @@
 from ..models import LogEntry
 from ..serialisers import LogEntrySerialiser
 from ..permissions import IsAuthenticated, AllowNone
+from .mixins import RequestMetricsViewSet
 from ._UFDLBaseViewSet import UFDLBaseViewSet
 
 
-class LogEntryViewSet(UFDLBaseViewSet):
+class LogEntryViewSet(RequestMetricsViewSet, UFDLBaseViewSet):
     queryset = LogEntry.objects.all()
     serializer_class = LogEntrySerialiser
 
@@ -14,5 +15,6 @@ class LogEntryViewSet(UFDLBaseViewSet):
         "retrieve": IsAuthenticated,
         "update": AllowNone,
         "partial_update": AllowNone,
-        "destroy": AllowNone
+        "destroy": AllowNone,
+        "get_request_metrics": AllowNone
     }
@@ -2,11 +2,11 @@ from simple_django_teams.models import Team
 
 from ..serialisers import TeamSerialiser
 from ..permissions import IsAuthenticated, IsMember, MemberHasAdminPermission, AllowNone
-from .mixins import MembershipViewSet, SoftDeleteViewSet
+from .mixins import MembershipViewSet, SoftDeleteViewSet, TeamQuotaViewSet
 from ._UFDLBaseViewSet import UFDLBaseViewSet
 
 
-class TeamViewSet(MembershipViewSet, SoftDeleteViewSet, UFDLBaseViewSet):
+class TeamViewSet(MembershipViewSet, TeamQuotaViewSet, SoftDeleteViewSet, UFDLBaseViewSet):
     queryset = Team.objects.all()
     serializer_class = TeamSerialiser
 
@@ -19,6 +19,8 @@ class TeamViewSet(MembershipViewSet, SoftDeleteViewSet, UFDLBaseViewSet):
         "destroy": MemberHasAdminPermission,
         "modify_memberships": MemberHasAdminPermission,
         "get_permissions_for_user": MemberHasAdminPermission,
+        "get_quota": IsMember,
+        "set_quota": AllowNone,
         "hard_delete": AllowNone,
         "reinstate": AllowNone
     }
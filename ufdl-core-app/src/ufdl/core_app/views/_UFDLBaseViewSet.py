@@ -9,6 +9,8 @@ from ..exceptions import JSONParseFailure, CreateViolatesUnique
 from ..filter import filter_list_request
 from ..logging import get_backend_logger
 from ..permissions import IsAdminUser
+from ..profiling import Profiler, get_profile_statistics
+from ..settings import core_settings
 from ..signals import all_requests
 from ..util import for_user
 
@@ -22,7 +24,8 @@ class UFDLBaseViewSet(ModelViewSet):
      - permission_classes: A dictionary of action-names to permissions classes for those actions.
      - default_permissions: The class of permissions to apply to actions not found in permissions_classes.
 
-    Automatically logs requests/responses to the database log.
+    Automatically logs requests/responses to the database log, and profiles the
+    handling of each request.
     """
     # The admin permission (override access to any action)
     admin_permission_class = IsAdminUser
@@ -62,6 +65,34 @@ class UFDLBaseViewSet(ModelViewSet):
 
         return query_set
 
+    def dispatch(self, request, *args, **kwargs):
+        # Handle the request as usual if not profiling
+        if not core_settings.PROFILE_REQUESTS:
+            return super().dispatch(request, *args, **kwargs)
+
+        with Profiler() as profiler:
+            response = super().dispatch(request, *args, **kwargs)
+
+        # Add the profile to the statistics for the action
+        action = f"{type(self).__name__}.{self.action}"
+        is_slow = get_profile_statistics().record(
+            action,
+            request.method,
+            request.get_full_path(),
+            response.status_code,
+            profiler
+        )
+
+        # Log slow requests
+        if is_slow:
+            get_backend_logger().warning(self.format_slow_request_log_message(request, action, profiler))
+
+        # Report the profile to the client if enabled
+        if core_settings.SERVER_TIMING_HEADERS:
+            response["Server-Timing"] = profiler.server_timing_header()
+
+        return response
+
     def initial(self, request, *args, **kwargs):
         # Run the initialisation of the request as usual
         try:
@@ -106,9 +137,41 @@ class UFDLBaseViewSet(ModelViewSet):
         :param response:    The response to the current request.
         :return:            The log message for the response.
         """
+        # Streamed responses have no data to log
+        if response.streaming:
+            data = '<streamed data>'
+        # Plain Django responses have no data, only pre-rendered content
+        elif not hasattr(response, "data"):
+            data = '<rendered content>'
+        elif isinstance(response.data, bytes):
+            data = '<binary data>'
+        else:
+            data = response.data
+
         return (
             f"STATUS={response.status_code}\n"
-            f"DATA={response.data if not isinstance(response.data, bytes) else '<binary data>'}"
+            f"DATA={data}"
+        )
+
+    def format_slow_request_log_message(self, request, action: str, profiler: Profiler) -> str:
+        """
+        Formats the logging message for a request which was slow to handle.
+
+        :param request:     The slow request.
+        :param action:      The name of the action that handled the request.
+        :param profiler:    The profile of the request.
+        :return:            The log message.
+        """
+        return (
+            f"SLOW REQUEST\n"
+            f"URI='{request.get_full_path()}'\n"
+            f"METHOD='{request.method}'\n"
+            f"ACTION='{action}'\n"
+            f"WALL_TIME={profiler.wall_time:.3f}s\n"
+            f"DB_QUERIES={profiler.db_queries}\n"
+            f"DB_TIME={profiler.db_time:.3f}s\n"
+            f"IO_BYTES={profiler.io_bytes}\n"
+            f"IO_TIME={profiler.io_time:.3f}s\n"
         )
 
     def perform_create(self, serializer):
@@ -0,0 +1,20 @@
+from ..models.files import UploadSession
+from ..serialisers import UploadSessionSerialiser
+from ..permissions import IsCreator, AllowNone
+from .mixins import UploadPartViewSet
+from ._UFDLBaseViewSet import UFDLBaseViewSet
+
+
+class UploadSessionViewSet(UploadPartViewSet, UFDLBaseViewSet):
+    queryset = UploadSession.objects.all()
+    serializer_class = UploadSessionSerialiser
+
+    permission_classes = {
+        "list": IsCreator,
+        "create": IsCreator,
+        "retrieve": IsCreator,
+        "update": AllowNone,
+        "partial_update": AllowNone,
+        "destroy": IsCreator,
+        "upload_part": IsCreator
+    }
@@ -4,6 +4,7 @@ from ._LicenceViewSet import LicenceViewSet
 from ._LogEntryViewSet import LogEntryViewSet
 from ._TeamViewSet import TeamViewSet
 from ._ProjectViewSet import ProjectViewSet
+from ._UploadSessionViewSet import UploadSessionViewSet
 from ._UserViewSet import UserViewSet
 
 from . import jobs
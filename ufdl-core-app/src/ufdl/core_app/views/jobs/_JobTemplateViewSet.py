@@ -1,12 +1,19 @@
 from ...models.jobs import JobTemplate
 from ...serialisers.jobs import JobTemplateSerialiser
 from ...permissions import IsAuthenticated, AllowNone, IsAdminUser
-from ..mixins import SoftDeleteViewSet, CreateJobViewSet, ImportTemplateViewSet, GetAllMatchingTemplatesViewSet
+from ..mixins import (
+    SoftDeleteViewSet,
+    CreateJobViewSet,
+    DeterministicTemplateViewSet,
+    ImportTemplateViewSet,
+    GetAllMatchingTemplatesViewSet
+)
 from .._UFDLBaseViewSet import UFDLBaseViewSet
 
 
 class JobTemplateViewSet(ImportTemplateViewSet,
                          CreateJobViewSet,
+                         DeterministicTemplateViewSet,
                          GetAllMatchingTemplatesViewSet,
                          SoftDeleteViewSet,
                          UFDLBaseViewSet):
@@ -23,6 +30,7 @@ class JobTemplateViewSet(ImportTemplateViewSet,
         "partial_update": AllowNone,
         "destroy": IsAdminUser,
         "create_job": IsAuthenticated,
+        "create_jobs": IsAuthenticated,
         "hard_delete": IsAdminUser,
         "reinstate": IsAdminUser,
         "import_template": IsAdminUser,
@@ -30,5 +38,7 @@ class JobTemplateViewSet(ImportTemplateViewSet,
         "get_all_matching_templates": IsAuthenticated,
         "get_all_parameters": IsAuthenticated,
         "get_types": IsAuthenticated,
-        "get_outputs": IsAuthenticated
+        "get_outputs": IsAuthenticated,
+        "set_deterministic": IsAdminUser,
+        "clear_deterministic": IsAdminUser
     }
@@ -9,11 +9,11 @@ from ...permissions import (
     AllowNone,
     JobIsWorkable
 )
-from ..mixins import SoftDeleteViewSet, AddJobOutputViewSet, AcquireJobViewSet
+from ..mixins import SoftDeleteViewSet, AddJobOutputViewSet, AcquireJobViewSet, JobMetricsViewSet
 from .._UFDLBaseViewSet import UFDLBaseViewSet
 
 
-class JobViewSet(AcquireJobViewSet, AddJobOutputViewSet, SoftDeleteViewSet, UFDLBaseViewSet):
+class JobViewSet(AcquireJobViewSet, AddJobOutputViewSet, JobMetricsViewSet, SoftDeleteViewSet, UFDLBaseViewSet):
     queryset = Job.objects.all()
     serializer_class = JobSerialiser
 
@@ -27,10 +27,12 @@ class JobViewSet(AcquireJobViewSet, AddJobOutputViewSet, SoftDeleteViewSet, UFDL
         "partial_update": IsAdminUser,
         "destroy": IsAdminUser,
         "add_output": IsAdminUser | NodeOwnsJob,
+        "add_output_from_upload": IsAdminUser | NodeOwnsJob,
         "delete_output": IsAdminUser,
         "get_output": IsAuthenticated,
         "get_output_info": IsAuthenticated,
         "acquire_job": IsNode & JobIsWorkable,
+        "acquire_next_job": IsNode,
         "release_job": NodeOwnsJob | NodeWorkingJob,
         "start_job": NodeOwnsJob,
         "progress_job": NodeOwnsJob,
@@ -38,6 +40,7 @@ class JobViewSet(AcquireJobViewSet, AddJobOutputViewSet, SoftDeleteViewSet, UFDL
         "reset_job": NodeOwnsJob,
         "abort_job": IsAdminUser,
         "cancel_job": IsAdminUser,
+        "get_metrics": IsAdminUser,
         "hard_delete": IsAdminUser,
         "reinstate": IsAdminUser
     }
@@ -1,6 +1,8 @@
 from typing import List
 
-from rest_framework import routers
+from django.db import transaction
+
+from rest_framework import routers, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
@@ -12,6 +14,7 @@ from ...exceptions import *
 from ...models.jobs import Job
 from ...models.nodes import Node
 from ...serialisers.jobs import JobSerialiser
+from ...settings import core_settings
 from ._RoutedViewSet import RoutedViewSet
 
 
@@ -26,6 +29,13 @@ class AcquireJobViewSet(RoutedViewSet):
     @classmethod
     def get_routes(cls) -> List[routers.Route]:
         return [
+            routers.Route(
+                url=r'^{prefix}/acquire-next{trailing_slash}$',
+                mapping={'get': 'acquire_next_job'},
+                name='{basename}-acquire-next-job',
+                detail=False,
+                initkwargs={cls.MODE_ARGUMENT_NAME: AcquireJobViewSet.MODE_KEYWORD}
+            ),
             routers.Route(
                 url=r'^{prefix}/{lookup}/acquire{trailing_slash}$',
                 mapping={'get': 'acquire_job'},
@@ -103,6 +113,49 @@ class AcquireJobViewSet(RoutedViewSet):
 
         return Response(JobSerialiser().to_representation(job))
 
+    def acquire_next_job(self, request: Request):
+        """
+        Action for a node to acquire the waiting job whose input files it
+        already holds the most of in its cache. Optionally restricted to
+        jobs from the templates given by the 'template' query parameter(s).
+
+        :param request:     The request.
+        :return:            The response containing the job, or no content
+                            if there are no jobs waiting.
+        """
+        # Get the node making the request
+        node = Node.from_request(request)
+
+        # Get the jobs waiting for a node whose teams have capacity to start them,
+        # those with the most inputs local to this node first
+        candidates = Job.objects.awaiting_node().within_started_quota()
+        templates = request.query_params.getlist("template")
+        if len(templates) > 0:
+            try:
+                candidates = candidates.filter(template__pk__in=[int(template) for template in templates])
+            except ValueError:
+                raise BadArgumentType("acquire_next_job", "template", "int", templates)
+        candidates = candidates.by_locality_to(node).values_list("pk", flat=True)
+
+        for candidate_pk in candidates[:core_settings.ACQUIRE_NEXT_JOB_CANDIDATES]:
+            with transaction.atomic():
+                # Skip jobs which another node is acquiring concurrently
+                job = (
+                    Job.objects
+                    .select_for_update(skip_locked=True)
+                    .filter(pk=candidate_pk, node__isnull=True)
+                    .first()
+                )
+
+                if job is None:
+                    continue
+
+                job.acquire(node)
+
+            return Response(JobSerialiser().to_representation(job))
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
     def release_job(self, request: Request, pk=None):
         """
         Action for a node to release a job.
@@ -1,11 +1,14 @@
 from typing import List
 
+from django.db import transaction
+
 from rest_framework import routers
 from rest_framework.parsers import FileUploadParser
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from ...exceptions import BadName
+from ...exceptions import BadArgumentValue, BadName
+from ...models.files import UploadSession
 from ...models.jobs import Job
 from ...renderers import BinaryFileRenderer
 from ...serialisers.jobs import JobOutputSerialiser
@@ -20,6 +23,7 @@ class AddJobOutputViewSet(RoutedViewSet):
     # The keyword used to specify when the view-set is in add-outputs mode
     MODE_KEYWORD: str = "add-job-output"
     INFO_KEYWORD: str = "job-outputs-info"
+    UPLOAD_KEYWORD: str = "job-outputs-upload"
 
     @classmethod
     def get_routes(cls) -> List[routers.Route]:
@@ -41,6 +45,15 @@ class AddJobOutputViewSet(RoutedViewSet):
                 name='{basename}-job-outputs-info',
                 detail=True,
                 initkwargs={cls.MODE_ARGUMENT_NAME: AddJobOutputViewSet.INFO_KEYWORD}
+            ),
+            routers.Route(
+                url=r'^{prefix}/{lookup}/outputs/(?P<name>[^/]+)/(?P<type>[^/]+)/upload/(?P<upload>[0-9]+)$',
+                mapping={
+                    'post': 'add_output_from_upload'
+                },
+                name='{basename}-job-outputs-upload',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: AddJobOutputViewSet.UPLOAD_KEYWORD}
             )
         ]
 
@@ -79,6 +92,32 @@ class AddJobOutputViewSet(RoutedViewSet):
 
         return Response(JobOutputSerialiser().to_representation(output))
 
+    def add_output_from_upload(self, request: Request, pk=None, name=None, type=None, upload=None):
+        """
+        Action to add an output to a job from a file uploaded in parts.
+        Commits the upload session.
+
+        :param request:     The request.
+        :param pk:          The primary key of the job.
+        :param name:        The name of the output.
+        :param type:        The type of the output.
+        :param upload:      The primary key of the upload session.
+        :return:            The response containing the output.
+        """
+        # Get the job the output is being added to
+        job = self.get_object_of_type(Job)
+
+        with transaction.atomic():
+            # Get the user's upload session
+            session = UploadSession.objects.for_user(request.user).select_for_update().filter(pk=upload).first()
+            if session is None:
+                raise BadArgumentValue(self.action, "upload", upload, reason="No such upload session")
+
+            # Create the output from the uploaded file
+            output = job.add_output_from_upload(name, type, session, request.user)
+
+        return Response(JobOutputSerialiser().to_representation(output))
+
     def delete_output(self, request: Request, pk=None, name=None, type=None):
         """
         Action to set the type of an output to a job.
@@ -100,7 +139,7 @@ class AddJobOutputViewSet(RoutedViewSet):
             raise BadName(name, f"Job has no output by this name/type ({name}/{type})")
 
         # Delete the output
-        output.delete()
+        job.remove_outputs(job.outputs.filter(pk=output.pk))
 
         return Response(JobOutputSerialiser().to_representation(output))
 
@@ -1,4 +1,5 @@
-from typing import List
+from itertools import product
+from typing import Dict, List, Optional, Tuple
 
 from django.db import transaction
 
@@ -6,17 +7,25 @@ from rest_framework import routers
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from ufdl.jobtypes.base import UFDLJSONType
 from ufdl.jobtypes.error import TypeParsingException
-from ufdl.jobtypes.util import parse_type
 
-from ufdl.json.core.jobs import CreateJobSpec
+from ufdl.json.core.jobs import CreateJobSpec, ValueTypePair
 
 from wai.json.object import Absent
+from wai.json.raw import RawJSONElement
 
-from ...exceptions import JSONParseFailure, ChildNotificationOverridesForWorkableJob, CouldntParseType
-from ...initialise import initialise
+from ...exceptions import (
+    BadArgumentType,
+    BadArgumentValue,
+    JSONParseFailure,
+    ChildNotificationOverridesForWorkableJob,
+    CouldntParseType
+)
+from ...initialise import initialise, parse_type
 from ...models import JobContract, JobType
-from ...models.jobs import JobTemplate, WorkableTemplate
+from ...models.jobs import Job, JobTemplate, WorkableTemplate
+from ...settings import core_settings
 from ...serialisers.jobs import JobSerialiser
 from ._RoutedViewSet import RoutedViewSet
 
@@ -38,6 +47,13 @@ class CreateJobViewSet(RoutedViewSet):
                 name='{basename}-create-job',
                 detail=True,
                 initkwargs={cls.MODE_ARGUMENT_NAME: CreateJobViewSet.MODE_KEYWORD}
+            ),
+            routers.Route(
+                url=r'^{prefix}/{lookup}/create-jobs{trailing_slash}$',
+                mapping={'post': 'create_jobs'},
+                name='{basename}-create-jobs',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: CreateJobViewSet.MODE_KEYWORD}
             )
         ]
 
@@ -104,3 +120,143 @@ class CreateJobViewSet(RoutedViewSet):
         )
 
         return Response(JobSerialiser().to_representation(job))
+
+    @transaction.atomic
+    def create_jobs(self, request: Request, pk=None):
+        """
+        Action to create a number of jobs from the template in one go, e.g.
+        for a hyper-parameter sweep. The request body contains:
+         - 'template': a create-job specification which all jobs are based on.
+         - 'parameter_overrides' (optional): a list of parameter values, each of which
+           overrides the template's parameter values for one job.
+         - 'parameter_grid' (optional): a map from parameter name to a list of values,
+           the Cartesian product of which overrides the template's parameter values.
+        If both overrides and a grid are given, every override is combined with every
+        point in the grid.
+
+        :param request:     The request containing the bulk job specification.
+        :param pk:          The primary key of the job template.
+        :return:            The response containing the jobs.
+        """
+        initialise(JobType, JobContract)
+
+        # Get the job template the jobs are being created from
+        job_template = self.get_object_of_type(JobTemplate).upcast()
+
+        # Parse the shared job specification from the request
+        spec = JSONParseFailure.attempt(dict(request.data.get("template", {})), CreateJobSpec)
+
+        # Can't supply child notification overrides to a workable job
+        if (
+                isinstance(job_template, WorkableTemplate)
+                and
+                spec.child_notification_overrides is not Absent
+        ):
+            raise ChildNotificationOverridesForWorkableJob()
+
+        # Parse the parameter overrides and grid
+        overrides = request.data.get("parameter_overrides", [{}])
+        if not isinstance(overrides, list) or not all(isinstance(override, dict) for override in overrides):
+            raise BadArgumentType("create_jobs", "parameter_overrides", "list of objects", overrides)
+        grid = request.data.get("parameter_grid", {})
+        if not isinstance(grid, dict) or not all(isinstance(values, list) for values in grid.values()):
+            raise BadArgumentType("create_jobs", "parameter_grid", "object of lists", grid)
+
+        # Work out the parameter values (as raw value/type pairs) for each job
+        grid_points = [
+            dict(zip(grid.keys(), values))
+            for values in product(*grid.values())
+        ]
+        raw_parameter_value_sets = [
+            {**override, **grid_point}
+            for override in overrides
+            for grid_point in grid_points
+        ]
+
+        # Make sure the sweep isn't too large
+        limit = core_settings.BULK_CREATE_JOBS_LIMIT
+        if len(raw_parameter_value_sets) > limit:
+            raise BadArgumentValue(
+                "create_jobs",
+                "parameter_overrides/parameter_grid",
+                f"{len(raw_parameter_value_sets)} jobs",
+                reason=f"Can create at most {limit} jobs at once"
+            )
+
+        # Parse each type string only once
+        parsed_types: Dict[str, UFDLJSONType] = {}
+
+        def parse_pair(pair: ValueTypePair) -> Tuple[RawJSONElement, UFDLJSONType]:
+            if pair.type not in parsed_types:
+                parsed_types[pair.type] = parse_type(pair.type)
+            return pair.value, parsed_types[pair.type]
+
+        try:
+            # Format the input values
+            input_values = {
+                name: parse_pair(pair)
+                for name, pair in spec.input_values.items()
+            }
+
+            # Format the shared parameter values
+            shared_parameter_values = (
+                {
+                    name: parse_pair(pair)
+                    for name, pair in spec.parameter_values.items()
+                } if spec.parameter_values is not Absent
+                else {}
+            )
+
+            # Format the parameter values for each job
+            parameter_value_sets: List[Optional[Dict[str, Tuple[RawJSONElement, UFDLJSONType]]]] = [
+                {
+                    **shared_parameter_values,
+                    **{
+                        name: parse_pair(JSONParseFailure.attempt(pair, ValueTypePair))
+                        for name, pair in raw_parameter_values.items()
+                    }
+                }
+                for raw_parameter_values in raw_parameter_value_sets
+            ]
+        except TypeParsingException as e:
+            raise CouldntParseType(e) from e
+
+        # Keep the template's behaviour of no parameter values if none are given
+        if spec.parameter_values is Absent:
+            parameter_value_sets = [
+                parameter_values if len(parameter_values) > 0 else None
+                for parameter_values in parameter_value_sets
+            ]
+
+        # Create the jobs from the template
+        jobs = job_template.create_jobs(
+            request.user,
+            input_values,
+            parameter_value_sets,
+            spec.description,
+            (
+                spec.notification_override
+                if spec.notification_override is not Absent else
+                None
+            ),
+            (
+                spec.child_notification_overrides
+                if spec.child_notification_overrides is not Absent else
+                None
+            )
+        )
+
+        # Reload the jobs with their related objects for serialisation
+        jobs = (
+            Job.objects
+            .filter(pk__in=[job.pk for job in jobs])
+            .select_related("template")
+            .prefetch_related("outputs")
+            .order_by("pk")
+        )
+
+        serialiser = JobSerialiser()
+        return Response([
+            serialiser.to_representation(job)
+            for job in jobs
+        ])
@@ -0,0 +1,72 @@
+from typing import List
+
+from rest_framework import routers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...exceptions import BadJobTemplate
+from ...models.jobs import JobTemplate, WorkableTemplate
+from ._RoutedViewSet import RoutedViewSet
+
+
+class DeterministicTemplateViewSet(RoutedViewSet):
+    """
+    Mixin for the job-template view-set which allows workable templates to be
+    flagged as deterministic, so that new jobs reuse the outputs of identical
+    prior jobs instead of being worked again.
+    """
+    # The keyword used to specify when the view-set is in deterministic mode
+    MODE_KEYWORD: str = "deterministic"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/{lookup}/deterministic{trailing_slash}$',
+                mapping={
+                    'put': 'set_deterministic',
+                    'delete': 'clear_deterministic'
+                },
+                name='{basename}-deterministic',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: DeterministicTemplateViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def set_deterministic(self, request: Request, pk=None):
+        """
+        Action to flag a template as deterministic.
+
+        :param request:     The request.
+        :param pk:          The primary key of the template.
+        :return:            The response containing the template.
+        """
+        return self._set_deterministic(True)
+
+    def clear_deterministic(self, request: Request, pk=None):
+        """
+        Action to flag a template as not deterministic.
+
+        :param request:     The request.
+        :param pk:          The primary key of the template.
+        :return:            The response containing the template.
+        """
+        return self._set_deterministic(False)
+
+    def _set_deterministic(self, deterministic: bool) -> Response:
+        """
+        Sets whether the template is deterministic.
+
+        :param deterministic:   Whether the template is deterministic.
+        :return:                The response containing the template.
+        """
+        template = self.get_object_of_type(JobTemplate).upcast()
+
+        # Only workable templates produce outputs of their own
+        if not isinstance(template, WorkableTemplate):
+            raise BadJobTemplate(f"{template.name_and_version} is not a workable template")
+
+        template.deterministic = deterministic
+        template.save(update_fields=["deterministic"])
+
+        return Response(self.get_serializer().to_representation(template))
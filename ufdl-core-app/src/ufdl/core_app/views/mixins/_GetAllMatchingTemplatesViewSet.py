@@ -1,19 +1,17 @@
-import json
 from typing import Dict, List
 
-from rest_framework import routers
+from django.utils.http import parse_etags, quote_etag
+
+from rest_framework import routers, status
 from rest_framework.request import Request
 from rest_framework.response import Response
 
-from ufdl.jobcontracts.util import parse_contract
-
 from ufdl.jobtypes.base import UFDLType
 from ufdl.jobtypes.error import TypeParsingException
-from ufdl.jobtypes.util import parse_type
 
 from ...exceptions import BadModelType, BadName, CouldntParseType
-from ...initialise import initialise
-from ...models.jobs import JobType, JobContract, WorkableTemplate, JobTemplate
+from ...initialise import initialise, is_subtype, parse_type
+from ...models.jobs import JobType, JobContract, WorkableTemplate, WorkableTemplateInputType, JobTemplate
 from ._RoutedViewSet import RoutedViewSet
 
 
@@ -96,27 +94,28 @@ class GetAllMatchingTemplatesViewSet(RoutedViewSet):
             if input_name not in contract_type.input_constructors():
                 raise BadName(input_name, f"Not an input to {contract_name}")
 
-        # Search for all job-templates which can take the given inputs
-        matching_templates = []
-        for job_template in self.get_queryset():
-            job_template = job_template.upcast()
-            if isinstance(job_template, WorkableTemplate):
-                contract = parse_contract(job_template.type)
-                if not isinstance(contract, contract_type):
-                    continue
-                if all(
-                    any(
-                        input_type.is_subtype_of(contract_input_type)
-                        for contract_input_type in contract.inputs[input_name].types
-                    )
-                    for input_name, input_type in input_types.items()
-                ):
-                    matching_templates.append(job_template)
+        # Search the index for all job-templates which can take the given inputs
+        matching_templates = WorkableTemplate.objects.filter(
+            pk__in=self.get_queryset().values("pk")
+        ).implementing(contract_instance)
+        for input_name, input_type in input_types.items():
+            input_type_string = str(input_type)
+
+            # Find which of the types accepted by any template's input can take the given type
+            accepted_types = [
+                accepted_type
+                for accepted_type in WorkableTemplateInputType.objects.for_input(input_name).values_list(
+                    "type", flat=True
+                ).distinct()
+                if is_subtype(input_type_string, accepted_type)
+            ]
+
+            matching_templates = matching_templates.accepting(input_name, accepted_types)
 
         return Response(
             [
                 self.get_serializer().to_representation(job_template)
-                for job_template in matching_templates
+                for job_template in matching_templates.distinct()
             ]
         )
 
@@ -130,29 +129,16 @@ class GetAllMatchingTemplatesViewSet(RoutedViewSet):
         """
         initialise(JobType, JobContract)
 
-        template = self.get_object_of_type(JobTemplate).upcast()
-
-        parameters = {}
-        for parameter in template.parameters.all():
-            parameter_json = {
-                "types": {
-                    parameter_type: parse_type(parameter_type).json_schema
-                    for parameter_type in parameter.types.split("|")
-                },
-                "help": parameter.help
-            }
+        template = self.get_object_of_type(JobTemplate)
 
-            if parameter.default is not None:
-                parameter_json["default"] = {
-                    "value": json.loads(parameter.default),
-                    "type": parameter.default_type,
-                    "schema": parse_type(parameter.default_type).json_schema,
-                    "const": parameter.const
-                }
+        parameters, etag = template.parameter_bundle()
+        etag = quote_etag(etag)
 
-            parameters[parameter.name] = parameter_json
+        # The client already has the current parameters
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-        return Response(parameters)
+        return Response(parameters, headers={"ETag": etag})
 
     def get_types(self, request: Request, pk=None):
         """
@@ -6,10 +6,9 @@ from rest_framework.response import Response
 
 from ufdl.jobtypes.base import ServerResidentType
 from ufdl.jobtypes.error import TypeParsingException
-from ufdl.jobtypes.util import parse_type
 
 from ...exceptions import NotServerResidentType, CouldntParseType, TypeIsAbstract
-from ...initialise import initialise
+from ...initialise import initialise, parse_type
 from ...models.jobs import JobType, JobContract
 from ._RoutedViewSet import RoutedViewSet
 
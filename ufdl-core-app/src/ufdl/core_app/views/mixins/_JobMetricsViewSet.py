@@ -0,0 +1,56 @@
+from typing import List
+
+from rest_framework import routers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...models.jobs import JobMetric
+from ...models.nodes import Node
+from ...renderers import PrometheusTextRenderer
+from ._RoutedViewSet import RoutedViewSet
+
+
+class JobMetricsViewSet(RoutedViewSet):
+    """
+    Mixin for the job view-set which reports metrics about the job queue
+    and the worker nodes, as JSON or in the Prometheus text format.
+    """
+    # The keyword used to specify when the view-set is in job-metrics mode
+    MODE_KEYWORD: str = "job-metrics"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/metrics{trailing_slash}$',
+                mapping={'get': 'get_metrics'},
+                name='{basename}-metrics',
+                detail=False,
+                initkwargs={cls.MODE_ARGUMENT_NAME: JobMetricsViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def get_renderers(self):
+        # If not getting metrics, return the standard renderers
+        if self.mode != JobMetricsViewSet.MODE_KEYWORD:
+            return super().get_renderers()
+
+        return super().get_renderers() + [PrometheusTextRenderer()]
+
+    def get_metrics(self, request: Request):
+        """
+        Action to get the number of jobs in each lifecycle phase and histograms
+        of their durations (per template), along with the utilisation of the
+        worker nodes. Only reads the pre-aggregated metrics, so is cheap to poll.
+
+        :param request:     The request.
+        :return:            The response containing the metrics.
+        """
+        nodes = Node.objects.utilisation()
+        num_nodes = nodes["busy"] + nodes["idle"]
+        nodes["busy_ratio"] = nodes["busy"] / num_nodes if num_nodes > 0 else 0.0
+
+        return Response({
+            "templates": list(JobMetric.summarise().values()),
+            "nodes": nodes
+        })
@@ -0,0 +1,64 @@
+from typing import List
+
+from rest_framework import routers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...exceptions import BadArgumentType
+from ...models.nodes import Node
+from ._RoutedViewSet import RoutedViewSet
+
+
+class NodeCacheViewSet(RoutedViewSet):
+    """
+    Mixin for the node view-set which allows nodes to report the files
+    they hold in their local cache, so that jobs can be placed on nodes
+    which already hold their inputs.
+    """
+    # The keyword used to specify when the view-set is in node-cache mode
+    MODE_KEYWORD: str = "node-cache"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/{lookup}/cached-files{trailing_slash}$',
+                mapping={
+                    'get': 'get_cached_files',
+                    'put': 'set_cached_files'
+                },
+                name='{basename}-cached-files',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: NodeCacheViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def get_cached_files(self, request: Request, pk=None):
+        """
+        Action to get the handles of the files a node holds in its cache.
+
+        :param request:     The request.
+        :param pk:          The primary key of the node.
+        :return:            The response containing the file handles.
+        """
+        node = self.get_object_of_type(Node)
+
+        return Response(list(node.cached_files.values_list("handle", flat=True)))
+
+    def set_cached_files(self, request: Request, pk=None):
+        """
+        Action for a node to report the files it holds in its cache,
+        replacing any previous report.
+
+        :param request:     The request containing the list of file handles.
+        :param pk:          The primary key of the node.
+        :return:            The response containing the handles known to the server.
+        """
+        node = self.get_object_of_type(Node)
+
+        # Make sure a list of handles was supplied
+        handles = request.data
+        if not isinstance(handles, list) or not all(isinstance(handle, str) for handle in handles):
+            raise BadArgumentType("set_cached_files", "body", "list of file handles", handles)
+
+        return Response(node.set_cached_files(handles))
@@ -0,0 +1,48 @@
+from typing import List
+
+from rest_framework import routers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...profiling import get_profile_statistics
+from ...renderers import PrometheusTextRenderer
+from ._RoutedViewSet import RoutedViewSet
+
+
+class RequestMetricsViewSet(RoutedViewSet):
+    """
+    Mixin for the log view-set which reports the profiles of the requests
+    handled by the server process, as JSON or in the Prometheus text format.
+    """
+    # The keyword used to specify when the view-set is in request-metrics mode
+    MODE_KEYWORD: str = "request-metrics"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/request-metrics{trailing_slash}$',
+                mapping={'get': 'get_request_metrics'},
+                name='{basename}-request-metrics',
+                detail=False,
+                initkwargs={cls.MODE_ARGUMENT_NAME: RequestMetricsViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def get_renderers(self):
+        # If not getting metrics, return the standard renderers
+        if self.mode != RequestMetricsViewSet.MODE_KEYWORD:
+            return super().get_renderers()
+
+        return super().get_renderers() + [PrometheusTextRenderer()]
+
+    def get_request_metrics(self, request: Request):
+        """
+        Action to get histograms of the wall time, database time and file-system
+        I/O time of each view-set action, along with a sample of recent slow
+        requests. Covers only the requests handled by the responding process.
+
+        :param request:     The request.
+        :return:            The response containing the metrics.
+        """
+        return Response(get_profile_statistics().summarise())
@@ -1,10 +1,14 @@
 from typing import List
 
+from django.db import transaction
+
 from rest_framework import routers
 from rest_framework.parsers import FileUploadParser
 from rest_framework.request import Request
 from rest_framework.response import Response
 
+from ...exceptions import BadArgumentValue
+from ...models.files import UploadSession
 from ...models.mixins import SetFileModel
 from ._RoutedViewSet import RoutedViewSet
 
@@ -15,6 +19,7 @@ class SetFileViewSet(RoutedViewSet):
     """
     # The keyword used to specify when the view-set is in set-file mode
     MODE_KEYWORD: str = "set-file"
+    UPLOAD_KEYWORD: str = "set-file-upload"
 
     @classmethod
     def get_routes(cls) -> List[routers.Route]:
@@ -26,6 +31,13 @@ class SetFileViewSet(RoutedViewSet):
                 name='{basename}-set-file',
                 detail=True,
                 initkwargs={cls.MODE_ARGUMENT_NAME: SetFileViewSet.MODE_KEYWORD}
+            ),
+            routers.Route(
+                url=r'^{prefix}/{lookup}/data/upload/(?P<upload>[0-9]+){trailing_slash}$',
+                mapping={'post': 'set_file_from_upload'},
+                name='{basename}-set-file-upload',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: SetFileViewSet.UPLOAD_KEYWORD}
             )
         ]
 
@@ -52,6 +64,30 @@ class SetFileViewSet(RoutedViewSet):
 
         return Response(self.get_serializer().to_representation(obj))
 
+    def set_file_from_upload(self, request: Request, pk=None, upload=None):
+        """
+        Action to set the file-data of an object from a file uploaded
+        in parts. Commits the upload session.
+
+        :param request:     The request.
+        :param pk:          The primary key of the container object.
+        :param upload:      The primary key of the upload session.
+        :return:            The response containing the file record.
+        """
+        # Get the set-file object
+        obj = self.get_object_of_type(SetFileModel)
+
+        with transaction.atomic():
+            # Get the user's upload session
+            session = UploadSession.objects.for_user(request.user).select_for_update().filter(pk=upload).first()
+            if session is None:
+                raise BadArgumentValue(self.action, "upload", upload, reason="No such upload session")
+
+            # Set the file to the uploaded data
+            obj.set_file(session.commit())
+
+        return Response(self.get_serializer().to_representation(obj))
+
     def delete_file(self, request: Request, pk=None):
         """
         Action to delete the file-data of an object.
@@ -0,0 +1,64 @@
+from typing import List
+
+from simple_django_teams.models import Team
+
+from rest_framework import routers
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...models import TeamQuota
+from ...serialisers import TeamQuotaSerialiser
+from ._RoutedViewSet import RoutedViewSet
+
+
+class TeamQuotaViewSet(RoutedViewSet):
+    """
+    Mixin for the team view-set which allows the limits on the
+    resources a team can consume to be viewed and set.
+    """
+    # The keyword used to specify when the view-set is in team-quota mode
+    MODE_KEYWORD: str = "team-quota"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/{lookup}/quota{trailing_slash}$',
+                mapping={
+                    'get': 'get_quota',
+                    'patch': 'set_quota'
+                },
+                name='{basename}-quota',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: TeamQuotaViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def get_quota(self, request: Request, pk=None):
+        """
+        Action to get the limits on a team's resources, and its current usage.
+
+        :param request:     The request.
+        :param pk:          The primary key of the team.
+        :return:            The response containing the quota.
+        """
+        team = self.get_object_of_type(Team)
+
+        return Response(TeamQuotaSerialiser().to_representation(TeamQuota.for_team(team.pk)))
+
+    def set_quota(self, request: Request, pk=None):
+        """
+        Action to set the limits on a team's resources. Limits which
+        are null are removed.
+
+        :param request:     The request containing the new limits.
+        :param pk:          The primary key of the team.
+        :return:            The response containing the quota.
+        """
+        team = self.get_object_of_type(Team)
+
+        serialiser = TeamQuotaSerialiser(TeamQuota.for_team(team.pk), data=request.data, partial=True)
+        serialiser.is_valid(raise_exception=True)
+        quota = serialiser.save()
+
+        return Response(TeamQuotaSerialiser().to_representation(quota))
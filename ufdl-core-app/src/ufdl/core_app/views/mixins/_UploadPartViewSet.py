@@ -0,0 +1,68 @@
+from typing import List
+
+from django.db import transaction
+
+from rest_framework import routers
+from rest_framework.parsers import FileUploadParser
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from ...exceptions import BadArgumentValue
+from ...models.files import UploadSession
+from ._RoutedViewSet import RoutedViewSet
+
+
+class UploadPartViewSet(RoutedViewSet):
+    """
+    Mixin for the upload-session view-set which allows the parts
+    of a file to be uploaded separately.
+    """
+    # The keyword used to specify when the view-set is in upload-part mode
+    MODE_KEYWORD: str = "upload-part"
+
+    @classmethod
+    def get_routes(cls) -> List[routers.Route]:
+        return [
+            routers.Route(
+                url=r'^{prefix}/{lookup}/parts{trailing_slash}$',
+                mapping={'put': 'upload_part'},
+                name='{basename}-upload-part',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: UploadPartViewSet.MODE_KEYWORD}
+            )
+        ]
+
+    def get_parsers(self):
+        # If not putting a part, return the standard parsers
+        if self.mode != UploadPartViewSet.MODE_KEYWORD or self.request.method != 'PUT':
+            return super().get_parsers()
+
+        return [FileUploadParser()]
+
+    def upload_part(self, request: Request, pk=None):
+        """
+        Action to upload a part of a file. The offset of the part into the
+        file is given by the 'offset' query parameter (default 0).
+
+        :param request:     The request containing the part data.
+        :param pk:          The primary key of the upload session.
+        :return:            The response containing the upload session.
+        """
+        # Parse the offset of the part
+        offset = request.query_params.get("offset", "0")
+        try:
+            offset = int(offset)
+        except ValueError:
+            raise BadArgumentValue(self.action, "offset", offset, "an integer")
+
+        # Check permissions before locking the session
+        session = self.get_object_of_type(UploadSession)
+
+        with transaction.atomic():
+            # Lock the session so concurrent parts don't race to update it
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+
+            # Spool the part (already buffered to disk by the parser) a chunk at a time
+            session.write_part(offset, request.data['file'].chunks())
+
+        return Response(self.get_serializer().to_representation(session))
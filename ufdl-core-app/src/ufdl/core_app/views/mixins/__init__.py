@@ -6,6 +6,7 @@ from ._AddJobOutputViewSet import AddJobOutputViewSet
 from ._ClearDatasetViewSet import ClearDatasetViewSet
 from ._CopyableViewSet import CopyableViewSet
 from ._CreateJobViewSet import CreateJobViewSet
+from ._DeterministicTemplateViewSet import DeterministicTemplateViewSet
 from ._DownloadableViewSet import DownloadableViewSet
 from ._FileContainerViewSet import FileContainerViewSet
 from ._GetAllMatchingTemplatesViewSet import GetAllMatchingTemplatesViewSet
@@ -13,10 +14,15 @@ from ._GetAllValuesOfTypeViewSet import GetAllValuesOfTypeViewSet
 from ._GetByNameViewSet import GetByNameViewSet
 from ._GetHardwareGenerationViewSet import GetHardwareGenerationViewSet
 from ._ImportTemplateViewSet import ImportTemplateViewSet
+from ._JobMetricsViewSet import JobMetricsViewSet
 from ._LicenceSubdescriptorViewSet import LicenceSubdescriptorViewSet
 from ._MembershipViewSet import MembershipViewSet
 from ._MergeViewSet import MergeViewSet
+from ._NodeCacheViewSet import NodeCacheViewSet
 from ._PingNodeViewSet import PingNodeViewSet
+from ._RequestMetricsViewSet import RequestMetricsViewSet
 from ._RoutedViewSet import RoutedViewSet
 from ._SetFileViewSet import SetFileViewSet
 from ._SoftDeleteViewSet import SoftDeleteViewSet
+from ._TeamQuotaViewSet import TeamQuotaViewSet
+from ._UploadPartViewSet import UploadPartViewSet
@@ -17,6 +17,7 @@ class ModelViewSet(SetFileViewSet, DownloadableViewSet, SoftDeleteViewSet, UFDLB
         "partial_update": AllowNone,
         "destroy": AllowNone,
         "set_file": AllowNone,
+        "set_file_from_upload": AllowNone,
         "delete_file": AllowNone,
         "download": IsAuthenticated,
         "hard_delete": AllowNone,
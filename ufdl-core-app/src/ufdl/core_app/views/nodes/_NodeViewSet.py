@@ -1,11 +1,11 @@
 from ...models.nodes import Node
 from ...serialisers.nodes import NodeSerialiser
 from ...permissions import IsAuthenticated, NodeIsSelf, IsNode
-from ..mixins import PingNodeViewSet
+from ..mixins import NodeCacheViewSet, PingNodeViewSet
 from .._UFDLBaseViewSet import UFDLBaseViewSet
 
 
-class NodeViewSet(PingNodeViewSet, UFDLBaseViewSet):
+class NodeViewSet(NodeCacheViewSet, PingNodeViewSet, UFDLBaseViewSet):
     queryset = Node.objects.all()
     serializer_class = NodeSerialiser
 
@@ -16,5 +16,7 @@ class NodeViewSet(PingNodeViewSet, UFDLBaseViewSet):
         "update": NodeIsSelf,
         "partial_update": NodeIsSelf,
         "destroy": NodeIsSelf,
-        "ping": IsNode
+        "ping": IsNode,
+        "get_cached_files": IsAuthenticated,
+        "set_cached_files": NodeIsSelf
     }
@@ -1,9 +1,13 @@
-from typing import Union
+from array import array
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, Iterator, List, Tuple, Union
 
 from django.db import models
 
 from ufdl.core_app.apps import UFDLCoreAppConfig
 from ufdl.core_app.models import FileReference, NamedFile, Filename
+from ufdl.core_app.util import Column
 
 
 class CategoryQuerySet(models.QuerySet):
@@ -38,6 +42,59 @@ class CategoryQuerySet(models.QuerySet):
 
         return self.filter(category=category)
 
+    def iterate_categories(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Iterates over the categories of each file in the query-set. All categories,
+        along with their files' names, are fetched with a single query, and grouped
+        by file in memory.
+
+        :return:    An iterator of filename/categories pairs.
+        """
+        rows = (
+            self
+            .order_by("file_id", "category")
+            .values_list("file_id", "file__file__name__filename", "category")
+            .iterator()
+        )
+
+        for _, file_rows in groupby(rows, key=itemgetter(0)):
+            file_rows = list(file_rows)
+            yield file_rows[0][1], [category for _, _, category in file_rows]
+
+    def as_columns(self) -> Dict[str, Column]:
+        """
+        Formats this set of categories as columns, for a columnar snapshot. The
+        categories of each file occupy the range [file_offsets[i], file_offsets[i + 1])
+        of the category_id column, which indexes the categories dictionary.
+
+        :return:    The columns, by name.
+        """
+        rows = (
+            self
+            .order_by("file_id", "category")
+            .values_list("file_id", "file__file__name__filename", "category")
+            .iterator()
+        )
+
+        filenames = []
+        file_offsets = array("q", [0])
+        category_ids = array("i")
+        categories: Dict[str, int] = {}
+
+        for _, file_rows in groupby(rows, key=itemgetter(0)):
+            file_rows = list(file_rows)
+            filenames.append(file_rows[0][1])
+            for _, _, category in file_rows:
+                category_ids.append(categories.setdefault(category, len(categories)))
+            file_offsets.append(len(category_ids))
+
+        return {
+            "filenames": filenames,
+            "file_offsets": file_offsets,
+            "category_id": category_ids,
+            "categories": list(categories)
+        }
+
 
 class Category(models.Model):
     # The file in the dataset that the category applies to
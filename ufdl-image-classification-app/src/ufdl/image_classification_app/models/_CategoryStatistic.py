@@ -0,0 +1,200 @@
+from collections import Counter
+from itertools import combinations
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db import models
+
+from ufdl.core_app.apps import UFDLCoreAppConfig
+
+# The key of a statistic: (statistic, category, other category)
+StatisticKey = Tuple[str, str, str]
+
+
+class CategoryStatisticQuerySet(models.QuerySet):
+    """
+    Custom query-set for working with groups of category statistics.
+    """
+    pass
+
+
+class CategoryStatistic(models.Model):
+    """
+    A counter of one statistic about the categories of a data-set: the number
+    of files with a category, the number of files with a pair of categories,
+    or the number of files with a given number of categories. The counters are
+    adjusted as categories are added and removed, so that the statistics
+    never require counting the data-set's categories.
+    """
+    # The data-set the statistic is about
+    dataset = models.ForeignKey(f"{UFDLCoreAppConfig.label}.Dataset",
+                                on_delete=models.CASCADE,
+                                related_name="+")
+
+    # The kind of statistic (one of the constants below)
+    statistic = models.CharField(max_length=16)
+
+    # The category counted (the number of categories, for CARDINALITY)
+    category = models.TextField()
+
+    # The other category of the pair, for CO_OCCURRENCE
+    other_category = models.TextField(default="")
+
+    # The number of files
+    count = models.BigIntegerField(default=0)
+
+    objects = CategoryStatisticQuerySet.as_manager()
+
+    # The kinds of statistic
+    CATEGORY: str = "category"
+    CO_OCCURRENCE: str = "co-occurrence"
+    CARDINALITY: str = "cardinality"
+
+    class Meta:
+        constraints = [
+            # Ensure that each statistic has a single counter per data-set
+            models.UniqueConstraint(name="unique_ic_category_statistics",
+                                    fields=["dataset", "statistic", "category", "other_category"])
+        ]
+
+    @classmethod
+    def count_categories(cls, categories: Set[str], sign: int, counts: Counter):
+        """
+        Adds the statistics of a single file's categories to a set of counts.
+
+        :param categories:  The categories of the file.
+        :param sign:        1 to add the file's statistics, -1 to subtract them.
+        :param counts:      The counts to adjust.
+        """
+        if len(categories) == 0:
+            return
+
+        counts[(cls.CARDINALITY, str(len(categories)), "")] += sign
+
+        for category in categories:
+            counts[(cls.CATEGORY, category, "")] += sign
+
+        for category, other_category in combinations(sorted(categories), 2):
+            counts[(cls.CO_OCCURRENCE, category, other_category)] += sign
+
+    @classmethod
+    def record_changes(cls, dataset_pk: int, before: Dict[int, Set[str]], after: Dict[int, Set[str]]):
+        """
+        Adjusts the statistics of a data-set for a change to the categories of some
+        of its files. Should be called in the same transaction as the change.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param before:      The categories of each changed file before the change.
+        :param after:       The categories of each changed file after the change.
+        """
+        deltas = Counter()
+        for file_pk in set(before).union(after):
+            old_categories = before.get(file_pk, set())
+            new_categories = after.get(file_pk, set())
+
+            if old_categories != new_categories:
+                cls.count_categories(old_categories, -1, deltas)
+                cls.count_categories(new_categories, 1, deltas)
+
+        cls.adjust(dataset_pk, {key: delta for key, delta in deltas.items() if delta != 0})
+
+    @classmethod
+    def adjust(cls, dataset_pk: int, deltas: Dict[StatisticKey, int]):
+        """
+        Adjusts a number of the counters of a data-set.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param deltas:      The amount to adjust each counter by.
+        """
+        # Create any counters which don't exist yet
+        missing: List[StatisticKey] = []
+        for key, delta in deltas.items():
+            if cls.filter_key(dataset_pk, key).update(count=models.F("count") + delta) == 0:
+                missing.append(key)
+
+        if len(missing) == 0:
+            return
+
+        cls.objects.bulk_create(
+            [
+                cls(dataset_id=dataset_pk, statistic=statistic, category=category, other_category=other_category)
+                for statistic, category, other_category in missing
+            ],
+            ignore_conflicts=True
+        )
+
+        for key in missing:
+            cls.filter_key(dataset_pk, key).update(count=models.F("count") + deltas[key])
+
+    @classmethod
+    def filter_key(cls, dataset_pk: int, key: StatisticKey) -> CategoryStatisticQuerySet:
+        """
+        Gets the query-set of the counter of a data-set with the given key.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param key:         The key of the counter.
+        :return:            The query-set.
+        """
+        statistic, category, other_category = key
+
+        return cls.objects.filter(
+            dataset_id=dataset_pk,
+            statistic=statistic,
+            category=category,
+            other_category=other_category
+        )
+
+    @classmethod
+    def recount(cls, dataset_pk: int, file_categories: Iterable[Iterable[str]]):
+        """
+        Replaces the statistics of a data-set with a complete count.
+
+        :param dataset_pk:          The primary key of the data-set.
+        :param file_categories:     The categories of each file in the data-set.
+        """
+        counts = Counter()
+        for categories in file_categories:
+            cls.count_categories(set(categories), 1, counts)
+
+        cls.objects.filter(dataset_id=dataset_pk).delete()
+        cls.objects.bulk_create([
+            cls(dataset_id=dataset_pk, statistic=statistic, category=category, other_category=other_category, count=count)
+            for (statistic, category, other_category), count in counts.items()
+            if count != 0
+        ])
+
+    @classmethod
+    def summarise(cls, dataset_pk: int, num_files: int) -> Dict[str, object]:
+        """
+        Gets a summary of the statistics of a data-set.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param num_files:   The number of files in the data-set.
+        :return:            The number of files with each category, the number of files
+                            with each number of categories, and the number of files with
+                            each pair of categories.
+        """
+        categories: Dict[str, int] = {}
+        cardinality: Dict[int, int] = {}
+        co_occurrence: List[List] = []
+        for statistic, category, other_category, count in (
+                cls.objects
+                .filter(dataset_id=dataset_pk, count__gt=0)
+                .order_by("statistic", "category", "other_category")
+                .values_list("statistic", "category", "other_category", "count")
+        ):
+            if statistic == cls.CATEGORY:
+                categories[category] = count
+            elif statistic == cls.CARDINALITY:
+                cardinality[int(category)] = count
+            elif statistic == cls.CO_OCCURRENCE:
+                co_occurrence.append([category, other_category, count])
+
+        # Files without categories aren't counted directly
+        cardinality[0] = num_files - sum(cardinality.values())
+
+        return {
+            "files": num_files,
+            "categories": categories,
+            "cardinality": [[num_categories, cardinality[num_categories]] for num_categories in sorted(cardinality)],
+            "co_occurrence": co_occurrence
+        }
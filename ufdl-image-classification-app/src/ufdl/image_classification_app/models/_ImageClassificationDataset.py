@@ -1,11 +1,19 @@
-from typing import List, Tuple
+from json import dumps
+from typing import Dict, Iterable, List, Set, Tuple
+
+from django.db import models, transaction
 
 from ufdl.core_app.exceptions import *
-from ufdl.core_app.models import Dataset, DatasetQuerySet, FileReference
+from ufdl.core_app.models import Dataset, DatasetQuerySet, DatasetSnapshot, FileReference
+from ufdl.core_app.util import Column
 
 from ufdl.json.image_classification import CategoriesFile
 
 from ._Category import Category, CategoryQuerySet
+from ._CategoryStatistic import CategoryStatistic
+
+# The number of categories inserted/deleted per query when editing categories in bulk
+CATEGORY_BATCH_SIZE: int = 500
 
 
 class ImageClassificationDatasetQuerySet(DatasetQuerySet):
@@ -15,6 +23,8 @@ class ImageClassificationDatasetQuerySet(DatasetQuerySet):
 class ImageClassificationDataset(Dataset):
     objects = ImageClassificationDatasetQuerySet.as_manager()
 
+    file_formats = Dataset.file_formats | {"npz"}
+
     @classmethod
     def domain_code(cls) -> str:
         return "ic"
@@ -36,9 +46,13 @@ class ImageClassificationDataset(Dataset):
                         category=label
                     ).save()
 
+        # Recount the statistics of the merged categories
+        self.recount_category_statistics()
 
     def clear_annotations(self):
-        self.categories.delete()
+        with transaction.atomic():
+            self.categories.delete()
+            CategoryStatistic.objects.filter(dataset=self).delete()
 
     def delete_file(self, filename: str):
         # Get the reference to the file
@@ -46,11 +60,28 @@ class ImageClassificationDataset(Dataset):
 
         # Delete the categories of the file
         if reference is not None:
-            reference.categories.all().delete()
+            with transaction.atomic():
+                self.lock_file_references([reference.pk])
+                CategoryStatistic.record_changes(
+                    self.pk,
+                    {reference.pk: set(reference.categories.values_list("category", flat=True))},
+                    {}
+                )
+                reference.categories.all().delete()
 
         # Delete the file as usual
         return super().delete_file(filename)
 
+    def recount_category_statistics(self):
+        """
+        Recounts the statistics of the categories of this data-set from scratch.
+        """
+        with transaction.atomic():
+            CategoryStatistic.recount(
+                self.pk,
+                (categories for _, categories in self.categories.iterate_categories())
+            )
+
     def get_categories_for_file(self, filename: str) -> List[str]:
         """
         Gets the categories for a particular file in the dataset.
@@ -60,10 +91,7 @@ class ImageClassificationDataset(Dataset):
         :return:
                     The list of categories.
         """
-        reference: FileReference = self.get_file_reference(filename)
-        if reference is None:
-            return []
-        return [category.category for category in reference.categories.all()]
+        return list(self.categories.for_file(filename).order_by("category").values_list("category", flat=True))
 
     def get_categories(self) -> CategoriesFile:
         """
@@ -71,15 +99,24 @@ class ImageClassificationDataset(Dataset):
 
         :return:    The categories for each image.
         """
-        categories_file = CategoriesFile()
+        return CategoriesFile.from_raw_json(dict(self.categories.iterate_categories()))
 
-        for filename in self.iterate_filenames():
-            categories = self.get_categories_for_file(filename)
-
-            if len(categories) > 0:
-                categories_file.set_property(filename, categories)
+    def get_categories_json(self, revision: str) -> bytes:
+        """
+        Gets the categories of this classification data-set as JSON text. The
+        text is cached in the file-system backend for each revision of the
+        data-set's categories.
 
-        return categories_file
+        :param revision:    The current revision of the data-set's categories,
+                            from snapshot_fingerprint.
+        :return:            The JSON text, encoded as UTF-8.
+        """
+        return DatasetSnapshot.get_data(
+            self,
+            "json",
+            revision,
+            lambda: dumps(dict(self.categories.iterate_categories())).encode("utf-8")
+        )
 
     def set_categories(self, categories_file: CategoriesFile) -> CategoriesFile:
         """
@@ -87,9 +124,38 @@ class ImageClassificationDataset(Dataset):
 
         :param categories_file:     The new categories file.
         """
-        for filename in categories_file.properties():
-            self.categories.for_file(filename).delete()
-            self.add_categories([filename], categories_file[filename])
+        filenames = list(categories_file.properties())
+
+        # It is an error to supply an empty string as a category
+        if any(category == "" for filename in filenames for category in categories_file[filename]):
+            raise BadName("", "Category names can't be empty")
+
+        # Get the files being set, making sure we have all those being given categories
+        references = self.get_file_reference_pks(filenames, throw=False)
+        for filename in filenames:
+            if filename not in references and len(categories_file[filename]) > 0:
+                raise BadName(filename, "Data-set has no image with this name")
+
+        with transaction.atomic():
+            self.lock_file_references(references.values())
+            current = self.get_current_categories(references.values())
+
+            # Remove the existing categories of the files
+            for batch in self.batches(list(references.values())):
+                Category.objects.filter(file_id__in=batch).delete()
+
+            # Add the new categories
+            new = {references[filename]: set(categories_file[filename]) for filename in references}
+            Category.objects.bulk_create(
+                [
+                    Category(file_id=reference_pk, category=category)
+                    for reference_pk, categories in new.items()
+                    for category in categories
+                ],
+                batch_size=CATEGORY_BATCH_SIZE
+            )
+
+            CategoryStatistic.record_changes(self.pk, self.category_sets(current), new)
 
         return categories_file
 
@@ -113,28 +179,35 @@ class ImageClassificationDataset(Dataset):
         images = list(set(images))
         categories = list(set(categories))
 
-        # Create a dictionary of additions to make
-        additions = CategoriesFile()
-        for image in images:
-            reference = self.files.with_filename(image).first()
-
-            # Make sure the image is a file we have
-            if reference is None:
-                raise BadName(image, "Data-set has no image with this name")
-
-            for category in categories:
-                if not reference.categories.with_category(category).exists():
-                    instance = Category(
-                        file=reference,
-                        category=category
-                    )
-                    instance.save()
-                    if image not in additions:
-                        additions[image] = [category]
-                    else:
-                        additions[image] += [category]
-
-        return additions
+        # Get the images, making sure they are all files we have
+        references = self.get_file_reference_pks(images)
+
+        with transaction.atomic():
+            # Find which of the pairs already exist
+            self.lock_file_references(references.values())
+            current = self.get_current_categories(references.values())
+
+            # Add the rest
+            additions = [
+                (image, category)
+                for image in images
+                for category in categories
+                if category not in current[references[image]]
+            ]
+            Category.objects.bulk_create(
+                [Category(file_id=references[image], category=category) for image, category in additions],
+                batch_size=CATEGORY_BATCH_SIZE,
+                ignore_conflicts=True
+            )
+
+            before = self.category_sets(current)
+            CategoryStatistic.record_changes(
+                self.pk,
+                before,
+                {reference_pk: file_categories.union(categories) for reference_pk, file_categories in before.items()}
+            )
+
+        return self.format_changes(additions)
 
     def remove_categories(self, images: List[str], categories: List[str]) -> CategoriesFile:
         """
@@ -156,22 +229,156 @@ class ImageClassificationDataset(Dataset):
         images = list(set(images))
         categories = list(set(categories))
 
-        # Create a dictionary of removals to make
-        removals = CategoriesFile()
-        for image in images:
-            reference = self.files.with_filename(image).first()
-
-            # Make sure the image is a file we have
-            if reference is None:
-                raise BadName(image, "Data-set has no image with this name")
-
-            for category in categories:
-                qs = reference.categories.with_category(category)
-                if qs.exists():
-                    qs.delete()
-                    if image not in removals:
-                        removals[image] = [category]
-                    else:
-                        removals[image] += [category]
-
-        return removals
+        # Get the images, making sure they are all files we have
+        references = self.get_file_reference_pks(images)
+
+        with transaction.atomic():
+            # Find which of the pairs exist
+            self.lock_file_references(references.values())
+            current = self.get_current_categories(references.values())
+
+            # Remove them
+            removals = [
+                (image, category)
+                for image in images
+                for category in categories
+                if category in current[references[image]]
+            ]
+            for batch in self.batches([current[references[image]][category] for image, category in removals]):
+                Category.objects.filter(pk__in=batch).delete()
+
+            before = self.category_sets(current)
+            CategoryStatistic.record_changes(
+                self.pk,
+                before,
+                {reference_pk: file_categories.difference(categories) for reference_pk, file_categories in before.items()}
+            )
+
+        return self.format_changes(removals)
+
+    def get_file_reference_pks(self, filenames: Iterable[str], throw: bool = True) -> Dict[str, int]:
+        """
+        Gets the primary keys of the references to a number of files
+        in this data-set, with one query per CATEGORY_BATCH_SIZE files.
+
+        :param filenames:   The names of the files.
+        :param throw:       Whether to raise an error for files the data-set doesn't have.
+        :return:            A map from filename to reference primary key.
+        """
+        filenames = set(filenames)
+
+        if len(filenames) == 0:
+            return {}
+
+        # Filter by name in batches, to avoid exceeding the parameter limits of the database
+        references = {}
+        for batch in self.batches(list(filenames)):
+            references.update(self.files.with_filenames(*batch).values_list("file__name__filename", "pk"))
+
+        if throw:
+            for filename in filenames:
+                if filename not in references:
+                    raise BadName(filename, "Data-set has no image with this name")
+
+        return references
+
+    def lock_file_references(self, reference_pks: Iterable[int]):
+        """
+        Locks the references to the given files until the end of the current
+        transaction, so that concurrent edits to the files' categories are
+        applied one after the other, and the changes to the category statistics
+        are computed from the files' actual current categories.
+
+        :param reference_pks:   The primary keys of the files' references.
+        """
+        # Lock in a consistent order to avoid deadlocks between concurrent edits
+        for batch in self.batches(sorted(reference_pks)):
+            list(
+                FileReference.objects
+                .filter(pk__in=batch)
+                .order_by("pk")
+                .select_for_update()
+                .values_list("pk", flat=True)
+            )
+
+    def get_current_categories(self, reference_pks: Iterable[int]) -> Dict[int, Dict[str, int]]:
+        """
+        Gets the current categories of the given files, with a single query.
+
+        :param reference_pks:   The primary keys of the files' references.
+        :return:                A map from each file's reference primary key to a map
+                                from each of its categories to the primary key of the
+                                category record.
+        """
+        current: Dict[int, Dict[str, int]] = {reference_pk: {} for reference_pk in reference_pks}
+
+        # Filter to the files directly if there are few enough of them,
+        # otherwise fetch the categories of the entire data-set
+        categories = (
+            Category.objects.filter(file_id__in=list(current))
+            if len(current) <= CATEGORY_BATCH_SIZE else
+            self.categories
+        )
+
+        for category_pk, file_pk, category in categories.values_list("pk", "file_id", "category"):
+            if file_pk in current:
+                current[file_pk][category] = category_pk
+
+        return current
+
+    def get_category_statistics(self) -> Dict[str, object]:
+        """
+        Gets statistics about the categories of this data-set: the number of files
+        with each category, the number of files with each number of categories,
+        and the number of files with each pair of categories.
+
+        :return:    The statistics.
+        """
+        return CategoryStatistic.summarise(self.pk, self.files.count())
+
+    @staticmethod
+    def category_sets(current: Dict[int, Dict[str, int]]) -> Dict[int, Set[str]]:
+        """
+        Converts the result of get_current_categories into the set of categories of each file.
+
+        :param current:     The current categories of some files.
+        :return:            The set of categories of each file.
+        """
+        return {reference_pk: set(categories) for reference_pk, categories in current.items()}
+
+    @staticmethod
+    def format_changes(changes: List[Tuple[str, str]]) -> CategoriesFile:
+        """
+        Formats a list of changes to the categories of files as a categories-file.
+
+        :param changes:     The (filename, category) pairs which were changed.
+        :return:            The categories-file of the changes.
+        """
+        changed_categories: Dict[str, List[str]] = {}
+        for filename, category in changes:
+            changed_categories.setdefault(filename, []).append(category)
+
+        changes_file = CategoriesFile()
+        for filename, categories in changed_categories.items():
+            changes_file[filename] = categories
+
+        return changes_file
+
+    @staticmethod
+    def batches(values: List) -> Iterable[List]:
+        """
+        Splits a list of primary keys (or filenames) into batches small enough to filter by.
+
+        :param values:  The primary keys (or filenames).
+        :return:        An iterator over the batches.
+        """
+        return (
+            values[start:start + CATEGORY_BATCH_SIZE]
+            for start in range(0, len(values), CATEGORY_BATCH_SIZE)
+        )
+
+    def snapshot_query_sets(self) -> List[models.QuerySet]:
+        return [self.categories]
+
+    def snapshot_columns(self) -> Dict[str, Column]:
+        return self.categories.as_columns()
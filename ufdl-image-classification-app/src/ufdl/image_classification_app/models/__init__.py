@@ -1,2 +1,3 @@
 from ._Category import Category, CategoryQuerySet
+from ._CategoryStatistic import CategoryStatistic, CategoryStatisticQuerySet
 from ._ImageClassificationDataset import ImageClassificationDataset, ImageClassificationDatasetQuerySet
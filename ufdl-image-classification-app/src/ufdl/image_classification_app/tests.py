@@ -1,3 +1,133 @@
 from django.test import TestCase
 
-# Create your tests here.
+from simple_django_teams.models import Team
+
+from ufdl.core_app.exceptions import BadName
+from ufdl.core_app.models import Licence, Project, User
+
+from ufdl.json.image_classification import CategoriesFile
+
+from .models import ImageClassificationDataset
+
+# The names of the images in the test data-set
+IMAGES = ["first.jpg", "second.jpg", "third.jpg"]
+
+
+def sorted_categories(categories_file: CategoriesFile) -> dict:
+    """
+    Gets the raw JSON of a categories-file, with each file's categories sorted.
+    """
+    return {
+        filename: sorted(categories)
+        for filename, categories in categories_file.to_raw_json().items()
+    }
+
+
+class CategoriesTestCase(TestCase):
+    """
+    Tests editing the categories of the images in a data-set.
+    """
+    def setUp(self):
+        user = User.objects.create_user("ic-user", "ic-user@example.com", "password")
+        team = Team.objects.create(name="ic-team", creator=user)
+        project = Project.objects.create(name="ic-project", team=team, creator=user)
+        self.dataset = ImageClassificationDataset.objects.create(
+            name="ic-dataset",
+            project=project,
+            licence=Licence.objects.first(),
+            tags="",
+            creator=user
+        )
+
+        for image in IMAGES:
+            self.dataset.add_file(image, image.encode())
+
+    def test_add_categories(self):
+        changes = self.dataset.add_categories(IMAGES[:2], ["cat", "dog"])
+
+        self.assertEqual(sorted_categories(changes), {IMAGES[0]: ["cat", "dog"], IMAGES[1]: ["cat", "dog"]})
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[0]), ["cat", "dog"])
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[2]), [])
+
+    def test_add_existing_categories_is_no_change(self):
+        self.dataset.add_categories([IMAGES[0]], ["cat"])
+
+        changes = self.dataset.add_categories(IMAGES[:2], ["cat"])
+
+        self.assertEqual(sorted_categories(changes), {IMAGES[1]: ["cat"]})
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[0]), ["cat"])
+
+    def test_remove_categories(self):
+        self.dataset.add_categories(IMAGES, ["cat", "dog"])
+
+        changes = self.dataset.remove_categories(IMAGES[:2], ["dog", "bird"])
+
+        self.assertEqual(sorted_categories(changes), {IMAGES[0]: ["dog"], IMAGES[1]: ["dog"]})
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[0]), ["cat"])
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[2]), ["cat", "dog"])
+
+    def test_set_categories(self):
+        self.dataset.add_categories(IMAGES, ["cat"])
+
+        self.dataset.set_categories(CategoriesFile.from_raw_json({IMAGES[0]: ["dog"], IMAGES[1]: []}))
+
+        self.assertEqual(
+            sorted_categories(self.dataset.get_categories()),
+            {IMAGES[0]: ["dog"], IMAGES[2]: ["cat"]}
+        )
+
+    def test_unknown_image_is_rejected(self):
+        with self.assertRaises(BadName):
+            self.dataset.add_categories([IMAGES[0], "missing.jpg"], ["cat"])
+
+        with self.assertRaises(BadName):
+            self.dataset.set_categories(CategoriesFile.from_raw_json({"missing.jpg": ["cat"]}))
+
+        self.assertEqual(self.dataset.get_categories_for_file(IMAGES[0]), [])
+
+    def test_empty_category_is_rejected(self):
+        with self.assertRaises(BadName):
+            self.dataset.add_categories(IMAGES, [""])
+
+
+class CategoryStatisticsTestCase(CategoriesTestCase):
+    """
+    Tests that the incrementally-maintained category statistics stay
+    consistent with the categories, by re-running the category edit
+    tests and comparing the statistics against a recount after each.
+    """
+    def tearDown(self):
+        statistics = self.dataset.get_category_statistics()
+
+        self.dataset.recount_category_statistics()
+
+        self.assertEqual(statistics, self.dataset.get_category_statistics())
+
+    def test_statistics(self):
+        self.dataset.add_categories(IMAGES, ["cat"])
+        self.dataset.add_categories(IMAGES[:2], ["dog"])
+        self.dataset.remove_categories([IMAGES[1]], ["cat"])
+
+        self.assertEqual(
+            self.dataset.get_category_statistics(),
+            {
+                "files": 3,
+                "categories": {"cat": 2, "dog": 2},
+                "cardinality": [[0, 0], [1, 2], [2, 1]],
+                "co_occurrence": [["cat", "dog", 1]]
+            }
+        )
+
+    def test_clear_annotations(self):
+        self.dataset.add_categories(IMAGES, ["cat", "dog"])
+
+        self.dataset.clear_annotations()
+
+        self.assertEqual(self.dataset.get_category_statistics()["categories"], {})
+
+    def test_delete_file(self):
+        self.dataset.add_categories(IMAGES, ["cat", "dog"])
+
+        self.dataset.delete_file(IMAGES[0])
+
+        self.assertEqual(self.dataset.get_category_statistics()["categories"], {"cat": 2, "dog": 2})
@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from typing import OrderedDict as OrderedDictType
+
+
+class ReferenceCache:
+    """
+    In-process LRU cache of the references held by recently-used data-sets
+    to labels and prefixes, mapping the text of each label/prefix to the primary
+    key of the data-set's reference to it. Saves looking up (and re-creating)
+    the same handful of labels/prefixes for every annotation added.
+
+    Each data-set's table of references is complete when cached, so a miss in
+    a cached table means the data-set does not (yet) reference that text.
+    """
+    # The kinds of reference cached
+    LABELS: str = "labels"
+    PREFIXES: str = "prefixes"
+
+    def __init__(self, max_tables: int):
+        self._max_tables: int = max_tables
+        self._lock: Lock = Lock()
+        self._tables: OrderedDictType[Tuple[int, str], Dict[str, int]] = OrderedDict()
+
+    def get(self, dataset_pk: int, kind: str) -> Optional[Dict[str, int]]:
+        """
+        Gets a copy of the cached references of a data-set.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param kind:        The kind of reference (LABELS or PREFIXES).
+        :return:            The references, or None if they aren't cached.
+        """
+        key = (dataset_pk, kind)
+
+        with self._lock:
+            table = self._tables.get(key, None)
+
+            if table is None:
+                return None
+
+            self._tables.move_to_end(key)
+
+            return dict(table)
+
+    def put(self, dataset_pk: int, kind: str, references: Dict[str, int]):
+        """
+        Caches the complete set of references of a data-set, evicting the
+        least-recently used table if the cache is full.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param kind:        The kind of reference (LABELS or PREFIXES).
+        :param references:  All of the data-set's references of that kind.
+        """
+        key = (dataset_pk, kind)
+
+        with self._lock:
+            self._tables[key] = dict(references)
+            self._tables.move_to_end(key)
+
+            while len(self._tables) > self._max_tables:
+                self._tables.popitem(last=False)
+
+    def update(self, dataset_pk: int, kind: str, references: Dict[str, int]):
+        """
+        Adds newly-created references to the cached table of a data-set.
+        Does nothing if the table isn't cached, as a partial table can't be.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param kind:        The kind of reference (LABELS or PREFIXES).
+        :param references:  The new references.
+        """
+        with self._lock:
+            table = self._tables.get((dataset_pk, kind), None)
+
+            if table is not None:
+                table.update(references)
+
+    def invalidate(self, dataset_pk: int, kind: str):
+        """
+        Removes the cached table of a data-set, so that it is
+        reloaded from the database on next access.
+
+        :param dataset_pk:  The primary key of the data-set.
+        :param kind:        The kind of reference (LABELS or PREFIXES).
+        """
+        with self._lock:
+            self._tables.pop((dataset_pk, kind), None)
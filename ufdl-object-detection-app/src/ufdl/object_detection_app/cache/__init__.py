@@ -0,0 +1,5 @@
+"""
+Package for in-process caches used by the object-detection app.
+"""
+from ._get_reference_cache import get_reference_cache
+from ._ReferenceCache import ReferenceCache
@@ -0,0 +1,24 @@
+from typing import Optional
+
+from ._ReferenceCache import ReferenceCache
+
+# The maximum number of tables of references kept by the cache
+REFERENCE_CACHE_SIZE: int = 256
+
+# The label/prefix reference cache for this server process
+__cache: Optional[ReferenceCache] = None
+
+
+def get_reference_cache() -> ReferenceCache:
+    """
+    Gets the label/prefix reference cache for this server
+    process, creating it on first access.
+
+    :return:    The reference cache.
+    """
+    global __cache
+
+    if __cache is None:
+        __cache = ReferenceCache(REFERENCE_CACHE_SIZE)
+
+    return __cache
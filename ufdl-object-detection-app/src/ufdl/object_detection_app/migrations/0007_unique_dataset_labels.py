@@ -0,0 +1,22 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Migration ensuring each dataset only references each label/prefix once,
+    so that labels and prefixes can be added in bulk.
+    """
+    dependencies = [
+        ('ufdl_object_detection', '0006_job_templates'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='datasettolabel',
+            constraint=models.UniqueConstraint(fields=('dataset', 'label'), name='unique_dataset_labels'),
+        ),
+        migrations.AddConstraint(
+            model_name='datasettoprefix',
+            constraint=models.UniqueConstraint(fields=('dataset', 'prefix'), name='unique_dataset_prefixes'),
+        ),
+    ]
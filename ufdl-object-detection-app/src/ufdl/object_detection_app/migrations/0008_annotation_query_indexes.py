@@ -0,0 +1,71 @@
+from django.db import migrations, models
+
+from ufdl.core_app.migrations import DataMigration
+
+from ..apps import UFDLObjectDetectionAppConfig
+
+# The name of the PostgreSQL-only GiST index on the annotations' bounding-boxes
+BOUNDING_BOX_INDEX_NAME = "annotation_bounding_boxes"
+
+
+def calculate_areas(apps, schema_editor):
+    """
+    Calculates the area of the existing annotations.
+    """
+    annotation_model = apps.get_model(UFDLObjectDetectionAppConfig.label, "Annotation")
+
+    annotation_model.objects.update(area=models.F("width") * models.F("height"))
+
+
+def create_bounding_box_index(apps, schema_editor):
+    """
+    Creates a GiST index on the bounding-boxes of the annotations, where
+    the database supports it.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    annotation_model = apps.get_model(UFDLObjectDetectionAppConfig.label, "Annotation")
+
+    schema_editor.execute(
+        f"CREATE INDEX {BOUNDING_BOX_INDEX_NAME} ON {schema_editor.quote_name(annotation_model._meta.db_table)} "
+        f"USING gist (box(point(x, y), point(x + width, y + height)))"
+    )
+
+
+def drop_bounding_box_index(apps, schema_editor):
+    """
+    Drops the GiST index on the bounding-boxes of the annotations, if it was created.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(f"DROP INDEX IF EXISTS {BOUNDING_BOX_INDEX_NAME}")
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding the indices which support querying the annotations
+    of a dataset by label, size, region and time.
+    """
+    dependencies = [
+        ('ufdl_object_detection', '0007_unique_dataset_labels'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='annotation',
+            name='area',
+            field=models.BigIntegerField(default=0, editable=False),
+        ),
+        DataMigration(calculate_areas),
+        migrations.AddIndex(
+            model_name='annotation',
+            index=models.Index(fields=['label_reference', 'area'], name='annotation_label_areas'),
+        ),
+        migrations.AddIndex(
+            model_name='annotation',
+            index=models.Index(fields=['container', 'time'], name='annotation_container_times'),
+        ),
+        migrations.RunPython(create_bounding_box_index, drop_bounding_box_index),
+    ]
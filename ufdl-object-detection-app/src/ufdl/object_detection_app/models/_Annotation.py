@@ -1,13 +1,44 @@
 from json import loads
-from typing import Union
+from typing import Iterator, Optional, Union
 
-from django.db import models
+from django.db import connections, models
 
 from ufdl.json.object_detection import ImageAnnotation, VideoAnnotation
 
+from wai.json.raw import RawJSONObject
+
 from ..apps import UFDLObjectDetectionAppConfig
 
 
+def bounding_box(x, y, width, height) -> models.Func:
+    """
+    Gets the expression for a bounding-box as a PostgreSQL box. For the
+    annotation's own fields, matches the GiST index created by migration 0008.
+
+    :param x:       The expression for the left edge of the box.
+    :param y:       The expression for the top edge of the box.
+    :param width:   The expression for the width of the box.
+    :param height:  The expression for the height of the box.
+    :return:        The box expression.
+    """
+    return models.Func(
+        models.Func(x, y, function="point", output_field=models.Field()),
+        models.Func(x + width, y + height, function="point", output_field=models.Field()),
+        function="box",
+        output_field=models.Field()
+    )
+
+
+class BoxesOverlap(models.Func):
+    """
+    Whether two PostgreSQL boxes overlap.
+    """
+    template = "(%(expressions)s)"
+    arg_joiner = " && "
+    arity = 2
+    output_field = models.BooleanField()
+
+
 class AnnotationQuerySet(models.QuerySet):
     """
     Represents a query-set of the annotations for a single image/video in an
@@ -22,6 +53,105 @@ class AnnotationQuerySet(models.QuerySet):
         """
         return self.filter(file__file__name__filename=filename)
 
+    def with_area_between(self, min_area: Optional[int] = None, max_area: Optional[int] = None) -> 'AnnotationQuerySet':
+        """
+        Filters the query-set to those annotations whose bounding-box area
+        is within the given (inclusive) range.
+
+        :param min_area:    The minimum area, or None for no minimum.
+        :param max_area:    The maximum area, or None for no maximum.
+        :return:            The filtered query-set.
+        """
+        query_set = self
+        if min_area is not None:
+            query_set = query_set.filter(area__gte=min_area)
+        if max_area is not None:
+            query_set = query_set.filter(area__lte=max_area)
+
+        return query_set
+
+    def overlapping(self, x: int, y: int, width: int, height: int) -> 'AnnotationQuerySet':
+        """
+        Filters the query-set to those annotations whose bounding-box
+        overlaps the given region.
+
+        :param x:       The left edge of the region.
+        :param y:       The top edge of the region.
+        :param width:   The width of the region.
+        :param height:  The height of the region.
+        :return:        The filtered query-set.
+        """
+        overlapping = self.filter(
+            x__lt=x + width,
+            y__lt=y + height,
+            x__gt=x - models.F("width"),
+            y__gt=y - models.F("height")
+        )
+
+        # On PostgreSQL, also test the same condition against the
+        # bounding-box expression so that its GiST index can be used
+        if connections[self.db].vendor == "postgresql":
+            overlapping = overlapping.filter(
+                BoxesOverlap(
+                    bounding_box(models.F("x"), models.F("y"), models.F("width"), models.F("height")),
+                    bounding_box(models.Value(x), models.Value(y), models.Value(width), models.Value(height))
+                )
+            )
+
+        return overlapping
+
+    def between_times(self, start: Optional[float] = None, end: Optional[float] = None) -> 'AnnotationQuerySet':
+        """
+        Filters the query-set to those (video) annotations whose time
+        is within the given (inclusive) range.
+
+        :param start:   The start of the range, or None for no start.
+        :param end:     The end of the range, or None for no end.
+        :return:        The filtered query-set.
+        """
+        query_set = self
+        if start is not None:
+            query_set = query_set.filter(time__gte=start)
+        if end is not None:
+            query_set = query_set.filter(time__lte=end)
+
+        return query_set
+
+    def iterate_raw_json(self, limit: Optional[int] = None) -> Iterator[RawJSONObject]:
+        """
+        Iterates over the raw JSON of the annotations in the query-set, along with
+        their ids and the names of the files they annotate, in order of id. Fetches
+        the annotations, their filenames, labels and prefixes in a single query.
+
+        :param limit:   The maximum number of annotations to fetch, or None for all.
+        :return:        An iterator of raw JSON annotations.
+        """
+        # Local import to avoid circular reference error
+        from ._Annotations import AnnotationsQuerySet
+
+        rows = self.order_by("pk").values_list(
+            "pk",
+            "container__file__file__name__filename",
+            "x",
+            "y",
+            "width",
+            "height",
+            "time",
+            "polygon",
+            "label_reference__label__text",
+            "prefix_reference__prefix__text"
+        )
+
+        if limit is not None:
+            rows = rows[:limit]
+
+        for pk, filename, *fields in rows:
+            yield {
+                "id": pk,
+                "filename": filename,
+                **AnnotationsQuerySet.annotation_raw_json(*fields)
+            }
+
 
 class Annotation(models.Model):
     """
@@ -40,6 +170,9 @@ class Annotation(models.Model):
     width = models.IntegerField()
     height = models.IntegerField()
 
+    # The area of the bounding-box, for querying by size
+    area = models.BigIntegerField(default=0, editable=False)
+
     # The timestamp in the video, null for images
     time = models.FloatField(null=True, default=None)
 
@@ -60,6 +193,20 @@ class Annotation(models.Model):
 
     objects = AnnotationQuerySet.as_manager()
 
+    class Meta:
+        indexes = [
+            # Queries for the annotations with a given label, by size
+            models.Index(
+                name="annotation_label_areas",
+                fields=["label_reference", "area"]
+            ),
+            # Queries for the annotations of videos, by time
+            models.Index(
+                name="annotation_container_times",
+                fields=["container", "time"]
+            )
+        ]
+
     @property
     def label(self) -> str:
         """
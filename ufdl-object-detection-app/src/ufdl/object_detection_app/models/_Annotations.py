@@ -1,15 +1,26 @@
-from typing import Any, Callable, List, Optional, Set, Type, TypeVar, Union
+from array import array
+from itertools import groupby
+from json import dumps, loads
+from math import nan
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Type, TypeVar, Union
 
 from django.db import models
 
 from ufdl.core_app.models.files import FileReference
+from ufdl.core_app.util import Column
 
 from ufdl.json.object_detection import Image, Video, AnnotationsFile, File
 
+from wai.json.raw import RawJSONObject
+
 from ..models import Annotation
 
 FileType = TypeVar('FileType', bound=File)
 
+# The number of rows fetched from the database at a time when exporting annotations
+EXPORT_CHUNK_SIZE: int = 10000
+
 
 class AnnotationsQuerySet(models.QuerySet):
     """
@@ -21,13 +32,180 @@ class AnnotationsQuerySet(models.QuerySet):
         """
         Formats this set of annotations as a JSON annotations file.
         """
-        return AnnotationsFile(
-            **{
-                annotations.filename: annotations.json
-                for annotations in self.all()
-            }
+        return AnnotationsFile.from_raw_json(dict(self.iterate_raw_json()))
+
+    def iterate_export_rows(self) -> Iterator[Tuple[str, Optional[str], Optional[int], Optional[int], Optional[float], List[tuple]]]:
+        """
+        Iterates over the fields of each file in the query-set, along with the fields of
+        its annotations. All annotations, along with their files' names and their labels
+        and prefixes, are fetched with a single query, and grouped by file in memory.
+
+        :return:    An iterator of (filename, format, width, height, video_length, annotation rows)
+                    tuples, where each annotation row is a tuple of the arguments to
+                    annotation_raw_json.
+        """
+        rows = (
+            self
+            .order_by("pk", "annotations__pk")
+            .values_list(
+                "pk",
+                "file__file__name__filename",
+                "format",
+                "width",
+                "height",
+                "video_length",
+                "annotations__pk",
+                "annotations__x",
+                "annotations__y",
+                "annotations__width",
+                "annotations__height",
+                "annotations__time",
+                "annotations__polygon",
+                "annotations__label_reference__label__text",
+                "annotations__prefix_reference__prefix__text"
+            )
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
         )
 
+        for _, container_rows in groupby(rows, key=itemgetter(0)):
+            container_rows = list(container_rows)
+
+            # Containers with no annotations produce a single row with no annotation
+            yield (
+                *container_rows[0][1:6],
+                [row[7:] for row in container_rows if row[6] is not None]
+            )
+
+    def iterate_raw_json(self) -> Iterator[Tuple[str, RawJSONObject]]:
+        """
+        Iterates over the raw JSON of the annotations for each file in the query-set.
+
+        :return:    An iterator of filename/raw-JSON pairs.
+        """
+        for filename, format, width, height, video_length, annotation_rows in self.iterate_export_rows():
+            file: RawJSONObject = {}
+            if format is not None:
+                file["format"] = format
+            if width is not None and height is not None:
+                file["dimensions"] = [width, height]
+            if video_length is not None:
+                file["length"] = video_length
+
+            file["annotations"] = [
+                self.annotation_raw_json(*row)
+                for row in annotation_rows
+            ]
+
+            yield filename, file
+
+    def as_columns(self) -> Dict[str, Column]:
+        """
+        Formats this set of annotations as columns, for a columnar snapshot. Each
+        file's annotations occupy the range [file_offsets[i], file_offsets[i + 1])
+        of the annotation columns, labels and prefixes are dictionary-encoded, and
+        each annotation's polygon (if any) is the UTF-8 JSON text in the range
+        [polygon_offsets[j], polygon_offsets[j + 1]) of polygon_data. Missing
+        widths/heights are -1, and missing lengths/times are NaN.
+
+        :return:    The columns, by name.
+        """
+        columns: Dict[str, Column] = {
+            "filenames": [],
+            "file_format": [],
+            "file_width": array("i"),
+            "file_height": array("i"),
+            "file_length": array("d"),
+            "file_offsets": array("q", [0]),
+            "x": array("i"),
+            "y": array("i"),
+            "width": array("i"),
+            "height": array("i"),
+            "time": array("d"),
+            "label_id": array("i"),
+            "prefix_id": array("i"),
+            "polygon_offsets": array("q", [0]),
+            "polygon_data": array("B")
+        }
+
+        # The dictionaries of labels/prefixes, mapping each to its index
+        labels: Dict[str, int] = {}
+        prefixes: Dict[str, int] = {}
+
+        for filename, format, width, height, video_length, annotation_rows in self.iterate_export_rows():
+            columns["filenames"].append(filename)
+            columns["file_format"].append(format if format is not None else "")
+            columns["file_width"].append(width if width is not None else -1)
+            columns["file_height"].append(height if height is not None else -1)
+            columns["file_length"].append(video_length if video_length is not None else nan)
+
+            for x, y, width, height, time, polygon, label, prefix in annotation_rows:
+                columns["x"].append(x)
+                columns["y"].append(y)
+                columns["width"].append(width)
+                columns["height"].append(height)
+                columns["time"].append(time if time is not None else nan)
+                columns["label_id"].append(labels.setdefault(label, len(labels)))
+                columns["prefix_id"].append(prefixes.setdefault(prefix, len(prefixes)))
+                if polygon is not None:
+                    columns["polygon_data"].frombytes(polygon.encode("utf-8"))
+                columns["polygon_offsets"].append(len(columns["polygon_data"]))
+
+            columns["file_offsets"].append(len(columns["x"]))
+
+        # Dictionaries are in index order
+        columns["labels"] = list(labels)
+        columns["prefixes"] = list(prefixes)
+
+        return columns
+
+    def iterate_json_text(self) -> Iterator[str]:
+        """
+        Iterates over the text of the annotations file for the query-set
+        a file at a time, for streaming to the client.
+
+        :return:    An iterator of JSON text fragments.
+        """
+        yield "{"
+
+        separator = ""
+        for filename, raw_json in self.iterate_raw_json():
+            yield f"{separator}{dumps(filename)}:{dumps(raw_json)}"
+            separator = ","
+
+        yield "}"
+
+    @staticmethod
+    def annotation_raw_json(
+            x: int,
+            y: int,
+            width: int,
+            height: int,
+            time: Optional[float],
+            polygon: Optional[str],
+            label: str,
+            prefix: str
+    ) -> RawJSONObject:
+        """
+        Formats the fields of an annotation as raw JSON, in the same
+        form as Annotation.json.
+
+        :return:    The raw JSON of the annotation.
+        """
+        annotation: RawJSONObject = {
+            "x": x,
+            "y": y,
+            "width": width,
+            "height": height,
+            "label": label,
+            "prefix": prefix
+        }
+        if polygon is not None:
+            annotation["polygon"] = loads(polygon)
+        if time is not None:
+            annotation["time"] = time
+
+        return annotation
+
     def for_file(self, file: Union[str, FileReference]) -> 'AnnotationsQuerySet':
         """
         Filters the query-set to those annotations that are for a particular file.
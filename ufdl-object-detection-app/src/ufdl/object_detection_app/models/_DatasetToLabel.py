@@ -34,3 +34,10 @@ class DatasetToLabel(DeleteOnNoRemainingReferencesOnlyModel):
     )
 
     objects = DatasetToLabelQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure each dataset only references each label once
+            models.UniqueConstraint(name="unique_dataset_labels",
+                                    fields=["dataset", "label"])
+        ]
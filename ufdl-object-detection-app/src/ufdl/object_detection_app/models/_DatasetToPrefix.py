@@ -34,3 +34,10 @@ class DatasetToPrefix(DeleteOnNoRemainingReferencesOnlyModel):
     )
 
     objects = DatasetToPrefixQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Ensure each dataset only references each prefix once
+            models.UniqueConstraint(name="unique_dataset_prefixes",
+                                    fields=["dataset", "prefix"])
+        ]
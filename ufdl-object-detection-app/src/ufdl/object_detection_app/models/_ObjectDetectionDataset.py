@@ -1,21 +1,28 @@
 from json import dumps
 
-from typing import List, Optional, Set, Tuple, Union
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Type, Union
+
+from django.db import models, transaction
 
 from ufdl.core_app.exceptions import BadName, BadArgumentValue, BadArgumentType
 from ufdl.core_app.models import Dataset, DatasetQuerySet, FileReference
+from ufdl.core_app.util import Column
 
 from ufdl.json.object_detection import AnnotationsFile, Image, Video, ImageAnnotation, VideoAnnotation
 
 from wai.json.object import Absent
 
-from ._Annotation import Annotation
+from ..cache import ReferenceCache, get_reference_cache
+from ._Annotation import Annotation, AnnotationQuerySet
 from ._Annotations import Annotations, AnnotationsQuerySet
 from ._DatasetToLabel import DatasetToLabel
 from ._DatasetToPrefix import DatasetToPrefix
 from ._Label import Label
 from ._Prefix import Prefix
 
+# The number of annotations inserted per query when adding annotations in bulk
+ANNOTATION_BATCH_SIZE: int = 10000
+
 
 class ObjectDetectionDatasetQuerySet(DatasetQuerySet):
     pass
@@ -24,6 +31,8 @@ class ObjectDetectionDatasetQuerySet(DatasetQuerySet):
 class ObjectDetectionDataset(Dataset):
     objects = ObjectDetectionDatasetQuerySet.as_manager()
 
+    file_formats = Dataset.file_formats | {"npz"}
+
     @classmethod
     def domain_code(cls) -> str:
         return "od"
@@ -117,6 +126,51 @@ class ObjectDetectionDataset(Dataset):
 
         return existing_label, existing_label_ref
 
+    def add_labels(self, labels: Iterable[str]) -> Dict[str, int]:
+        """
+        Adds a number of labels to this dataset at once.
+
+        :param labels:
+                    The labels to add.
+        :return:
+                    A map from each label to the primary key of this dataset's reference to it.
+        """
+        return self._intern_references(
+            ReferenceCache.LABELS,
+            labels,
+            DatasetToLabel,
+            "label__text",
+            self._create_label_references
+        )
+
+    def _create_label_references(self, labels: Set[str]) -> Dict[str, int]:
+        """
+        Creates this dataset's references to a number of labels, where they don't already exist.
+
+        :param labels:
+                    The labels to reference.
+        :return:
+                    A map from each label to the primary key of this dataset's reference to it.
+        """
+        # Create any labels that don't exist yet
+        Label.objects.bulk_create([Label(text=label) for label in labels], ignore_conflicts=True)
+        label_texts = dict(Label.objects.filter(text__in=labels).values_list("pk", "text"))
+
+        # Create any references that this dataset doesn't have yet
+        DatasetToLabel.objects.bulk_create(
+            [DatasetToLabel(dataset=self, label_id=label_pk) for label_pk in label_texts],
+            ignore_conflicts=True
+        )
+
+        return {
+            label_texts[label_pk]: reference_pk
+            for reference_pk, label_pk in (
+                DatasetToLabel.objects
+                .filter(dataset=self, label_id__in=label_texts)
+                .values_list("pk", "label_id")
+            )
+        }
+
     def remove_label(self, label: str):
         """
         Removes a label from this dataset.
@@ -144,6 +198,7 @@ class ObjectDetectionDataset(Dataset):
 
         # Delete the label from this dataset
         label_reference.delete()
+        get_reference_cache().invalidate(self.pk, ReferenceCache.LABELS)
 
         # Try to delete the label as well
         existing_label.delete()
@@ -181,6 +236,51 @@ class ObjectDetectionDataset(Dataset):
 
         return existing_prefix, existing_prefix_ref
 
+    def add_prefixes(self, prefixes: Iterable[str]) -> Dict[str, int]:
+        """
+        Adds a number of prefixes to this dataset at once.
+
+        :param prefixes:
+                    The prefixes to add.
+        :return:
+                    A map from each prefix to the primary key of this dataset's reference to it.
+        """
+        return self._intern_references(
+            ReferenceCache.PREFIXES,
+            prefixes,
+            DatasetToPrefix,
+            "prefix__text",
+            self._create_prefix_references
+        )
+
+    def _create_prefix_references(self, prefixes: Set[str]) -> Dict[str, int]:
+        """
+        Creates this dataset's references to a number of prefixes, where they don't already exist.
+
+        :param prefixes:
+                    The prefixes to reference.
+        :return:
+                    A map from each prefix to the primary key of this dataset's reference to it.
+        """
+        # Create any prefixes that don't exist yet
+        Prefix.objects.bulk_create([Prefix(text=prefix) for prefix in prefixes], ignore_conflicts=True)
+        prefix_texts = dict(Prefix.objects.filter(text__in=prefixes).values_list("pk", "text"))
+
+        # Create any references that this dataset doesn't have yet
+        DatasetToPrefix.objects.bulk_create(
+            [DatasetToPrefix(dataset=self, prefix_id=prefix_pk) for prefix_pk in prefix_texts],
+            ignore_conflicts=True
+        )
+
+        return {
+            prefix_texts[prefix_pk]: reference_pk
+            for reference_pk, prefix_pk in (
+                DatasetToPrefix.objects
+                .filter(dataset=self, prefix_id__in=prefix_texts)
+                .values_list("pk", "prefix_id")
+            )
+        }
+
     def remove_prefix(self, prefix: str):
         """
         Removes a prefix from this dataset.
@@ -208,6 +308,7 @@ class ObjectDetectionDataset(Dataset):
 
         # Delete the prefix from this dataset
         prefix_reference.delete()
+        get_reference_cache().invalidate(self.pk, ReferenceCache.PREFIXES)
 
         # Try to delete the prefix as well
         existing_prefix.delete()
@@ -220,6 +321,65 @@ class ObjectDetectionDataset(Dataset):
         """
         return set(prefix.text for prefix in self.prefixes.all())
 
+    def _intern_references(
+            self,
+            kind: str,
+            texts: Iterable[str],
+            reference_model: Type[models.Model],
+            text_field: str,
+            create: Callable[[Set[str]], Dict[str, int]]
+    ) -> Dict[str, int]:
+        """
+        Gets this dataset's references to a number of labels/prefixes, via the
+        reference cache, creating any references that don't exist yet.
+
+        :param kind:
+                    The kind of reference (ReferenceCache.LABELS or ReferenceCache.PREFIXES).
+        :param texts:
+                    The texts of the labels/prefixes.
+        :param reference_model:
+                    The model of this dataset's references (DatasetToLabel or DatasetToPrefix).
+        :param text_field:
+                    The lookup of the referenced text from the reference model.
+        :param create:
+                    Function which creates the references for texts that aren't referenced yet.
+        :return:
+                    A map from each text to the primary key of this dataset's reference to it.
+        """
+        texts = set(texts)
+
+        if len(texts) == 0:
+            return {}
+
+        cache = get_reference_cache()
+
+        # Load all of this dataset's references in one query on a cache miss
+        references = cache.get(self.pk, kind)
+        loaded = references is None
+        if loaded:
+            references = dict(reference_model.objects.filter(dataset=self).values_list(text_field, "pk"))
+            cache.put(self.pk, kind, references)
+
+        found = {text: references[text] for text in texts if text in references}
+
+        # The cache is per-process, so make sure another process hasn't removed any of the references
+        if (
+                not loaded and
+                len(found) > 0 and
+                reference_model.objects.filter(pk__in=found.values()).count() != len(found)
+        ):
+            cache.invalidate(self.pk, kind)
+            return self._intern_references(kind, texts, reference_model, text_field, create)
+
+        # Create any references which are missing
+        missing = texts.difference(found)
+        if len(missing) > 0:
+            created = create(missing)
+            cache.update(self.pk, kind, created)
+            found.update(created)
+
+        return found
+
     def get_file_type(
             self,
             file: Union[str, FileReference]
@@ -333,43 +493,155 @@ class ObjectDetectionDataset(Dataset):
             )
 
         # Make sure the type of annotation matches the type of file
+        self._check_annotation_type(annotations, annotation)
+
+        # Parse common parts of the annotation
+        label_ref_pk = self.add_labels((annotation.label,))[annotation.label]
+        prefix_ref_pk = self.add_prefixes((annotation.prefix,))[annotation.prefix]
+
+        # Create the annotation instance
+        annotation = self._create_annotation(annotations, annotation, label_ref_pk, prefix_ref_pk)
+        annotation.save()
+
+        return annotation
+
+    @transaction.atomic
+    def add_annotations_to_file(
+            self,
+            file: Union[str, FileReference, Annotations],
+            annotations: Union[List[ImageAnnotation], List[VideoAnnotation]]
+    ):
+        """
+        Adds a number of annotations to a file at once.
+
+        :param file:
+                    The file to add the annotations to.
+        :param annotations:
+                    The annotations to add.
+        """
+        # Get the annotations container for the file
+        container = self._get_annotations_container(file)
+
+        # Raise an error if no container was found
+        if container is None:
+            raise BadArgumentValue(
+                "get_annotations_container",
+                "file",
+                file if isinstance(file, str) else file.filename,
+                reason="Has no container"
+            )
+
+        self._bulk_add_annotations([(container, annotations)])
+
+    def _bulk_add_annotations(
+            self,
+            annotations: List[Tuple[Annotations, Union[List[ImageAnnotation], List[VideoAnnotation]]]]
+    ):
+        """
+        Adds the annotations for a number of files, using a fixed number of queries
+        to resolve the labels and prefixes, and inserting the annotations in batches.
+
+        :param annotations:
+                    Pairs of annotations containers and the annotations to add to them.
+        """
+        # Resolve all labels and prefixes up-front
+        label_refs = self.add_labels(
+            annotation.label
+            for _, file_annotations in annotations
+            for annotation in file_annotations
+        )
+        prefix_refs = self.add_prefixes(
+            annotation.prefix
+            for _, file_annotations in annotations
+            for annotation in file_annotations
+        )
+
+        batch = []
+        for container, file_annotations in annotations:
+            for annotation in file_annotations:
+                self._check_annotation_type(container, annotation)
+                batch.append(
+                    self._create_annotation(
+                        container,
+                        annotation,
+                        label_refs[annotation.label],
+                        prefix_refs[annotation.prefix]
+                    )
+                )
+
+                if len(batch) == ANNOTATION_BATCH_SIZE:
+                    Annotation.objects.bulk_create(batch)
+                    batch = []
+
+        if len(batch) > 0:
+            Annotation.objects.bulk_create(batch)
+
+    @staticmethod
+    def _check_annotation_type(
+            container: Annotations,
+            annotation: Union[ImageAnnotation, VideoAnnotation]
+    ):
+        """
+        Makes sure the type of an annotation matches the type of file it annotates.
+
+        :param container:
+                    The annotations container of the file.
+        :param annotation:
+                    The annotation.
+        :raises BadArgumentType:
+                    If the annotation is of the wrong type.
+        """
         if (
-            (annotations.is_image and not isinstance(annotation, ImageAnnotation))
+            (container.is_image and not isinstance(annotation, ImageAnnotation))
             or
-            (annotations.is_video and not isinstance(annotation, VideoAnnotation))
+            (container.is_video and not isinstance(annotation, VideoAnnotation))
         ):
             raise BadArgumentType(
                 "add_annotation_to_file",
                 "annotation",
-                str(ImageAnnotation if annotations.is_image else VideoAnnotation),
+                str(ImageAnnotation if container.is_image else VideoAnnotation),
                 annotation
             )
 
-        # Parse common parts of the annotation
-        polygon = annotation.get_property_as_raw_json("polygon", validate=False)
-        label, label_ref = self.add_label(annotation.label)
-        prefix, prefix_ref = self.add_prefix(annotation.prefix)
-
+    @staticmethod
+    def _create_annotation(
+            container: Annotations,
+            annotation: Union[ImageAnnotation, VideoAnnotation],
+            label_reference_pk: int,
+            prefix_reference_pk: int
+    ) -> Annotation:
+        """
+        Creates (but doesn't save) the database record of an annotation.
+
+        :param container:
+                    The annotations container the annotation belongs to.
+        :param annotation:
+                    The annotation.
+        :param label_reference_pk:
+                    The primary key of the dataset's reference to the annotation's label.
+        :param prefix_reference_pk:
+                    The primary key of the dataset's reference to the annotation's prefix.
+        :return:
+                    The annotation record.
+        """
         # Create the arguments to the Annotation instance
+        polygon = annotation.get_property_as_raw_json("polygon", validate=False)
         annotation_args = dict(
-            container=annotations,
+            container=container,
             x=annotation.x,
             y=annotation.y,
             width=annotation.width,
             height=annotation.height,
-            label_reference=label_ref,
-            prefix_reference=prefix_ref
+            area=annotation.width * annotation.height,
+            label_reference_id=label_reference_pk,
+            prefix_reference_id=prefix_reference_pk
         )
         if polygon is not Absent:
             annotation_args["polygon"] = dumps(polygon)
         if isinstance(annotation, VideoAnnotation):
             annotation_args["time"] = annotation.time
 
-        # Create the annotation instance
-        annotation = Annotation(**annotation_args)
-        annotation.save()
-
-        return annotation
+        return Annotation(**annotation_args)
 
     def get_annotations_for_file(
             self,
@@ -403,6 +675,7 @@ class ObjectDetectionDataset(Dataset):
         if annotations_container is not None:
             annotations_container.annotations.all().delete()
 
+    @transaction.atomic
     def set_annotations_for_file(
             self,
             file: Union[str, FileReference],
@@ -421,9 +694,9 @@ class ObjectDetectionDataset(Dataset):
         # Clear any existing annotations from the file
         self.clear_annotations_for_file(file)
 
-        for annotation in annotations:
-            self.add_annotation_to_file(file, annotation)
+        self.add_annotations_to_file(file, annotations)
 
+    @transaction.atomic
     def set_annotations(self, annotations_file: AnnotationsFile):
         """
         Sets the annotations to the given file.
@@ -433,19 +706,42 @@ class ObjectDetectionDataset(Dataset):
         # Remove any existing annotations
         self.clear_annotations()
 
-        for filename in annotations_file:
+        filenames = list(annotations_file)
+
+        # Get the references to all annotated files at once
+        file_references = {
+            file_reference.filename: file_reference
+            for file_reference in self.files.with_filenames(*filenames).select_related("file__name")
+        }
+        for filename in filenames:
+            if filename not in file_references:
+                raise BadName(filename, "Doesn't exist")
+
+        # Set the file-type of any files that don't have one yet
+        new_containers = []
+        for filename in filenames:
             file: Union[Image, Video] = annotations_file[filename]
-            annotations = self.annotations.for_file(filename).first()
-            if annotations is None:
-                annotations = self.set_file_type(
-                    filename,
-                    file.format,
-                    file.width,
-                    file.height,
-                    file.length if isinstance(file, Video) else None
+            new_containers.append(
+                Annotations(
+                    file=file_references[filename],
+                    format=file.format,
+                    width=file.width,
+                    height=file.height,
+                    video_length=file.length if isinstance(file, Video) else None
                 )
+            )
+        Annotations.objects.bulk_create(new_containers, ignore_conflicts=True)
 
-            self.set_annotations_for_file(filename, file.annotations)
+        # Get the containers for all annotated files at once
+        containers = {
+            container.file_id: container
+            for container in Annotations.objects.filter(file__in=file_references.values())
+        }
+
+        self._bulk_add_annotations([
+            (containers[file_references[filename].pk], annotations_file[filename].annotations)
+            for filename in filenames
+        ])
 
     def get_annotations(self) -> AnnotationsFile:
         """
@@ -454,9 +750,64 @@ class ObjectDetectionDataset(Dataset):
         :return:
                     The annotations as JSON.
         """
-        return AnnotationsFile(
-            **{
-                annotations.filename: annotations.json
-                for annotations in self.annotations
-            }
-        )
\ No newline at end of file
+        return self.annotations.json
+
+    def query_annotations(
+            self,
+            labels: Optional[List[str]] = None,
+            prefixes: Optional[List[str]] = None,
+            min_area: Optional[int] = None,
+            max_area: Optional[int] = None,
+            region: Optional[Tuple[int, int, int, int]] = None,
+            start_time: Optional[float] = None,
+            end_time: Optional[float] = None
+    ) -> AnnotationQuerySet:
+        """
+        Finds the annotations across this dataset which match the given criteria.
+
+        :param labels:
+                    The labels to match, or None for any label.
+        :param prefixes:
+                    The prefixes to match, or None for any prefix.
+        :param min_area:
+                    The minimum area of the annotations' bounding-boxes.
+        :param max_area:
+                    The maximum area of the annotations' bounding-boxes.
+        :param region:
+                    The region (x, y, width, height) the bounding-boxes must overlap.
+        :param start_time:
+                    The earliest time of the (video) annotations.
+        :param end_time:
+                    The latest time of the (video) annotations.
+        :return:
+                    The matching annotations.
+        """
+        annotations: AnnotationQuerySet = Annotation.objects.all()
+
+        # Label and prefix references belong to a single dataset, so only
+        # filter by container if neither restricts the results to this dataset
+        if labels is not None:
+            annotations = annotations.filter(
+                label_reference__in=DatasetToLabel.objects.filter(dataset=self, label__text__in=labels)
+            )
+        if prefixes is not None:
+            annotations = annotations.filter(
+                prefix_reference__in=DatasetToPrefix.objects.filter(dataset=self, prefix__text__in=prefixes)
+            )
+        if labels is None and prefixes is None:
+            annotations = annotations.filter(container__in=self.annotations)
+
+        annotations = annotations.with_area_between(min_area, max_area)
+        if region is not None:
+            annotations = annotations.overlapping(*region)
+        if start_time is not None or end_time is not None:
+            annotations = annotations.between_times(start_time, end_time)
+
+        return annotations
+
+    def snapshot_query_sets(self) -> List[models.QuerySet]:
+        annotations = self.annotations
+        return [annotations, Annotation.objects.filter(container__in=annotations)]
+
+    def snapshot_columns(self) -> Dict[str, Column]:
+        return self.annotations.as_columns()
@@ -1,3 +1,96 @@
 from django.test import TestCase
 
-# Create your tests here.
+from simple_django_teams.models import Team
+
+from ufdl.core_app.exceptions import BadName
+from ufdl.core_app.models import Licence, Project, User
+
+from ufdl.json.object_detection import AnnotationsFile
+
+from .models import Annotation, ObjectDetectionDataset
+
+# The annotations used by the tests, in raw JSON form
+RAW_ANNOTATIONS = {
+    "first.jpg": {
+        "format": "jpg",
+        "dimensions": [640, 480],
+        "annotations": [
+            {"x": 10, "y": 20, "width": 30, "height": 40, "label": "cat", "prefix": "default"},
+            {"x": 50, "y": 60, "width": 70, "height": 80, "label": "dog", "prefix": "default"}
+        ]
+    },
+    "second.jpg": {
+        "format": "jpg",
+        "dimensions": [320, 240],
+        "annotations": [
+            {"x": 1, "y": 2, "width": 3, "height": 4, "label": "cat", "prefix": "other"}
+        ]
+    },
+    "third.jpg": {
+        "format": "jpg",
+        "dimensions": [100, 100],
+        "annotations": []
+    }
+}
+
+
+class AnnotationsImportExportTestCase(TestCase):
+    """
+    Tests the bulk import and export of the annotations of a data-set.
+    """
+    def setUp(self):
+        user = User.objects.create_user("od-user", "od-user@example.com", "password")
+        team = Team.objects.create(name="od-team", creator=user)
+        project = Project.objects.create(name="od-project", team=team, creator=user)
+        self.dataset = ObjectDetectionDataset.objects.create(
+            name="od-dataset",
+            project=project,
+            licence=Licence.objects.first(),
+            tags="",
+            creator=user
+        )
+
+        for filename in RAW_ANNOTATIONS:
+            self.dataset.add_file(filename, filename.encode())
+
+    def test_round_trip(self):
+        self.dataset.set_annotations(AnnotationsFile.from_raw_json(RAW_ANNOTATIONS))
+
+        self.assertEqual(self.dataset.get_annotations().to_raw_json(), RAW_ANNOTATIONS)
+        self.assertEqual(self.dataset.get_labels(), {"cat", "dog"})
+        self.assertEqual(self.dataset.get_prefixes(), {"default", "other"})
+
+    def test_set_replaces_existing(self):
+        self.dataset.set_annotations(AnnotationsFile.from_raw_json(RAW_ANNOTATIONS))
+
+        replacement = {
+            "second.jpg": {
+                "format": "jpg",
+                "dimensions": [320, 240],
+                "annotations": [
+                    {"x": 5, "y": 6, "width": 7, "height": 8, "label": "bird", "prefix": "default"}
+                ]
+            }
+        }
+        self.dataset.set_annotations(AnnotationsFile.from_raw_json(replacement))
+
+        exported = self.dataset.get_annotations().to_raw_json()
+        self.assertEqual(exported["second.jpg"], replacement["second.jpg"])
+        self.assertEqual(Annotation.objects.filter(container__in=self.dataset.annotations).count(), 1)
+
+    def test_unknown_file_is_rejected(self):
+        raw_annotations = dict(RAW_ANNOTATIONS, **{"missing.jpg": RAW_ANNOTATIONS["third.jpg"]})
+
+        with self.assertRaises(BadName):
+            self.dataset.set_annotations(AnnotationsFile.from_raw_json(raw_annotations))
+
+        # The import is all-or-nothing
+        self.assertFalse(self.dataset.annotations.exists())
+
+    def test_export_is_a_single_query(self):
+        self.dataset.set_annotations(AnnotationsFile.from_raw_json(RAW_ANNOTATIONS))
+
+        with self.assertNumQueries(1):
+            exported = dict(self.dataset.annotations.iterate_raw_json())
+
+        self.assertEqual(exported, RAW_ANNOTATIONS)
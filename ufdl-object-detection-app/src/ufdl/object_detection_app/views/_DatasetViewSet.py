@@ -27,6 +27,7 @@ class DatasetViewSet(AnnotationsViewSet, CoreDatasetViewSet):
         get_file_type=IsMember,
         set_file_type=WriteOrNodeExecutePermission,
         get_file_types=IsMember,
+        query_annotations=IsMember,
 
         **CoreDatasetViewSet.permission_classes
     )
@@ -1,4 +1,6 @@
-from typing import List
+from typing import List, Optional, Type, Union
+
+from django.http import StreamingHttpResponse
 
 from rest_framework import routers
 from rest_framework.request import Request
@@ -13,6 +15,10 @@ from wai.json.object import Absent
 
 from ...models import ObjectDetectionDataset
 
+# The default/maximum number of annotations returned per page of a query
+DEFAULT_QUERY_PAGE_SIZE: int = 100
+MAX_QUERY_PAGE_SIZE: int = 1000
+
 
 class AnnotationsViewSet(RoutedViewSet):
     """
@@ -93,6 +99,13 @@ class AnnotationsViewSet(RoutedViewSet):
                 detail=True,
                 initkwargs={cls.MODE_ARGUMENT_NAME: AnnotationsViewSet.MODE_KEYWORD}
             ),
+            routers.Route(
+                url=r'^{prefix}/{lookup}/query-annotations{trailing_slash}$',
+                mapping={'get': 'query_annotations'},
+                name='{basename}-query-annotations',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: AnnotationsViewSet.MODE_KEYWORD}
+            ),
             routers.Route(
                 url=r'^{prefix}/{lookup}/annotations/(?P<fn>.+)$',
                 mapping={'get': 'get_annotations_for_file',
@@ -148,8 +161,7 @@ class AnnotationsViewSet(RoutedViewSet):
             )
 
         # Add the labels
-        for label in labels:
-            dataset.add_label(label)
+        dataset.add_labels(labels)
 
         # Return an empty response
         return Response({})
@@ -213,8 +225,7 @@ class AnnotationsViewSet(RoutedViewSet):
             )
 
         # Add the prefixes
-        for prefix in prefixes:
-            dataset.add_prefix(prefix)
+        dataset.add_prefixes(prefixes)
 
         # Return an empty response
         return Response({})
@@ -227,7 +238,7 @@ class AnnotationsViewSet(RoutedViewSet):
         dataset = self.get_object_of_type(ObjectDetectionDataset)
 
         # Delete the prefix
-        dataset.remove_label(pfx)
+        dataset.remove_prefix(pfx)
 
         # Return an empty response
         return Response({})
@@ -280,12 +291,13 @@ class AnnotationsViewSet(RoutedViewSet):
         # Return an empty response
         return Response({
             annotations.filename: annotations.to_file(FileType, None).to_raw_json()
-            for annotations in dataset.annotations.all()
+            for annotations in dataset.annotations.select_related("file__file__name")
         })
 
     def get_annotations(self, request: Request, pk=None):
         """
-        Gets the annotations of a data-set.
+        Gets the annotations of a data-set. If the 'stream' query parameter
+        is 'true', the annotations are streamed to the client a file at a time.
 
         :param request:     The request.
         :param pk:          The primary key of the data-set being accessed.
@@ -294,8 +306,12 @@ class AnnotationsViewSet(RoutedViewSet):
         # Get the data-set
         dataset = self.get_object_of_type(ObjectDetectionDataset)
 
+        # Stream the annotations a file at a time if requested
+        if request.query_params.get("stream", "false").lower() == "true":
+            return StreamingHttpResponse(dataset.annotations.iterate_json_text(), content_type="application/json")
+
         # Return the annotations
-        return Response(dataset.get_annotations().to_raw_json(validate=False))
+        return Response(dict(dataset.annotations.iterate_raw_json()))
 
     def set_annotations(self, request: Request, pk=None):
         """
@@ -403,13 +419,94 @@ class AnnotationsViewSet(RoutedViewSet):
             for raw_json in request.data
         ]
 
-        # Set the annotations
-        for annotation in annotations:
-            dataset.add_annotation_to_file(fn, annotation)
+        # Add the annotations
+        dataset.add_annotations_to_file(fn, annotations)
 
         # Return an empty response
         return Response({})
 
+    def query_annotations(self, request: Request, pk=None):
+        """
+        Finds the annotations across a data-set which match the criteria given
+        by the query parameters:
+
+        - label/prefix: the labels/prefixes to match (may be repeated)
+        - min_area/max_area: the range of bounding-box areas to match
+        - region: "x,y,width,height" of a region the bounding-boxes must overlap
+        - start_time/end_time: the range of (video) annotation times to match
+
+        Results are paged in order of annotation id. The 'next' value of a page
+        is passed as the 'after' parameter to get the following page, and is
+        null on the last page. The 'page_size' parameter sets the page size.
+
+        :param request:     The request.
+        :param pk:          The primary key of the data-set being accessed.
+        :return:            The response containing the page of annotations.
+        """
+        # Get the data-set
+        dataset = self.get_object_of_type(ObjectDetectionDataset)
+
+        # Parse the region, if given
+        region = request.query_params.get("region", None)
+        if region is not None:
+            try:
+                region = tuple(map(int, region.split(",")))
+            except ValueError:
+                region = None
+            if region is None or len(region) != 4:
+                raise BadArgumentValue(self.action, "region", request.query_params["region"], "x,y,width,height")
+
+        # Find the matching annotations
+        annotations = dataset.query_annotations(
+            labels=request.query_params.getlist("label") or None,
+            prefixes=request.query_params.getlist("prefix") or None,
+            min_area=self.get_number_query_parameter(request, "min_area", int),
+            max_area=self.get_number_query_parameter(request, "max_area", int),
+            region=region,
+            start_time=self.get_number_query_parameter(request, "start_time", float),
+            end_time=self.get_number_query_parameter(request, "end_time", float)
+        )
+
+        # Select the requested page, fetching one extra annotation to see if there is another page
+        page_size = self.get_number_query_parameter(request, "page_size", int, DEFAULT_QUERY_PAGE_SIZE)
+        if not 0 < page_size <= MAX_QUERY_PAGE_SIZE:
+            raise BadArgumentValue(self.action, "page_size", str(page_size), f"between 1 and {MAX_QUERY_PAGE_SIZE}")
+        after = self.get_number_query_parameter(request, "after", int)
+        if after is not None:
+            annotations = annotations.filter(pk__gt=after)
+        results = list(annotations.iterate_raw_json(limit=page_size + 1))
+
+        return Response({
+            "results": results[:page_size],
+            "next": results[page_size - 1]["id"] if len(results) > page_size else None
+        })
+
+    def get_number_query_parameter(
+            self,
+            request: Request,
+            name: str,
+            type: Union[Type[int], Type[float]],
+            default: Optional[Union[int, float]] = None
+    ) -> Optional[Union[int, float]]:
+        """
+        Gets the value of a numeric query parameter.
+
+        :param request:     The request.
+        :param name:        The name of the parameter.
+        :param type:        The type of number (int or float).
+        :param default:     The value to use if the parameter is absent.
+        :return:            The value of the parameter.
+        """
+        value = request.query_params.get(name, None)
+
+        if value is None:
+            return default
+
+        try:
+            return type(value)
+        except ValueError:
+            raise BadArgumentValue(self.action, name, value, type.__name__)
+
     def delete_annotations_for_file(self, request: Request, pk=None, fn=None):
         """
         Deletes the annotations for a particular image in a data-set.
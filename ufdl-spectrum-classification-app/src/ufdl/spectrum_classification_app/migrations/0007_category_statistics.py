@@ -0,0 +1,76 @@
+from collections import Counter
+from itertools import combinations
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ufdl.core_app.migrations import DataMigration
+
+from ..apps import UFDLSpectrumClassificationAppConfig
+
+
+def count_existing_categories(apps, schema_editor):
+    """
+    Counts the statistics of the categories which already exist.
+    """
+    dataset_model = apps.get_model(UFDLSpectrumClassificationAppConfig.label, "SpectrumClassificationDataset")
+    category_model = apps.get_model(UFDLSpectrumClassificationAppConfig.label, "Category")
+    category_statistic_model = apps.get_model(UFDLSpectrumClassificationAppConfig.label, "CategoryStatistic")
+
+    for dataset in dataset_model.objects.all():
+        # Gather the categories of each file
+        file_categories = {}
+        for file_id, category in (
+                category_model.objects
+                .filter(file__in=dataset.files.all())
+                .values_list("file_id", "category")
+        ):
+            file_categories.setdefault(file_id, set()).add(category)
+
+        counts = Counter()
+        for categories in file_categories.values():
+            counts[("cardinality", str(len(categories)), "")] += 1
+            for category in categories:
+                counts[("category", category, "")] += 1
+            for category, other_category in combinations(sorted(categories), 2):
+                counts[("co-occurrence", category, other_category)] += 1
+
+        category_statistic_model.objects.bulk_create([
+            category_statistic_model(
+                dataset_id=dataset.pk,
+                statistic=statistic,
+                category=category,
+                other_category=other_category,
+                count=count
+            )
+            for (statistic, category, other_category), count in counts.items()
+        ])
+
+
+class Migration(migrations.Migration):
+    """
+    Migration adding counters of the statistics of the categories of each data-set.
+    """
+    dependencies = [
+        ('ufdl_core', '0017_dataset_snapshots'),
+        ('ufdl_spectrum_classification', '0006_job_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryStatistic',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('statistic', models.CharField(max_length=16)),
+                ('category', models.TextField()),
+                ('other_category', models.TextField(default='')),
+                ('count', models.BigIntegerField(default=0)),
+                ('dataset', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='ufdl_core.dataset')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='categorystatistic',
+            constraint=models.UniqueConstraint(fields=('dataset', 'statistic', 'category', 'other_category'), name='unique_sc_category_statistics'),
+        ),
+        DataMigration(count_existing_categories),
+    ]
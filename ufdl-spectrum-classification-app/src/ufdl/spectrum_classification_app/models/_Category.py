@@ -1,4 +1,6 @@
-from typing import Union
+from itertools import groupby
+from operator import itemgetter
+from typing import Iterator, List, Tuple, Union
 
 from django.db import models
 
@@ -38,6 +40,25 @@ class CategoryQuerySet(models.QuerySet):
 
         return self.filter(category=category)
 
+    def iterate_categories(self) -> Iterator[Tuple[str, List[str]]]:
+        """
+        Iterates over the categories of each file in the query-set. All categories,
+        along with their files' names, are fetched with a single query, and grouped
+        by file in memory.
+
+        :return:    An iterator of filename/categories pairs.
+        """
+        rows = (
+            self
+            .order_by("file_id", "category")
+            .values_list("file_id", "file__file__name__filename", "category")
+            .iterator()
+        )
+
+        for _, file_rows in groupby(rows, key=itemgetter(0)):
+            file_rows = list(file_rows)
+            yield file_rows[0][1], [category for _, _, category in file_rows]
+
 
 class Category(models.Model):
     # The file in the dataset that the category applies to
@@ -1,5 +1,8 @@
 from typing import List
 
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
 from rest_framework import routers
 from rest_framework.request import Request
 from rest_framework.response import Response
@@ -33,6 +36,15 @@ class CategoriesViewSet(RoutedViewSet):
                 detail=True,
                 initkwargs={cls.MODE_ARGUMENT_NAME: CategoriesViewSet.MODE_KEYWORD}
             ),
+            routers.Route(
+                url=r'^{prefix}/{lookup}/category-statistics{trailing_slash}$',
+                mapping={
+                    'get': 'get_category_statistics'
+                },
+                name='{basename}-category-statistics',
+                detail=True,
+                initkwargs={cls.MODE_ARGUMENT_NAME: CategoriesViewSet.MODE_KEYWORD}
+            ),
             routers.Route(
                 url=r'^{prefix}/{lookup}/categories/(?P<fn>.+){trailing_slash}$',
                 mapping={
@@ -46,7 +58,9 @@ class CategoriesViewSet(RoutedViewSet):
 
     def get_categories(self, request: Request, pk=None):
         """
-        Gets the categories of a data-set.
+        Gets the categories of a data-set. The response has an ETag identifying
+        the revision of the categories, and is empty (304 Not Modified) if the
+        client already has that revision.
 
         :param request:     The request.
         :param pk:          The primary key of the data-set being accessed.
@@ -55,8 +69,20 @@ class CategoriesViewSet(RoutedViewSet):
         # Get the data-set
         dataset = self.get_object_of_type(SpectrumClassificationDataset)
 
-        # Return the categories
-        return Response(dataset.get_categories().to_raw_json())
+        # The revision of the categories identifies the response
+        revision = dataset.snapshot_fingerprint()
+        etag = quote_etag(revision)
+
+        # Don't resend the categories if the client already has this revision
+        if_none_match = request.headers.get("If-None-Match", None)
+        if if_none_match is not None and etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(dataset.get_categories_json(revision), content_type="application/json")
+
+        response["ETag"] = etag
+
+        return response
 
     def get_categories_for_file(self, request: Request, pk=None, fn=None):
         """
@@ -72,6 +98,21 @@ class CategoriesViewSet(RoutedViewSet):
         # Return the categories
         return Response(dataset.get_categories_for_file(fn))
 
+    def get_category_statistics(self, request: Request, pk=None):
+        """
+        Gets statistics about the categories of a data-set: the number of files
+        with each category, the number of files with each number of categories,
+        and the number of files with each pair of categories.
+
+        :param request:     The request.
+        :param pk:          The primary key of the data-set being accessed.
+        :return:            The response containing the statistics.
+        """
+        # Get the data-set
+        dataset = self.get_object_of_type(SpectrumClassificationDataset)
+
+        return Response(dataset.get_category_statistics())
+
     def modify_categories(self, request: Request, pk=None):
         """
         Modifies categories of a data-set.
@@ -0,0 +1,62 @@
+import json
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+from ufdl.core_app.migrations import DataMigration
+
+from ..apps import UFDLSpeechAppConfig
+
+
+def split_transcriptions(apps, schema_editor):
+    """
+    Splits the transcriptions blob of each data-set into a row per file.
+    """
+    dataset_model = apps.get_model(UFDLSpeechAppConfig.label, "SpeechDataset")
+    file_transcription_model = apps.get_model(UFDLSpeechAppConfig.label, "FileTranscription")
+
+    for dataset in dataset_model.objects.all():
+        transcriptions = json.loads(dataset.transcriptions) if dataset.transcriptions else {}
+
+        if len(transcriptions) == 0:
+            continue
+
+        # Get the references to the data-set's files by filename
+        references = dict(dataset.files.values_list("file__name__filename", "pk"))
+
+        # Transcriptions of files no longer in the data-set are dropped
+        file_transcription_model.objects.bulk_create([
+            file_transcription_model(
+                file_id=references[filename],
+                transcription=json.dumps(transcription)
+            )
+            for filename, transcription in transcriptions.items()
+            if filename in references
+        ])
+
+
+class Migration(migrations.Migration):
+    """
+    Migration moving the transcriptions of speech data-sets from a single
+    JSON blob per data-set to a row per transcribed file.
+    """
+    dependencies = [
+        ('ufdl_core', '0017_dataset_snapshots'),
+        ('ufdl_speech', '0006_job_templates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FileTranscription',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('transcription', models.TextField()),
+                ('file', models.OneToOneField(on_delete=django.db.models.deletion.DO_NOTHING, related_name='transcription', to='ufdl_core.filereference')),
+            ],
+        ),
+        DataMigration(split_transcriptions),
+        migrations.RemoveField(
+            model_name='speechdataset',
+            name='transcriptions',
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import models
+
+from ufdl.core_app.apps import UFDLCoreAppConfig
+
+
+class FileTranscriptionQuerySet(models.QuerySet):
+    """
+    Query-set of file transcriptions.
+    """
+    def for_file(self, filename: str) -> 'FileTranscriptionQuerySet':
+        """
+        Filters the query-set to the transcription of the file with the given filename.
+
+        :param filename:    The filename to filter to.
+        :return:            The filtered query-set.
+        """
+        return self.filter(file__file__name__filename=filename)
+
+
+class FileTranscription(models.Model):
+    """
+    The transcription of a single audio file in a speech data-set.
+    """
+    # The file in the data-set that is transcribed
+    file = models.OneToOneField(
+        f"{UFDLCoreAppConfig.label}.FileReference",
+        on_delete=models.DO_NOTHING,
+        related_name="transcription"
+    )
+
+    # The serialised transcription
+    transcription = models.TextField()
+
+    objects = FileTranscriptionQuerySet.as_manager()
@@ -1,69 +1,122 @@
-from django.db import models
+from json import loads
+from typing import Dict, Optional
 
+from django.db import transaction
+
+from ufdl.core_app.exceptions import BadName
 from ufdl.core_app.models import Dataset, DatasetQuerySet
 
 from ufdl.json.speech import TranscriptionsFile, Transcription
 
+from wai.json.raw import RawJSONObject
+
+from ._FileTranscription import FileTranscription, FileTranscriptionQuerySet
+
 
 class SpeechDatasetQuerySet(DatasetQuerySet):
     pass
 
 
 class SpeechDataset(Dataset):
-    # Serialised representation of the transcriptions for this dataset
-    transcriptions = models.TextField()
-
     objects = SpeechDatasetQuerySet.as_manager()
 
-    def __init__(self, *args, **kwargs):
-        # Initialise as usual
-        super().__init__(*args, **kwargs)
+    # The transcriptions of the data-set's files, loaded on first access
+    _raw_transcriptions: Optional[Dict[str, RawJSONObject]] = None
 
-        # Set a default of no transcriptions
-        if self.transcriptions == "":
-            self.transcriptions = "{}"
-
-        # Make sure the unstructured data is valid
-        TranscriptionsFile.validate_json_string(self.transcriptions)
+    # The parsed transcriptions, parsed on first access
+    _transcriptions_file: Optional[TranscriptionsFile] = None
 
     @classmethod
     def domain_code(cls) -> str:
         return "sp"
 
-    def merge_annotations(self, other, files):
-        # Load the transcriptions files
-        self_transcriptions_file = self.get_transcriptions()
-        other_transcriptions_file = other.get_transcriptions()
+    @property
+    def transcriptions(self) -> FileTranscriptionQuerySet:
+        """
+        All transcriptions in this dataset.
+        """
+        return FileTranscription.objects.filter(file__in=self.files.all())
 
-        # Overwrite the transcriptions for the target files
-        for source_file, target_file in files:
-            self_transcriptions_file[target_file.filename] = other_transcriptions_file[source_file.filename]
+    def refresh_from_db(self, using=None, fields=None):
+        super().refresh_from_db(using, fields)
+        self.invalidate_transcriptions()
 
-        # Save the transcriptions
-        self.set_transcriptions(self_transcriptions_file)
+    def invalidate_transcriptions(self):
+        """
+        Discards the transcriptions loaded by this instance, so that
+        they are reloaded on next access.
+        """
+        self._raw_transcriptions = None
+        self._transcriptions_file = None
+
+    def merge_annotations(self, other, files):
+        # Get the transcriptions of the source files
+        other_transcriptions = dict(
+            other.transcriptions
+            .filter(file__in=[source_file for source_file, _ in files])
+            .values_list("file_id", "transcription")
+        )
+
+        with transaction.atomic():
+            # Overwrite the transcriptions for the target files
+            FileTranscription.objects.filter(
+                file__in=[
+                    target_file
+                    for source_file, target_file in files
+                    if source_file.pk in other_transcriptions
+                ]
+            ).delete()
+            FileTranscription.objects.bulk_create([
+                FileTranscription(file=target_file, transcription=other_transcriptions[source_file.pk])
+                for source_file, target_file in files
+                if source_file.pk in other_transcriptions
+            ])
+
+        self.invalidate_transcriptions()
 
     def clear_annotations(self):
-        self.transcriptions = "{}"
+        self.transcriptions.delete()
+        self.invalidate_transcriptions()
 
     def delete_file(self, filename: str):
+        # Remove the file's transcription first, so the file can be deleted
+        self.transcriptions.for_file(filename).delete()
+        self.invalidate_transcriptions()
+
         # Delete the file as usual
-        file = super().delete_file(filename)
+        return super().delete_file(filename)
 
-        # Remove the file from the transcriptions as well
-        transcriptions = self.get_transcriptions()
-        if transcriptions.has_property(filename):
-            transcriptions.delete_property(filename)
-            self.set_transcriptions(transcriptions)
+    def get_raw_transcriptions(self) -> Dict[str, RawJSONObject]:
+        """
+        Gets the transcriptions of this speech data-set as raw JSON. Transcriptions
+        are validated when they are set, so are not re-validated here. The result
+        is loaded once and reused for the lifetime of this instance.
 
-        return file
+        :return:    The raw JSON transcription for each audio file.
+        """
+        if self._raw_transcriptions is None:
+            self._raw_transcriptions = {
+                filename: loads(transcription)
+                for filename, transcription in (
+                    self.transcriptions
+                    .order_by("file__file__name__filename")
+                    .values_list("file__file__name__filename", "transcription")
+                )
+            }
+
+        return self._raw_transcriptions
 
     def get_transcriptions(self) -> TranscriptionsFile:
         """
-        Gets the transcriptions of this speech data-set.
+        Gets the transcriptions of this speech data-set. The transcriptions
+        are parsed once and reused for the lifetime of this instance.
 
         :return:    The transcriptions for each audio file.
         """
-        return TranscriptionsFile.from_json_string(self.transcriptions)
+        if self._transcriptions_file is None:
+            self._transcriptions_file = TranscriptionsFile.from_raw_json(self.get_raw_transcriptions())
+
+        return self._transcriptions_file
 
     def set_transcriptions(self, transcriptions_file: TranscriptionsFile):
         """
@@ -71,8 +124,54 @@ class SpeechDataset(Dataset):
 
         :param transcriptions_file:     The new transcriptions file.
         """
-        self.transcriptions = transcriptions_file.to_json_string()
-        self.save()
+        filenames = set(transcriptions_file.properties())
+
+        # Get the files being transcribed, making sure they are all files we have
+        references = {
+            filename: reference_pk
+            for filename, reference_pk in self.files.values_list("file__name__filename", "pk")
+            if filename in filenames
+        }
+        for filename in filenames:
+            if filename not in references:
+                raise BadName(filename, "Doesn't exist")
+
+        with transaction.atomic():
+            self.transcriptions.delete()
+            FileTranscription.objects.bulk_create([
+                FileTranscription(
+                    file_id=references[filename],
+                    transcription=transcriptions_file[filename].to_json_string()
+                )
+                for filename in filenames
+            ])
+
+        self.invalidate_transcriptions()
+
+    def get_raw_transcription(self, filename: str) -> RawJSONObject:
+        """
+        Gets the transcription of a single audio file as raw JSON, without
+        re-validating it.
+
+        :param filename:    The file to get the transcription for.
+        :return:            The raw JSON transcription.
+        """
+        # Use the transcriptions if they've already been loaded
+        if self._raw_transcriptions is not None and filename in self._raw_transcriptions:
+            return self._raw_transcriptions[filename]
+
+        # Get the file and its transcription (if any) together
+        transcriptions = list(self.files.with_filename(filename).values_list("transcription__transcription", flat=True))
+
+        # Make sure the file exists
+        if len(transcriptions) == 0:
+            raise BadName(filename, "Doesn't exist")
+
+        # Return an empty transcription if none exists
+        if transcriptions[0] is None:
+            return Transcription().to_raw_json()
+
+        return loads(transcriptions[0])
 
     def get_transcription(self, filename: str) -> Transcription:
         """
@@ -81,17 +180,11 @@ class SpeechDataset(Dataset):
         :param filename:    The file to get the transcription for.
         :return:            The transcription.
         """
-        # Make sure the file exists
-        self.has_file(filename, True)
-
-        # Get the transcription file
-        transcriptions_file = self.get_transcriptions()
+        # Use the parsed transcriptions if they've already been parsed
+        if self._transcriptions_file is not None and filename in self._raw_transcriptions:
+            return self._transcriptions_file[filename]
 
-        # Return an empty transcription if none exists
-        if not transcriptions_file.has_property(filename):
-            return Transcription()
-
-        return transcriptions_file[filename]
+        return Transcription.from_raw_json(self.get_raw_transcription(filename))
 
     def set_transcription(self, filename: str, transcription: Transcription) -> Transcription:
         """
@@ -102,16 +195,14 @@ class SpeechDataset(Dataset):
         :return:                    The new transcription.
         """
         # Make sure the file is known
-        self.has_file(filename)
-
-        # Load the transcriptions file
-        transcriptions_file = self.get_transcriptions()
-
-        # Set the transcription
-        transcriptions_file[filename] = transcription
+        reference = self.get_file_reference(filename, True)
 
         # Save the transcription
-        self.set_transcriptions(transcriptions_file)
+        FileTranscription.objects.update_or_create(
+            file=reference,
+            defaults={"transcription": transcription.to_json_string()}
+        )
+        self.invalidate_transcriptions()
 
         # Return a new transcription file with just the change made
         return transcription
@@ -1 +1,2 @@
+from ._FileTranscription import FileTranscription, FileTranscriptionQuerySet
 from ._SpeechDataset import SpeechDataset, SpeechDatasetQuerySet
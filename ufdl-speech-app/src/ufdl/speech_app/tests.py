@@ -1,3 +1,83 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from simple_django_teams.models import Team
+
+from ufdl.core_app.models import Dataset, Licence, Project, User
+
+from .apps import UFDLSpeechAppConfig
+from .models import FileTranscription
+
+# The migrations either side of the move to per-file transcriptions
+BLOB_MIGRATION = (UFDLSpeechAppConfig.label, "0006_job_templates")
+ROW_MIGRATION = (UFDLSpeechAppConfig.label, "0007_file_transcriptions")
+
+
+class FileTranscriptionsMigrationTestCase(TransactionTestCase):
+    """
+    Tests the migration of the transcriptions of speech data-sets from a
+    JSON blob per data-set to a row per file.
+    """
+    # Restore the rows seeded by the migrations (licences, domains, etc.) after the test
+    serialized_rollback = True
+
+    def setUp(self):
+        # Go back to storing transcriptions as a blob
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate([BLOB_MIGRATION])
+        old_apps = self.executor.loader.project_state([BLOB_MIGRATION]).apps
+
+        user = User.objects.create_user("sp-user", "sp-user@example.com", "password")
+        team = Team.objects.create(name="sp-team", creator=user)
+        project = Project.objects.create(name="sp-project", team=team, creator=user)
+
+        self.transcriptions = {
+            "first.wav": {"transcription": "hello"},
+            "second.wav": {"transcription": "world"},
+            "deleted.wav": {"transcription": "gone"}
+        }
+
+        dataset_model = old_apps.get_model(UFDLSpeechAppConfig.label, "SpeechDataset")
+        self.dataset_pk = dataset_model.objects.create(
+            name="sp-dataset",
+            project_id=project.pk,
+            licence_id=Licence.objects.first().pk,
+            tags="",
+            creator_id=user.pk,
+            transcriptions=json.dumps(self.transcriptions)
+        ).pk
+
+        # The core tables are unaffected by the migration, so files can be added as usual
+        dataset = Dataset.objects.get(pk=self.dataset_pk)
+        for filename in ("first.wav", "second.wav", "untranscribed.wav"):
+            dataset.add_file(filename, filename.encode())
+
+    def tearDown(self):
+        # Return to the latest migrations
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_transcriptions_are_split_into_rows(self):
+        self.executor = MigrationExecutor(connection)
+        self.executor.migrate([ROW_MIGRATION])
+
+        rows = {
+            filename: json.loads(transcription)
+            for filename, transcription in (
+                FileTranscription.objects
+                .filter(file__in=Dataset.objects.get(pk=self.dataset_pk).files.all())
+                .values_list("file__file__name__filename", "transcription")
+            )
+        }
+
+        # Transcriptions of files no longer in the data-set are dropped
+        self.assertEqual(
+            rows,
+            {
+                "first.wav": self.transcriptions["first.wav"],
+                "second.wav": self.transcriptions["second.wav"]
+            }
+        )
@@ -52,7 +52,7 @@ class TranscriptionsViewSet(RoutedViewSet):
         dataset = self.get_object_of_type(SpeechDataset)
 
         # Return the transcriptions
-        return Response(dataset.get_transcriptions().to_raw_json())
+        return Response(dataset.get_raw_transcriptions())
 
     def get_transcription_for_file(self, request: Request, pk=None, fn=None):
         """
@@ -67,7 +67,7 @@ class TranscriptionsViewSet(RoutedViewSet):
         dataset = self.get_object_of_type(SpeechDataset)
 
         # Return the transcriptions
-        return Response(dataset.get_transcription(fn).to_raw_json())
+        return Response(dataset.get_raw_transcription(fn))
 
     def set_transcription_for_file(self, request: Request, pk=None, fn=None):
         """